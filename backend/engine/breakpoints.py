@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Any, Callable, Dict, Sequence
+
+# evaluate(input_index, value) -> metric, vectorized: row r sets input input_index[r] to value[r]
+SweepEvaluator = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+DEFAULT_GRID_POINTS = 33
+DEFAULT_SEARCH_FACTOR = 10.0
+
+def default_bounds(base: np.ndarray, search_factor: float = DEFAULT_SEARCH_FACTOR) -> np.ndarray:
+    """
+    (inputs x 2) feasible search ranges: base +/- search_factor * max(|base|, 1),
+    with the lower end clipped at zero for non-negative inputs (amounts stay amounts).
+    """
+    span = search_factor * np.maximum(np.abs(base), 1.0)
+    lower = np.where(base >= 0, np.maximum(base - span, 0.0), base - span)
+    return np.stack([lower, base + span], axis=1)
+
+
+def solve_breakpoints(evaluate: SweepEvaluator, base: np.ndarray, bounds: np.ndarray, thresholds: Sequence[float],
+                      grid_points: int = DEFAULT_GRID_POINTS, xtol: float = 1e-9, max_iter: int = 100) -> Dict[str, Any]:
+    """
+    Batched bracketed root finding of metric(input_i) = threshold_j for every input i and threshold j.
+
+    1. Bracketing: every input is swept over grid_points values of its feasible range in one
+       batched evaluation. Thresholds only shift the sign test, so the same sweep serves all of them.
+       For each (input, threshold) the sign change nearest the base value is kept; pairs
+       without one have no crossing in the feasible range.
+    2. Refinement: all open brackets are refined together with the Illinois variant of regula
+       falsi (bracketed, superlinear, exact in one step for linear models), one batched
+       evaluation per iteration, until brackets are narrower than xtol * (1 + |x|).
+
+    Returns (inputs x thresholds) arrays: roots (NaN where no crossing), found flags,
+    plus the number of refinement iterations and total model evaluations.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    n_inputs, n_thresholds = len(base), len(thresholds)
+
+    # --- Bracketing sweep ---
+    grid = bounds[:, :1] + (bounds[:, 1:] - bounds[:, :1]) * np.linspace(0.0, 1.0, grid_points)
+    grid = np.sort(np.concatenate([grid, base[:, None]], axis=1), axis=1)  # base value is always a grid point
+    points = grid.shape[1]
+    sweep = evaluate(np.repeat(np.arange(n_inputs), points), grid.ravel()).reshape(n_inputs, points)
+    evaluations = sweep.size
+
+    # g[i, j, k] = metric at grid point k of input i minus threshold j
+    g = sweep[:, None, :] - thresholds[None, :, None]
+    crossing = (np.sign(g[..., :-1]) * np.sign(g[..., 1:]) <= 0) & ~np.isnan(g[..., :-1]) & ~np.isnan(g[..., 1:])
+    midpoints = (grid[:, :-1] + grid[:, 1:]) / 2
+    distance = np.where(crossing, np.abs(midpoints - base[:, None])[:, None, :], np.inf)
+    interval = distance.argmin(axis=2)
+    found = crossing.any(axis=2)
+
+    ii, jj = np.meshgrid(np.arange(n_inputs), np.arange(n_thresholds), indexing="ij")
+    lo, hi = grid[ii, interval], grid[ii, interval + 1]
+    g_lo, g_hi = g[ii, jj, interval], g[ii, jj, interval + 1]
+
+    roots = np.full((n_inputs, n_thresholds), np.nan)
+    roots = np.where(found & (g_lo == 0), lo, roots)
+    roots = np.where(found & (g_hi == 0) & np.isnan(roots), hi, roots)
+
+    # --- Batched Illinois refinement over the still-open brackets ---
+    active = found & np.isnan(roots)
+    side = np.zeros(roots.shape, dtype=np.int8)  # which endpoint was retained last (-1 lo, +1 hi)
+    iterations = 0
+    while active.any() and iterations < max_iter:
+        iterations += 1
+        idx = np.nonzero(active)
+        a, b, fa, fb = lo[idx], hi[idx], g_lo[idx], g_hi[idx]
+        x = b - fb * (b - a) / (fb - fa)
+        x = np.where(np.isfinite(x) & (x > a) & (x < b), x, (a + b) / 2)
+
+        fx = evaluate(idx[0], x) - thresholds[idx[1]]
+        evaluations += len(x)
+
+        hit = fx == 0
+        left = np.sign(fx) == np.sign(fa)  # root lies in [x, b]
+        # Illinois: halve the stale endpoint's value when the same side is kept twice in a row
+        last = side[idx]
+        new_fb = np.where(left & (last == 1), fb / 2, fb)
+        new_fa = np.where(~left & (last == -1), fa / 2, fa)
+        lo[idx] = np.where(left, x, a)
+        g_lo[idx] = np.where(left, fx, new_fa)
+        hi[idx] = np.where(left, b, x)
+        g_hi[idx] = np.where(left, new_fb, fx)
+        side[idx] = np.where(left, 1, -1)
+
+        width = hi[idx] - lo[idx]
+        done = hit | (width <= xtol * (1 + np.abs(x)))
+        roots[idx] = np.where(done, x, roots[idx])
+        active[idx] = ~done
+
+    if active.any():
+        # Out of iterations: report the bracket midpoint (within the final bracket width)
+        roots = np.where(active, (lo + hi) / 2, roots)
+
+    return {"roots": roots, "found": found, "iterations": iterations, "evaluations": evaluations}
@@ -0,0 +1,223 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from scipy.special import betaincinv, ndtr
+from backend.engine.model import model_fingerprint
+
+# Uncertainty spec: {"inputs": {name: {"dist": ..., **params}}, "correlations": [[a, b, rho], ...]}
+UncertaintySpec = Dict[str, Any]
+
+DEFAULT_UNCERTAINTY: UncertaintySpec = {
+    "inputs": {
+        "revenue": {"dist": "normal", "std": 0.05},
+        "operational_costs": {"dist": "normal", "std": 0.03},
+    },
+    "correlations": [],
+}
+
+DISTRIBUTIONS: Dict[str, type] = {}
+
+def register_distribution(name: str):
+    """Class decorator adding a distribution to the registry under `name`."""
+    def wrap(cls):
+        cls.name = name
+        DISTRIBUTIONS[name] = cls
+        return cls
+    return wrap
+
+
+class Distribution:
+    """
+    Multiplicative uncertainty on an input: the sampled value is base + |base| * (factor - 1),
+    so factors are centred near 1 and overrides/sliders still move the distribution.
+    Subclasses map a standard normal (uses_uniform = False) or a uniform in (0, 1) to factors.
+    """
+    name = ""
+    uses_uniform = True
+
+    def __init__(self, **params):
+        self.params = params
+
+    def factor(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def _require(self, *names) -> List[float]:
+        missing = [n for n in names if n not in self.params]
+        if missing:
+            raise ValueError(f"Distribution '{self.name}' requires parameters {missing}")
+        return [float(self.params[n]) for n in names]
+
+    def _ordered(self, low: float, mode: float, high: float):
+        if not low <= mode <= high or low == high:
+            raise ValueError(f"Distribution '{self.name}' requires low <= mode <= high and low < high")
+
+
+@register_distribution("normal")
+class Normal(Distribution):
+    uses_uniform = False
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        (self.std,) = self._require("std")
+
+    def factor(self, z):
+        return 1 + self.std * z
+
+
+@register_distribution("lognormal")
+class LogNormal(Distribution):
+    """Mean-preserving lognormal factor exp(sigma * z - sigma^2 / 2)."""
+    uses_uniform = False
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        (self.sigma,) = self._require("sigma")
+
+    def factor(self, z):
+        return np.exp(self.sigma * z - 0.5 * self.sigma ** 2)
+
+
+@register_distribution("uniform")
+class Uniform(Distribution):
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.low, self.high = self._require("low", "high")
+        self._ordered(self.low, self.low, self.high)
+
+    def factor(self, u):
+        return self.low + (self.high - self.low) * u
+
+
+@register_distribution("triangular")
+class Triangular(Distribution):
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.low, self.mode, self.high = self._require("low", "mode", "high")
+        self._ordered(self.low, self.mode, self.high)
+
+    def factor(self, u):
+        a, c, b = self.low, self.mode, self.high
+        split = (c - a) / (b - a)
+        return np.where(u < split,
+                        a + np.sqrt(u * (b - a) * (c - a)),
+                        b - np.sqrt((1 - u) * (b - a) * (b - c)))
+
+
+@register_distribution("pert")
+class Pert(Distribution):
+    """Beta-PERT on [low, high] with the given mode; `lambda` (default 4) sets peakedness."""
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.low, self.mode, self.high = self._require("low", "mode", "high")
+        self._ordered(self.low, self.mode, self.high)
+        lam = float(params.get("lambda", 4.0))
+        span = self.high - self.low
+        self.alpha = 1 + lam * (self.mode - self.low) / span
+        self.beta = 1 + lam * (self.high - self.mode) / span
+
+    def factor(self, u):
+        return self.low + (self.high - self.low) * betaincinv(self.alpha, self.beta, u)
+
+
+@register_distribution("empirical")
+class Empirical(Distribution):
+    """
+    Bootstrap from uploaded history: inverse empirical CDF over history / mean(history),
+    so sampled values keep the historical relative spread around the current base value.
+    The sorted ratio table is built once when the uncertainty model is compiled.
+    """
+    def __init__(self, **params):
+        super().__init__(**params)
+        history = np.asarray(params.get("history", []), dtype=float)
+        history = history[np.isfinite(history)]
+        if len(history) == 0 or history.mean() == 0:
+            raise ValueError("Distribution 'empirical' requires a non-empty history with non-zero mean")
+        self.table = np.sort(history / history.mean())
+
+    def factor(self, u):
+        idx = np.minimum((u * len(self.table)).astype(np.intp), len(self.table) - 1)
+        return self.table[idx]
+
+
+class UncertaintyModel:
+    """
+    Compiled uncertainty spec: per-input distributions plus a Gaussian copula.
+
+    A draw is a (dims x ...) standard-normal array, sampled in one call per chunk. It is
+    correlated with the cached Cholesky factor, mapped to uniforms once (only if any
+    distribution needs them), and then every input's factor is read off its row.
+    """
+    def __init__(self, spec: UncertaintySpec, fingerprint: Optional[str] = None):
+        self.fingerprint = fingerprint or model_fingerprint(spec)
+        inputs = spec.get("inputs", {})
+        self.names: List[str] = list(inputs)
+        self.distributions: List[Distribution] = []
+        for name, params in inputs.items():
+            params = dict(params)
+            kind = params.pop("dist", "normal")
+            if kind not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution '{kind}' for input '{name}'. Expected one of {sorted(DISTRIBUTIONS)}")
+            self.distributions.append(DISTRIBUTIONS[kind](**params))
+
+        self.cholesky = self._cholesky(spec.get("correlations", []))
+        self._needs_uniform = any(d.uses_uniform for d in self.distributions)
+
+    @property
+    def dims(self) -> int:
+        return len(self.names)
+
+    def _cholesky(self, correlations) -> Optional[np.ndarray]:
+        if not correlations:
+            return None
+        index = {name: i for i, name in enumerate(self.names)}
+        matrix = np.eye(self.dims)
+        for a, b, rho in correlations:
+            if a not in index or b not in index:
+                raise ValueError(f"Correlation references unknown uncertain input: {a}, {b}")
+            matrix[index[a], index[b]] = matrix[index[b], index[a]] = float(rho)
+        try:
+            return np.linalg.cholesky(matrix)
+        except np.linalg.LinAlgError:
+            raise ValueError("Correlation matrix is not positive definite")
+
+    def apply(self, inputs: Dict[str, Any], z: np.ndarray) -> Dict[str, Any]:
+        """
+        Returns inputs with every uncertain input replaced by its sampled values.
+        z: standard normals with shape (dims, ...); trailing axes broadcast against the inputs.
+        Constraints apply to the base decision, not to the stochastic outcome of external factors.
+        """
+        z = np.asarray(z)
+        if self.cholesky is not None:
+            z = np.tensordot(self.cholesky, z, axes=(1, 0))
+        u = ndtr(z) if self._needs_uniform else None
+
+        columns = dict(inputs)
+        for i, (name, dist) in enumerate(zip(self.names, self.distributions)):
+            if name in columns:
+                value = columns[name]
+                factor = dist.factor(u[i] if dist.uses_uniform else z[i])
+                columns[name] = value + np.abs(value) * (factor - 1)
+        return columns
+
+
+_UNCERTAINTY_CACHE: "OrderedDict[str, UncertaintyModel]" = OrderedDict()
+_UNCERTAINTY_CACHE_SIZE = 128
+_uncertainty_lock = threading.Lock()
+
+def compile_uncertainty(spec: Optional[UncertaintySpec] = None) -> UncertaintyModel:
+    """Returns the compiled uncertainty model, reusing cached factorizations and ECDF tables."""
+    spec = spec if spec is not None else DEFAULT_UNCERTAINTY
+    fingerprint = model_fingerprint(spec)
+    with _uncertainty_lock:
+        model = _UNCERTAINTY_CACHE.get(fingerprint)
+        if model is not None:
+            _UNCERTAINTY_CACHE.move_to_end(fingerprint)
+            return model
+
+    model = UncertaintyModel(spec, fingerprint)
+    with _uncertainty_lock:
+        _UNCERTAINTY_CACHE[fingerprint] = model
+        while len(_UNCERTAINTY_CACHE) > _UNCERTAINTY_CACHE_SIZE:
+            _UNCERTAINTY_CACHE.popitem(last=False)
+    return model
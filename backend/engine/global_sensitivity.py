@@ -0,0 +1,143 @@
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from scipy.special import ndtr
+from backend.engine.sampling import SAMPLING_METHODS, standard_normals
+
+DEFAULT_SPREAD = 0.20
+DEFAULT_BLOCK_SIZE = 8_192
+
+def input_ranges(base_inputs: Dict[str, float], names: Sequence[str], spread: float = DEFAULT_SPREAD,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> np.ndarray:
+    """
+    (dims x 2) array of [low, high] bounds per input: ranges[name] when given,
+    else base +/- spread * |base| (inputs with a zero base get [-spread, spread]).
+    """
+    ranges = ranges or {}
+    bounds = np.empty((len(names), 2))
+    for i, name in enumerate(names):
+        if name in ranges:
+            low, high = ranges[name]
+        else:
+            base = float(base_inputs[name])
+            half = spread * (abs(base) if base != 0 else 1.0)
+            low, high = base - half, base + half
+        if not high > low:
+            raise ValueError(f"Range for input '{name}' must satisfy low < high")
+        bounds[i] = low, high
+    return bounds
+
+
+def sobol_indices(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray,
+                  weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    First-order (Saltelli 2010) and total-order (Jansen 1999) indices from model outputs
+    on the A, B and AB_i matrices. f_ab has shape (dims x N).
+    weights: optional (N x R) resampling counts; indices then come back as (dims x R) replicates.
+    """
+    # Centring f_B leaves the estimator unbiased but removes its dependence on the output level
+    first = (f_b - (f_a.mean() + f_b.mean()) / 2) * (f_ab - f_a)
+    total = (f_a - f_ab) ** 2
+    if weights is None:
+        weights = np.ones((len(f_a), 1))
+
+    n = weights.sum(axis=0)
+    # Output variance over the pooled A and B samples, under the same resampling
+    pooled_mean = (f_a @ weights + f_b @ weights) / (2 * n)
+    pooled_sq = (f_a ** 2 @ weights + f_b ** 2 @ weights) / (2 * n)
+    variance = pooled_sq - pooled_mean ** 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s1 = (first @ weights) / n / variance
+        st = 0.5 * (total @ weights) / n / variance
+    if s1.shape[1] == 1:
+        return s1[:, 0], st[:, 0]
+    return s1, st
+
+
+def _evaluate_block(task: tuple):
+    """
+    Process-pool entry point: one block of N_b base samples.
+    Draws [A | B] as (N_b x 2*dims) uniforms from the block's own seed, maps them onto the
+    input ranges and evaluates the model on A, B and every AB_i (A with column i from B).
+    AB_i only swaps one column reference, so no (dims x N_b x dims) matrix is ever built.
+    """
+    model, metric, names, bounds, base_inputs, size, seed, sampling = task
+    dims = len(names)
+    u = ndtr(standard_normals(sampling, size, 2 * dims, np.random.default_rng(seed)))
+    values = bounds[:, 0] + (bounds[:, 1] - bounds[:, 0]) * np.concatenate([u[:, :dims], u[:, dims:]])
+    a_cols = {name: values[:size, i] for i, name in enumerate(names)}
+    b_cols = {name: values[size:, i] for i, name in enumerate(names)}
+
+    def run(columns):
+        out = model.evaluate({**base_inputs, **columns}, [metric])[metric]
+        return np.broadcast_to(out, (size,))
+
+    f_a = run(a_cols)
+    f_b = run(b_cols)
+    f_ab = np.empty((dims, size))
+    for i, name in enumerate(names):
+        f_ab[i] = run(dict(a_cols, **{name: b_cols[name]}))
+    return f_a, f_b, f_ab
+
+
+def run_sobol_analysis(model, metric: str, names: List[str], bounds: np.ndarray, base_inputs: Dict[str, Any],
+                       samples: int, seed_sequence: np.random.SeedSequence, map_blocks=map,
+                       sampling: str = "pseudo", bootstrap: int = 100, confidence: float = 0.95,
+                       block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[str, Any]:
+    """
+    Saltelli sampling scheme with N = samples base rows: N * (dims + 2) model evaluations,
+    split into fixed-size blocks with spawned seeds and merged in block order (deterministic
+    for any worker count). Confidence intervals are percentile bootstrap over base rows.
+    Inputs are treated as independent (the Sobol decomposition assumes independence).
+    """
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{sampling}'. Expected one of {SAMPLING_METHODS}")
+    if not names:
+        raise ValueError("Global sensitivity requires at least one input")
+
+    sizes = [min(block_size, samples - start) for start in range(0, samples, block_size)]
+    block_seeds = seed_sequence.spawn(len(sizes) + 1)
+    tasks = [(model, metric, names, bounds, base_inputs, size, seed, sampling)
+             for size, seed in zip(sizes, block_seeds[:-1])]
+
+    parts = list(map_blocks(_evaluate_block, tasks))
+    f_a = np.concatenate([p[0] for p in parts])
+    f_b = np.concatenate([p[1] for p in parts])
+    f_ab = np.concatenate([p[2] for p in parts], axis=1)
+
+    s1, st = sobol_indices(f_a, f_b, f_ab)
+    result = {
+        "first_order": dict(zip(names, s1.tolist())),
+        "total_order": dict(zip(names, st.tolist())),
+        "variance": float(np.var(np.concatenate([f_a, f_b]))),
+        "samples": samples,
+        "evaluations": samples * (len(names) + 2),
+    }
+
+    if bootstrap:
+        s1_reps, st_reps = _bootstrap(f_a, f_b, f_ab, bootstrap, np.random.default_rng(block_seeds[-1]))
+        tail = 100 * (1 - confidence) / 2
+        s1_ci = np.percentile(s1_reps, [tail, 100 - tail], axis=1).T
+        st_ci = np.percentile(st_reps, [tail, 100 - tail], axis=1).T
+        result["first_order_ci"] = {name: s1_ci[i].tolist() for i, name in enumerate(names)}
+        result["total_order_ci"] = {name: st_ci[i].tolist() for i, name in enumerate(names)}
+        result["confidence"] = confidence
+    return result
+
+
+def _bootstrap(f_a, f_b, f_ab, replicates: int, rng: np.random.Generator, batch: int = 16):
+    """
+    Bootstrap replicates of the indices. Each resample is a vector of row counts, so a batch of
+    resamples is a single (dims x N) @ (N x batch) product instead of gathering rows per resample.
+    """
+    n = len(f_a)
+    s1_parts, st_parts = [], []
+    for start in range(0, replicates, batch):
+        size = min(batch, replicates - start)
+        counts = np.empty((n, size))
+        for j in range(size):
+            counts[:, j] = np.bincount(rng.integers(0, n, n), minlength=n)
+        s1, st = sobol_indices(f_a, f_b, f_ab, weights=counts)
+        s1_parts.append(s1.reshape(len(f_ab), -1))
+        st_parts.append(st.reshape(len(f_ab), -1))
+    return np.concatenate(s1_parts, axis=1), np.concatenate(st_parts, axis=1)
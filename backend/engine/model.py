@@ -0,0 +1,223 @@
+import ast
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import numpy as np
+
+# Metric name -> expression over inputs and other metrics.
+ModelDefinition = Dict[str, str]
+
+DEFAULT_MODEL: ModelDefinition = {
+    "cash_flow": "revenue - (fixed_costs + operational_costs + marketing_spend)"
+}
+
+# Vectorized operations a compiled plan may use. Plans reference them by name so they stay picklable.
+_OPS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "pow": np.power,
+    "neg": np.negative,
+    "pos": np.positive,
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+    "exp": np.exp,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "where": np.where,
+}
+
+_BIN_OPS = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div", ast.Pow: "pow"}
+_UNARY_OPS = {ast.USub: "neg", ast.UAdd: "pos"}
+_COMPARE_OPS = {ast.Lt: "lt", ast.LtE: "le", ast.Gt: "gt", ast.GtE: "ge"}
+_FUNCTIONS = {"abs": 1, "min": 2, "max": 2, "exp": 1, "log": 1, "sqrt": 1, "where": 3}
+
+class ModelDefinitionError(ValueError):
+    pass
+
+
+class CompiledModel:
+    """
+    Vectorized evaluation plan for a metric model.
+
+    Expressions are parsed once (whitelisted AST only, nothing is eval'd), metrics are
+    topologically sorted, and every distinct sub-expression becomes one step in a flat
+    plan, so shared terms are computed once per evaluation. Inputs may be scalars or
+    NumPy arrays of any broadcastable shape.
+    """
+    def __init__(self, definition: ModelDefinition, fingerprint: str):
+        self.definition = dict(definition)
+        self.fingerprint = fingerprint
+        self.metrics: List[str] = []
+        self.inputs: List[str] = []
+        self._constants: List[Tuple[int, float]] = []
+        self._loads: List[Tuple[int, str]] = []
+        self._steps: List[Tuple[int, str, Tuple[int, ...]]] = []
+        self._outputs: Dict[str, int] = {}
+        self._slots: Dict[tuple, int] = {}
+        self._pruned: Dict[Tuple[str, ...], tuple] = {}
+        self._compile()
+
+    # --- Compilation ---
+    def _compile(self):
+        parsed = {}
+        for metric, expression in self.definition.items():
+            if not isinstance(expression, str):
+                raise ModelDefinitionError(f"Expression for metric '{metric}' must be a string")
+            try:
+                parsed[metric] = ast.parse(expression, mode="eval").body
+            except SyntaxError as e:
+                raise ModelDefinitionError(f"Invalid expression for metric '{metric}': {e.msg}")
+
+        graph = {m: {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id in parsed}
+                 for m, tree in parsed.items()}
+        try:
+            self.metrics = list(TopologicalSorter(graph).static_order())
+        except CycleError as e:
+            raise ModelDefinitionError(f"Circular metric dependency: {' -> '.join(e.args[1])}")
+
+        for metric in self.metrics:
+            self._outputs[metric] = self._emit(parsed[metric], metric)
+        self.inputs = [name for _, name in self._loads]
+        self._slots = {}
+
+    def _new_slot(self, key: tuple) -> int:
+        slot = len(self._slots)
+        self._slots[key] = slot
+        return slot
+
+    def _emit(self, node: ast.AST, metric: str) -> int:
+        """Emits plan steps for node and returns its slot; structurally equal nodes share a slot."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            key = ("const", float(node.value))
+            if key not in self._slots:
+                self._constants.append((self._new_slot(key), float(node.value)))
+            return self._slots[key]
+
+        if isinstance(node, ast.Name):
+            if node.id in self._outputs:
+                return self._outputs[node.id]
+            if node.id in self.definition:
+                raise ModelDefinitionError(f"Metric '{metric}' references '{node.id}' before it is defined")
+            key = ("input", node.id)
+            if key not in self._slots:
+                self._loads.append((self._new_slot(key), node.id))
+            return self._slots[key]
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            return self._step(_BIN_OPS[type(node.op)], [node.left, node.right], metric)
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return self._step(_UNARY_OPS[type(node.op)], [node.operand], metric)
+
+        if (isinstance(node, ast.Compare) and len(node.ops) == 1
+                and type(node.ops[0]) in _COMPARE_OPS):
+            return self._step(_COMPARE_OPS[type(node.ops[0])], [node.left, node.comparators[0]], metric)
+
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in _FUNCTIONS and not node.keywords):
+            if len(node.args) != _FUNCTIONS[node.func.id]:
+                raise ModelDefinitionError(
+                    f"{node.func.id}() takes {_FUNCTIONS[node.func.id]} arguments in metric '{metric}'")
+            return self._step(node.func.id, node.args, metric)
+
+        raise ModelDefinitionError(f"Unsupported syntax in metric '{metric}': {ast.dump(node)[:60]}")
+
+    def _step(self, op: str, children: List[ast.AST], metric: str) -> int:
+        args = tuple(self._emit(child, metric) for child in children)
+        key = (op, args)
+        if key not in self._slots:
+            self._steps.append((self._new_slot(key), op, args))
+        return self._slots[key]
+
+    # --- Evaluation ---
+    def _plan_for(self, metrics: Tuple[str, ...]) -> tuple:
+        """Steps, loads and constants needed for the requested metrics only (cached per metric set)."""
+        plan = self._pruned.get(metrics)
+        if plan is None:
+            needed = {self._outputs[m] for m in metrics}
+            steps = []
+            for slot, op, args in reversed(self._steps):
+                if slot in needed:
+                    steps.append((slot, op, args))
+                    needed.update(args)
+            plan = (
+                [(s, v) for s, v in self._constants if s in needed],
+                [(s, n) for s, n in self._loads if s in needed],
+                steps[::-1],
+            )
+            self._pruned[metrics] = plan
+        return plan
+
+    def evaluate(self, inputs: Mapping[str, Any], metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Evaluates the requested metrics (default: all) for the given input values.
+        Raises ModelDefinitionError for unknown metrics or missing inputs.
+        """
+        metrics = tuple(metrics) if metrics is not None else tuple(self.metrics)
+        unknown = [m for m in metrics if m not in self._outputs]
+        if unknown:
+            raise ModelDefinitionError(f"Unknown metrics: {unknown}")
+
+        constants, loads, steps = self._plan_for(metrics)
+        values: Dict[int, Any] = dict(constants)
+        for slot, name in loads:
+            if name not in inputs:
+                raise ModelDefinitionError(f"Missing input '{name}'")
+            values[slot] = inputs[name]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for slot, op, args in steps:
+                values[slot] = _OPS[op](*(values[a] for a in args))
+
+        return {m: values[self._outputs[m]] for m in metrics}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pruned"] = {}
+        return state
+
+
+_PLAN_CACHE: "OrderedDict[str, CompiledModel]" = OrderedDict()
+_PLAN_CACHE_SIZE = 128
+_plan_lock = threading.Lock()
+
+def _plain_json(value: Any) -> Any:
+    # NumPy arrays and scalars (e.g. an empirical history) hash like the equivalent lists and numbers
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def model_fingerprint(definition: ModelDefinition) -> str:
+    """Stable hash of a model definition (independent of key order)."""
+    canonical = json.dumps(definition, sort_keys=True, separators=(",", ":"), default=_plain_json)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def compile_model(definition: Optional[ModelDefinition] = None) -> CompiledModel:
+    """Returns the compiled plan for a definition, reusing a cached plan for repeat definitions."""
+    definition = definition if definition is not None else DEFAULT_MODEL
+    if not definition:
+        raise ModelDefinitionError("Model definition must contain at least one metric")
+
+    fingerprint = model_fingerprint(definition)
+    with _plan_lock:
+        model = _PLAN_CACHE.get(fingerprint)
+        if model is not None:
+            _PLAN_CACHE.move_to_end(fingerprint)
+            return model
+
+    model = CompiledModel(definition, fingerprint)
+    with _plan_lock:
+        _PLAN_CACHE[fingerprint] = model
+        while len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+            _PLAN_CACHE.popitem(last=False)
+    return model
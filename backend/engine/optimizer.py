@@ -0,0 +1,171 @@
+import itertools
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from backend.engine.sampling import standard_normals
+
+OPTIMIZATION_METHODS = ("grid", "random", "cross_entropy")
+OBJECTIVES = ("value", "mean", "mean_cvar")
+
+class DecisionOptimizer:
+    """
+    Server-side search over decision inputs (e.g. marketing_spend, operational_costs).
+
+    Every candidate population is evaluated as one batched engine computation. Stochastic
+    objectives reuse one draw matrix for all candidates and generations (common random
+    numbers), so candidates are compared on identical scenarios and the ranking is not
+    reshuffled by sampling noise.
+
+    Objectives (maximized):
+        value:     deterministic metric.
+        mean:      Monte Carlo mean of the metric.
+        mean_cvar: mean - risk_aversion * CVaR, where CVaR is the expected loss (negative metric)
+                   in the worst (1 - cvar_level) tail, i.e. mean + risk_aversion * E[X | X <= VaR].
+    """
+    MAX_GRID_CANDIDATES = 1_000_000
+
+    def __init__(self, engine, base_inputs: Dict[str, float], bounds: Dict[str, Tuple[float, float]],
+                 metric: str = "cash_flow", objective: str = "value", constraints: Dict[str, float] = None,
+                 risk_aversion: float = 1.0, cvar_level: float = 0.95, iterations: int = 1000,
+                 sampling: str = "pseudo"):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}'. Expected one of {OBJECTIVES}")
+        if not bounds:
+            raise ValueError("At least one decision input with bounds is required")
+        if not 0 < cvar_level < 1:
+            raise ValueError("cvar_level must be in (0, 1)")
+
+        self.engine = engine
+        self.base_inputs = {**engine.baseline, **base_inputs}
+        self.names: List[str] = list(bounds)
+        self.metric = metric
+        self.objective = objective
+        self.constraints = constraints or {}
+        self.risk_aversion = risk_aversion
+        self.cvar_level = cvar_level
+        self.evaluations = 0
+
+        limits = np.array([bounds[n] for n in self.names], dtype=float)
+        # Constraint maxima cap the search space; the engine clamps to them as well
+        caps = np.array([self.constraints.get(n, np.inf) for n in self.names], dtype=float)
+        limits[:, 1] = np.minimum(limits[:, 1], caps)
+        if np.any(limits[:, 1] < limits[:, 0]):
+            raise ValueError("Every decision input needs low <= high (after applying constraints)")
+        self.lower, self.upper = limits[:, 0], limits[:, 1]
+
+        seeds = engine._seed_sequence().spawn(2)
+        self.rng = np.random.default_rng(seeds[0])
+        self.draws = None
+        if objective != "value":
+            # (iterations x dims), shared by every candidate
+            self.draws = standard_normals(sampling, iterations, engine.uncertainty.dims, np.random.default_rng(seeds[1]))
+
+    # --- Objective evaluation ---
+    def _columns(self, candidates: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: candidates[:, j] for j, name in enumerate(self.names)}
+
+    def evaluate(self, candidates: np.ndarray) -> np.ndarray:
+        """Objective for a (population x decisions) candidate matrix, in the engine's memory-bounded row blocks."""
+        candidates = np.atleast_2d(candidates)
+        self.evaluations += len(candidates)
+        overrides = {**{k: v for k, v in self.base_inputs.items() if k not in self.names}, **self._columns(candidates)}
+        n, data = self.engine._resolve_batch(overrides, self.constraints)
+
+        if self.draws is None:
+            values = self.engine.model.evaluate(data, [self.metric])[self.metric]
+            return np.broadcast_to(np.asarray(values, dtype=float), (n,)).copy()
+
+        scores = np.empty(n)
+        for block, outcomes in self.engine._simulate_rows(n, data, len(self.draws), self.metric, draws=self.draws):
+            scores[block] = self._score(outcomes)
+        return scores
+
+    def _score(self, outcomes: np.ndarray) -> np.ndarray:
+        mean = outcomes.mean(axis=1)
+        if self.objective == "mean":
+            return mean
+        tail = max(1, int(math.ceil((1 - self.cvar_level) * outcomes.shape[1])))
+        tail_mean = np.partition(outcomes, tail - 1, axis=1)[:, :tail].mean(axis=1)
+        return mean + self.risk_aversion * tail_mean
+
+    # --- Search strategies ---
+    def _grid(self, grid_points: int) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+        if grid_points ** len(self.names) > self.MAX_GRID_CANDIDATES:
+            raise ValueError(f"Grid of {grid_points}^{len(self.names)} candidates is too large; use random or cross_entropy")
+        axes = [np.linspace(lo, hi, grid_points) for lo, hi in zip(self.lower, self.upper)]
+        candidates = np.array(list(itertools.product(*axes)), dtype=float)
+        scores = self.evaluate(candidates)
+        return candidates, scores, [float(scores.max())]
+
+    def _random(self, population: int, generations: int) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+        best_c, best_s, history = None, None, []
+        for _ in range(generations):
+            candidates = self.rng.uniform(self.lower, self.upper, (population, len(self.names)))
+            scores = self.evaluate(candidates)
+            best_c, best_s = _keep_best(best_c, best_s, candidates, scores)
+            history.append(float(best_s.max()))
+        return best_c, best_s, history
+
+    def _cross_entropy(self, population: int, generations: int, elite_fraction: float = 0.1,
+                       smoothing: float = 0.7, tol: float = 1e-4) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+        span = np.where(self.upper > self.lower, self.upper - self.lower, 1.0)
+        mean = (self.lower + self.upper) / 2
+        std = span / 2
+        elites = max(2, int(round(elite_fraction * population)))
+        best_c, best_s, history = None, None, []
+        for _ in range(generations):
+            candidates = np.clip(self.rng.normal(mean, std, (population, len(self.names))), self.lower, self.upper)
+            scores = self.evaluate(candidates)
+            best_c, best_s = _keep_best(best_c, best_s, candidates, scores)
+            history.append(float(best_s.max()))
+
+            elite = candidates[np.argsort(scores)[-elites:]]
+            mean = smoothing * elite.mean(axis=0) + (1 - smoothing) * mean
+            std = smoothing * elite.std(axis=0) + (1 - smoothing) * std
+            if np.all(std <= tol * span):
+                break
+        return best_c, best_s, history
+
+    def optimize(self, method: str = "cross_entropy", population: int = 64, generations: int = 20,
+                 grid_points: int = 11, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Runs the search and returns the best decision, the baseline objective for comparison,
+        the best objective after every generation and the top_k candidates seen.
+        """
+        if method not in OPTIMIZATION_METHODS:
+            raise ValueError(f"Unknown method '{method}'. Expected one of {OPTIMIZATION_METHODS}")
+
+        if method == "grid":
+            candidates, scores, history = self._grid(grid_points)
+        elif method == "random":
+            candidates, scores, history = self._random(population, generations)
+        else:
+            candidates, scores, history = self._cross_entropy(population, generations)
+
+        searched = self.evaluations
+        base_decision = np.clip([float(self.base_inputs[n]) for n in self.names], self.lower, self.upper)
+        baseline = float(self.evaluate(base_decision[None, :])[0])
+
+        order = np.argsort(scores)[::-1][:top_k]
+        top = [{"inputs": dict(zip(self.names, candidates[i].tolist())), "objective": float(scores[i])} for i in order]
+        return {
+            "method": method,
+            "objective": self.objective,
+            "metric": self.metric,
+            "best": top[0],
+            "top": top,
+            "baseline_objective": baseline,
+            "improvement": top[0]["objective"] - baseline,
+            "history": history,
+            "evaluations": searched
+        }
+
+
+def _keep_best(best_c: Optional[np.ndarray], best_s: Optional[np.ndarray],
+               candidates: np.ndarray, scores: np.ndarray, keep: int = 32):
+    """Running pool of the best `keep` candidates seen so far."""
+    if best_c is not None:
+        candidates = np.concatenate([best_c, candidates])
+        scores = np.concatenate([best_s, scores])
+    order = np.argsort(scores)[::-1][:keep]
+    return candidates[order], scores[order]
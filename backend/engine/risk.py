@@ -1,107 +1,274 @@
-from typing import Dict, List, Any
+import math
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+from backend.engine.breakpoints import DEFAULT_GRID_POINTS, DEFAULT_SEARCH_FACTOR, default_bounds, solve_breakpoints
+from backend.engine.global_sensitivity import DEFAULT_SPREAD, input_ranges, run_sobol_analysis
+from backend.engine.stress_library import StressScenarioLibrary, load_stress_library
+from backend.engine.tail_risk import DEFAULT_TAIL_LEVELS
 
 class RiskAnalyzer:
-    def calculate_sensitivity(self, engine, base_inputs: Dict[str, float], metric: str = 'cash_flow') -> Dict[str, float]:
-        """
-        One-At-A-Time (OAT) Sensitivity Analysis.
-        Perturbs each input by +10% to measure impact on output metric.
-        Returns % change in output.
-        """
-        baseline_res = engine.run_deterministic(base_inputs)
-        base_val = baseline_res[metric]
-        
-        sensitivity = {}
-        for key in ['revenue', 'operational_costs', 'marketing_spend']:
-            if key not in base_inputs: continue
-            
-            # Perturb +10%
-            new_inputs = base_inputs.copy()
-            new_inputs[key] *= 1.10
-            
-            new_res = engine.run_deterministic(new_inputs)
-            new_val = new_res[metric]
-            
-            sensitivity[key] = (new_val - base_val) / base_val
-            
-        return sensitivity
-
-    def calculate_breakpoints(self, engine, base_inputs: Dict[str, float], threshold: float = 0.0) -> Dict[str, float]:
+    def calculate_sensitivity(self, engine, base_inputs: Dict[str, float], metric: str = 'cash_flow',
+                              inputs: Optional[List[str]] = None, delta: float = 0.10,
+                              central: bool = False) -> Dict[str, float]:
         """
-        Calculates at what value of each input the output metric crosses the threshold (break-even).
-        Assumes linear relationship for simplicity (or uses Newton-Raphson if complex, but here linear is fine).
+        One-At-A-Time (OAT) Sensitivity Analysis over every numeric input (or the given subset).
+        Perturbs each input by +delta (and -delta when central=True) relative to its base value,
+        evaluates all perturbations in one batched engine call, and returns elasticities:
+        % change in output per % change in input. Forward differences by default,
+        central differences (second-order accurate) when central=True.
+        Inputs with a zero base value have zero elasticity; a zero base output gives NaN.
         """
-        baseline_res = engine.run_deterministic(base_inputs)
-        base_val = baseline_res['cash_flow']
+        keys = inputs if inputs is not None else self._numeric_inputs(base_inputs)
 
-        breakpoints = {}
-        for key in ['revenue', 'operational_costs', 'marketing_spend']:
-            if key not in base_inputs: continue
+        # Row 0 is the baseline, row i+1 scales keys[i] by (1 + delta), row K+i+1 by (1 - delta)
+        overrides = self._perturbation_columns(base_inputs, keys, 1 + delta, central=central)
+        values = np.asarray(engine.run_deterministic_batch(overrides)[metric], dtype=float)
+        base_val = values[0]
+        k = len(keys)
 
-            # Simple linear extrapolation: y = mx + c
-            # We have point 1: (x1, y1) = (base_input, base_val)
-            # We need to find x where y = threshold.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if central:
+                elasticities = (values[1:k + 1] - values[k + 1:]) / (2 * delta * base_val)
+            else:
+                elasticities = (values[1:k + 1] - base_val) / (delta * base_val)
 
-            # Let's find slope 'm' by perturbing.
-            x1 = base_inputs[key]
-            y1 = base_val
+        zero_inputs = np.array([base_inputs[key] == 0 for key in keys], dtype=bool)
+        elasticities = np.where(zero_inputs, 0.0, elasticities)
+        return {key: float(e) for key, e in zip(keys, elasticities)}
 
-            # Perturb +1% for slope calculation
-            delta_x = x1 * 0.01 if x1 != 0 else 1.0
-            new_inputs = base_inputs.copy()
-            new_inputs[key] = x1 + delta_x
+    def _numeric_inputs(self, base_inputs: Dict[str, Any]) -> List[str]:
+        return [k for k, v in base_inputs.items()
+                if isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_))]
 
-            new_res = engine.run_deterministic(new_inputs)
-            y2 = new_res['cash_flow']
+    def _perturbation_columns(self, base_inputs: Dict[str, float], keys: List[str], factor: float,
+                              central: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Builds a columnar (1 + len(keys)) scenario table: a baseline row followed by one row per key,
+        where only that key is scaled by factor.
+        With central=True, a second block of len(keys) rows applies the mirrored scaling (2 - factor).
+        The table is one (rows x inputs) matrix, perturbed on its diagonal blocks in place.
+        """
+        names = self._numeric_inputs(base_inputs)
+        missing = [k for k in keys if k not in names]
+        if missing:
+            raise ValueError(f"Cannot perturb non-numeric or unknown inputs: {missing}")
 
-            slope = (y2 - y1) / delta_x
+        k = len(keys)
+        signs = [1.0, -1.0] if central else [1.0]
+        matrix = np.tile(np.array([base_inputs[n] for n in names], dtype=float), (1 + k * len(signs), 1))
+        cols = np.array([names.index(key) for key in keys], dtype=np.intp)
+        for block, sign in enumerate(signs):
+            rows = 1 + block * k + np.arange(k)
+            matrix[rows, cols] *= 1 + sign * (factor - 1)
+        return {name: matrix[:, j] for j, name in enumerate(names)}
 
-            if slope == 0:
-                breakpoints[key] = float('inf') # No impact
-            else:
-                # y - y1 = m(x - x1)
-                # threshold - y1 = m(x - x1)
-                # (threshold - y1)/m = x - x1
-                # x = x1 + (threshold - y1)/m
-                x_break = x1 + (threshold - y1) / slope
-                breakpoints[key] = x_break
+    def calculate_global_sensitivity(self, engine, base_inputs: Dict[str, float], metric: str = 'cash_flow',
+                                     inputs: Optional[List[str]] = None, samples: int = 10_000,
+                                     ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                                     spread: float = DEFAULT_SPREAD, sampling: str = "pseudo",
+                                     bootstrap: int = 100, confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        Global variance-based (Sobol) sensitivity: first-order indices (Saltelli estimator) and
+        total-order indices (Jansen estimator) with bootstrap confidence intervals.
+        Unlike OAT, total - first exposes interactions and nonlinearity.
 
-        return breakpoints
+        Each input varies uniformly over ranges[name], or base +/- spread * |base| by default.
+        Defaults to the numeric inputs the model actually reads. Blocks run on the engine's
+        executor / worker pool and are seeded from the engine seed.
+        first_order / total_order are {input: index} dicts, so either can feed DriverAnalyzer.
+        """
+        base = {**engine.baseline, **base_inputs}
+        keys = inputs if inputs is not None else [k for k in self._numeric_inputs(base) if k in engine.model.inputs]
+        bounds = input_ranges(base, keys, spread, ranges)
+        with engine._block_mapper() as map_blocks:
+            return run_sobol_analysis(engine.model, metric, keys, bounds, base, samples,
+                                      engine._seed_sequence(), map_blocks, sampling=sampling,
+                                      bootstrap=bootstrap, confidence=confidence)
 
-    def run_stress_test(self, engine, base_inputs: Dict[str, float]) -> Dict[str, Any]:
+    def calculate_breakpoints(self, engine, base_inputs: Dict[str, float], threshold: float = 0.0,
+                              metric: str = 'cash_flow', constraints: Dict[str, float] = None,
+                              bounds: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, float]:
         """
-        Runs predefined stress scenarios (e.g., 'Recession', 'Supply Shock').
+        Calculates at what value of each input the output metric crosses the threshold (break-even).
+        Solved numerically (see solve_breakpoints), so nonlinear models and clamped inputs are handled.
+        Inputs with no crossing inside their feasible range map to inf.
+        """
+        solved = self.solve_breakpoints(engine, base_inputs, [threshold], metric=metric,
+                                        constraints=constraints, bounds=bounds)
+        threshold = float(threshold)
+        return {key: (values[threshold] if values[threshold] is not None else float('inf'))
+                for key, values in solved["breakpoints"].items()}
+
+    def solve_breakpoints(self, engine, base_inputs: Dict[str, float], thresholds: List[float],
+                          metric: str = 'cash_flow', inputs: Optional[List[str]] = None,
+                          constraints: Dict[str, float] = None,
+                          bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                          search_factor: float = DEFAULT_SEARCH_FACTOR, grid_points: int = DEFAULT_GRID_POINTS,
+                          xtol: float = 1e-9, max_iter: int = 100) -> Dict[str, Any]:
         """
-        scenarios = {
-            "Recession": {"revenue": 0.8}, # -20% Revenue
-            "Inflation": {"operational_costs": 1.15}, # +15% Costs
-            "Aggressive Growth": {"marketing_spend": 1.5, "revenue": 1.2} # +50% Spend, +20% Revenue
+        Break-even values for every input and every threshold at once, varying one input at a time.
+
+        Each input is searched within bounds[name], else base +/- search_factor * max(|base|, 1)
+        (non-negative inputs stay non-negative); constraint maxima cap the range and are applied by
+        the engine as usual. All (input, threshold) pairs share one bracketing sweep and are then
+        refined together, one batched engine call per solver iteration.
+
+        Returns {"breakpoints": {input: {threshold: value or None}},
+                 "no_crossing": {input: [thresholds without a crossing in range]},
+                 "bounds": {input: [low, high]}, "iterations": n, "evaluations": n}.
+        """
+        base = {**engine.baseline, **base_inputs}
+        names = self._numeric_inputs(base)
+        keys = inputs if inputs is not None else [k for k in names if k in engine.model.inputs]
+        missing = [k for k in keys if k not in names]
+        if missing:
+            raise ValueError(f"Cannot solve breakpoints for non-numeric or unknown inputs: {missing}")
+
+        base_row = np.array([base[n] for n in names], dtype=float)
+        cols = np.array([names.index(k) for k in keys], dtype=np.intp)
+        base_values = base_row[cols]
+
+        search = default_bounds(base_values, search_factor)
+        for i, key in enumerate(keys):
+            if bounds and key in bounds:
+                search[i] = bounds[key]
+            if constraints and key in constraints:
+                search[i, 1] = min(search[i, 1], constraints[key])
+
+        def evaluate(input_index: np.ndarray, values: np.ndarray) -> np.ndarray:
+            matrix = np.tile(base_row, (len(values), 1))
+            matrix[np.arange(len(values)), cols[input_index]] = values
+            columns = {name: matrix[:, j] for j, name in enumerate(names)}
+            return np.asarray(engine.run_deterministic_batch(columns, constraints)[metric], dtype=float)
+
+        solved = solve_breakpoints(evaluate, base_values, search, thresholds,
+                                   grid_points=grid_points, xtol=xtol, max_iter=max_iter)
+
+        thresholds = [float(t) for t in thresholds]
+        roots, found = solved["roots"], solved["found"]
+        return {
+            "metric": metric,
+            "breakpoints": {key: {t: (float(roots[i, j]) if found[i, j] else None) for j, t in enumerate(thresholds)}
+                            for i, key in enumerate(keys)},
+            "no_crossing": {key: [t for j, t in enumerate(thresholds) if not found[i, j]]
+                            for i, key in enumerate(keys) if not found[i].all()},
+            "bounds": {key: search[i].tolist() for i, key in enumerate(keys)},
+            "iterations": solved["iterations"],
+            "evaluations": solved["evaluations"]
         }
 
+    def run_stress_test(self, engine, base_inputs: Dict[str, float], library: Optional[StressScenarioLibrary] = None,
+                        packs: Optional[List[str]] = ("core",)) -> Dict[str, Any]:
+        """
+        Runs stress scenarios from the scenario library (default: the 'core' pack, e.g. 'Recession').
+        All scenarios are evaluated together in one batched engine call.
+        """
+        library = library or load_stress_library()
+        rows = library.select(packs)
+        columns = library.scenario_columns(base_inputs, rows)
+        cash_flow = engine.run_deterministic_batch(columns)["cash_flow"]
+
         results = {}
-        for name, modifiers in scenarios.items():
-            # Apply modifiers
-            scenario_inputs = base_inputs.copy()
-            for key, multiplier in modifiers.items():
-                if key in scenario_inputs:
-                    scenario_inputs[key] *= multiplier
-
-            res = engine.run_deterministic(scenario_inputs)
-            results[name] = {
-                "inputs": scenario_inputs,
-                "cash_flow": res["cash_flow"]
+        for i, row in enumerate(rows):
+            results[library.names[row]] = {
+                "inputs": {k: float(col[i]) for k, col in columns.items()},
+                "cash_flow": float(cash_flow[i])
             }
         return results
 
+    def run_stress_library(self, engine, base_inputs: Dict[str, float], library: Optional[StressScenarioLibrary] = None,
+                           packs: Optional[List[str]] = None, metric: str = 'cash_flow',
+                           constraints: Dict[str, float] = None, monte_carlo: bool = False, iterations: int = 1000,
+                           rank_by: Optional[str] = None, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        Evaluates a whole stress library (or selected packs) as one batched computation and
+        returns one page of scenarios ranked worst-first (lowest metric value first).
+
+        monte_carlo: also simulate every scenario under the engine's uncertainty model
+            (one run_batch call) and report p10/p50/p90/mean/std_dev per scenario.
+        rank_by: 'value' (deterministic metric, default) or, with monte_carlo, one of
+            'p10', 'p50', 'p90', 'mean'.
+        Only the rows on the requested page are materialized into response dicts.
+        """
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive")
+        rank_by = rank_by or "value"
+        mc_stats = ("p10", "p50", "p90", "mean", "std_dev")
+        if rank_by != "value" and (not monte_carlo or rank_by not in mc_stats[:4]):
+            raise ValueError(f"Cannot rank by '{rank_by}'. Use 'value'{', p10, p50, p90 or mean' if monte_carlo else ''}")
+
+        library = library or load_stress_library()
+        rows = library.select(packs)
+        columns = library.scenario_columns(base_inputs, rows)
+        base_value = float(engine.run_deterministic(base_inputs, constraints)[metric])
+        values = np.asarray(engine.run_deterministic_batch(columns, constraints)[metric], dtype=float)
+
+        mc = engine.run_batch(columns, constraints, iterations=iterations, metric=metric) if monte_carlo else None
+        key = values if rank_by == "value" else mc[rank_by]
+
+        # Worst-first; only the first page * page_size positions need to be ordered
+        stop = min(page * page_size, len(rows))
+        start = min((page - 1) * page_size, stop)
+        if stop < len(rows):
+            head = np.argpartition(key, stop - 1)[:stop]
+            order = head[np.lexsort((head, key[head]))]
+        else:
+            order = np.lexsort((np.arange(len(rows)), key))
+
+        results = []
+        for rank, i in enumerate(order[start:stop], start=start + 1):
+            row = rows[i]
+            entry = {
+                "rank": rank,
+                "name": library.names[row],
+                "pack": library.packs[row],
+                "description": library.descriptions[row],
+                "value": float(values[i]),
+                "delta": float(values[i]) - base_value,
+                "inputs": {k: float(col[i]) for k, col in columns.items()},
+            }
+            if mc is not None:
+                entry.update({stat: float(mc[stat][i]) for stat in mc_stats})
+            results.append(entry)
+
+        return {
+            "library_version": library.version,
+            "metric": metric,
+            "ranked_by": rank_by,
+            "baseline_value": base_value,
+            "total": len(rows),
+            "page": page,
+            "page_size": page_size,
+            "results": results
+        }
+
     def prob_of_failure(self, monte_carlo_results: Dict[str, Any], threshold: float = 0.0) -> float:
         """
         Calculates probability (0.0-1.0) that the metric falls below a threshold (e.g., negative cash flow).
-        Note: This requires access to the full distribution array, which we simplified in the engine response.
-        For now, we approximate using normal distribution properties (Z-score) since we have mean/std.
+        Uses, in order: the empirical value computed during the run (tail_thresholds), the retained
+        distribution (retain=...), or a normal approximation from mean/std_dev when neither is available.
         """
+        tail = monte_carlo_results.get('tail_risk')
+        if tail and float(threshold) in tail['prob_below']:
+            return tail['prob_below'][float(threshold)]
+
+        distribution = monte_carlo_results.get('distribution')
+        if distribution is not None:
+            return distribution.prob_below(threshold)
+
         if monte_carlo_results['std_dev'] == 0: return 0.0
-        
-        import scipy.stats as stats
+
+        # Normal CDF via erfc; avoids importing scipy.stats on every call
         z_score = (threshold - monte_carlo_results['mean']) / monte_carlo_results['std_dev']
-        prob = stats.norm.cdf(z_score)
-        return float(prob)
+        return 0.5 * math.erfc(-z_score / math.sqrt(2))
+
+    def tail_risk(self, monte_carlo_results: Dict[str, Any], thresholds: List[float] = (0.0,),
+                  levels: List[float] = DEFAULT_TAIL_LEVELS) -> Dict[str, Dict[float, float]]:
+        """
+        Empirical probability of failure at each threshold plus VaR/CVaR at each confidence level,
+        read off the distribution retained by run_monte_carlo(retain=...). No re-simulation.
+        """
+        distribution = monte_carlo_results.get('distribution')
+        if distribution is None:
+            raise ValueError("Monte Carlo results carry no distribution; run with retain='samples', 'histogram' or 'sketch'")
+        return distribution.tail_risk(thresholds, levels)
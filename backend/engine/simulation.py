@@ -1,16 +1,54 @@
 import numpy as np
-from typing import Dict, List, Any
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
+from backend.engine.distributions import UncertaintySpec, compile_uncertainty
+from backend.engine.model import ModelDefinition, compile_model
+from backend.engine.sampling import SAMPLING_METHODS, standard_normals
+from backend.engine.sketches import KLLSketch, RunningMoments
+from backend.engine.tail_risk import (DEFAULT_TAIL_LEVELS, RETAIN_MODES, HistogramDistribution,
+                                      SampleDistribution, SketchDistribution)
+
+DEFAULT_QUANTILE_ERROR = 0.001
+
+# Columnar scenario batch: input name -> array of per-scenario values.
+# Row-form input (a list of override dicts) is accepted and converted once.
+ScenarioColumns = Dict[str, np.ndarray]
+BatchOverrides = Union[Dict[str, Sequence[float]], List[Dict[str, float]]]
 
 class SimulationEngine:
-    def __init__(self, baseline_data: Dict[str, float]):
+    # Upper bound on (scenarios x iterations) cells held in memory at once by run_batch.
+    MAX_BATCH_CELLS = 2_000_000
+    # Above this many iterations run_monte_carlo always streams instead of materializing all draws.
+    MAX_EXACT_ITERATIONS = 1_000_000
+    DEFAULT_CHUNK_SIZE = 65_536
+    # Block size used between convergence checks when target_ci_width is set.
+    CONVERGENCE_BLOCK_SIZE = 1_024
+    MIN_CONVERGENCE_BLOCKS = 10
+
+    def __init__(self, baseline_data: Dict[str, float], seed: Optional[int] = None,
+                 workers: int = 1, executor: Optional[Executor] = None, model: Optional[ModelDefinition] = None,
+                 uncertainty: Optional[UncertaintySpec] = None):
         """
         baseline_data: Dictionary containing 'revenue', 'fixed_costs', 'operational_costs', 'marketing_spend'
+        seed: Root seed for all random draws. The same seed reproduces results exactly; None uses fresh entropy.
+        workers: Process count for Monte Carlo blocks when no executor is given (1 = run inline).
+        executor: Optional long-lived concurrent.futures executor to run Monte Carlo blocks on.
+        model: Optional metric definitions ({metric: expression}); defaults to the cash flow model.
+            Compiled plans are cached by definition hash, so repeat definitions skip parsing.
+        uncertainty: Optional input distribution spec (see backend.engine.distributions);
+            defaults to normal noise on revenue (5%) and operational costs (3%).
         """
         self.baseline = baseline_data
+        self.seed = seed
+        self.workers = workers
+        self.executor = executor
+        self.model = compile_model(model)
+        self.uncertainty = compile_uncertainty(uncertainty)
 
     def _calculate_cash_flow(self, data: Dict[str, float]) -> float:
-        """Deterministic Cash Flow Calculation"""
-        return data['revenue'] - (data['fixed_costs'] + data['operational_costs'] + data['marketing_spend'])
+        """Deterministic Cash Flow Calculation (works on scalars and on scenario columns)"""
+        return self.model.evaluate(data, ["cash_flow"])["cash_flow"]
 
     def run_deterministic(self, overrides: Dict[str, float] = None, constraints: Dict[str, float] = None) -> Dict[str, float]:
         """
@@ -20,7 +58,7 @@ class SimulationEngine:
         data = self.baseline.copy()
         if overrides:
             data.update(overrides)
-        
+
         # Apply constraints
         if constraints:
             for key, max_val in constraints.items():
@@ -30,36 +68,551 @@ class SimulationEngine:
                     # but for now, let's clamp silently or we can return a warning flag.
                     data[key] = max_val
 
-        cash_flow = self._calculate_cash_flow(data)
-        return {"cash_flow": cash_flow, "inputs": data}
+        metrics = self.model.evaluate(data)
+        return {**{m: float(v) for m, v in metrics.items()}, "inputs": data}
+
+    def _resolve_batch(self, overrides: BatchOverrides = None,
+                       constraints: Dict[str, Any] = None) -> Tuple[int, ScenarioColumns]:
+        """
+        Builds the columnar input table for a scenario batch.
+        overrides: dict of per-scenario value arrays, or a list of override dicts (one per scenario).
+        constraints: dict of maximum allowed values, either scalars or per-scenario arrays.
+        Baseline values are broadcast, never copied per scenario.
+        """
+        rows = None
+        if isinstance(overrides, list):
+            rows = len(overrides)
+            keys = sorted({k for row in overrides for k in row})
+            overrides = {
+                k: [row.get(k, self.baseline.get(k, np.nan)) for row in overrides]
+                for k in keys
+            }
+        overrides = overrides or {}
+
+        columns = {k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in overrides.items()}
+        limits = {k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in (constraints or {}).items()}
+
+        lengths = {len(v) for v in list(columns.values()) + list(limits.values())} - {1}
+        if len(lengths) > 1:
+            raise ValueError(f"Scenario columns have mismatched lengths: {sorted(lengths)}")
+        n = lengths.pop() if lengths else (rows or 1)
+
+        data = {}
+        for key, value in self.baseline.items():
+            data[key] = np.broadcast_to(np.asarray(value, dtype=float), (n,))
+        for key, values in columns.items():
+            data[key] = np.broadcast_to(values, (n,))
+
+        # Apply constraints (clamp to maximum, same policy as run_deterministic)
+        for key, max_vals in limits.items():
+            if key in data:
+                data[key] = np.minimum(data[key], max_vals)
+
+        return n, data
+
+    def run_deterministic_batch(self, overrides: BatchOverrides = None, constraints: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Vectorized run_deterministic over N scenarios.
+        Returns per-scenario arrays for every model metric and the resolved input columns.
+        """
+        n, data = self._resolve_batch(overrides, constraints)
+        metrics = {m: np.broadcast_to(v, (n,)) for m, v in self.model.evaluate(data).items()}
+        return {**metrics, "inputs": data, "n_scenarios": n}
+
+    def run_batch(self, overrides: BatchOverrides = None, constraints: Dict[str, Any] = None, iterations: int = 1000,
+                  metric: str = "cash_flow", draws: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Monte Carlo over N scenarios as one (N x iterations) computation.
+        Uses the same uncertainty model as run_monte_carlo. Scenarios are processed in
+        row blocks so at most MAX_BATCH_CELLS outcomes are held in memory at once.
+        draws: Optional (iterations x uncertainty.dims) standard-normal matrix shared by every
+            scenario (common random numbers); each scenario then matches run_monte_carlo(draws=draws).
+        Returns per-scenario arrays for p10/p50/p90/mean/std_dev of the given model metric.
+        """
+        n, data = self._resolve_batch(overrides, constraints)
+        stats = _RowStats(n)
+        if draws is not None:
+            iterations = len(draws)
+        for block, cash_flow_dist in self._simulate_rows(n, data, iterations, metric, draws=draws):
+            stats.add(block, cash_flow_dist)
+
+        return {**stats.result(), "iterations": iterations, "n_scenarios": n}
+
+    def _simulate_rows(self, n: int, data: ScenarioColumns, iterations: int, metric: str,
+                       shock_correlation: float = 0.0, draws: Optional[np.ndarray] = None):
+        """
+        Yields (row slice, rows x iterations outcomes) for a columnar scenario table, in row blocks
+        of at most MAX_BATCH_CELLS outcomes. Uses the same uncertainty model as run_monte_carlo.
+        shock_correlation: share of each row's noise variance that is common to all rows within an
+            iteration (0 = independent rows, 1 = every row sees the same draw).
+        draws: Optional (iterations x uncertainty.dims) standard-normal matrix applied to every row
+            (common random numbers) instead of fresh per-row noise.
+        """
+        rows_per_block = max(1, self.MAX_BATCH_CELLS // max(iterations, 1))
+        if draws is not None:
+            shared = np.asarray(draws).T[:, None, :]
+        else:
+            rng = np.random.default_rng(self._seed_sequence())
+            common = rng.standard_normal((self.uncertainty.dims, 1, iterations)) if shock_correlation > 0 else None
+
+        for start in range(0, n, rows_per_block):
+            block = slice(start, min(start + rows_per_block, n))
+            rows = block.stop - block.start
+            inputs = {k: v[block, None] for k, v in data.items()}
+
+            if draws is not None:
+                noise = shared
+            else:
+                # All inputs for the block drawn in one call
+                noise = rng.standard_normal((self.uncertainty.dims, rows, iterations))
+                if common is not None:
+                    noise *= np.sqrt(1 - shock_correlation)
+                    noise += np.sqrt(shock_correlation) * common
+            outcomes = self.model.evaluate(self.uncertainty.apply(inputs, noise), [metric])[metric]
+            yield block, np.broadcast_to(outcomes, (rows, iterations))
+
+    def run_portfolio(self, entity_inputs: Dict[str, Sequence[float]], entity_ids: Optional[Sequence[Any]] = None,
+                      constraints: Dict[str, Any] = None, iterations: int = 1000, metric: str = "cash_flow",
+                      shock_correlation: float = 0.0) -> Dict[str, Any]:
+        """
+        Simulates every entity (store, SKU, ...) of a portfolio in one vectorized pass.
+        entity_inputs: entity x input matrix as columns ({input: per-entity values}); missing
+            values (NaN) fall back to the engine baseline.
+        Entities are processed in memory-bounded row blocks (see run_batch); the portfolio total
+        is accumulated per iteration, so the rolled-up distribution needs only O(iterations) memory.
+        shock_correlation: common share of the shock variance across entities (e.g. a shared
+            demand shock). With 0, entity shocks are independent and diversify in the total.
+
+        Returns per-entity p10/p50/p90/mean/std_dev arrays and the rolled-up total distribution.
+        """
+        if not 0 <= shock_correlation <= 1:
+            raise ValueError("shock_correlation must be in [0, 1]")
+        columns = {}
+        for key, values in entity_inputs.items():
+            values = np.asarray(values, dtype=float)
+            if key in self.baseline:
+                values = np.where(np.isnan(values), float(self.baseline[key]), values)
+            columns[key] = values
+
+        n, data = self._resolve_batch(columns, constraints)
+        if entity_ids is not None and len(entity_ids) != n:
+            raise ValueError(f"Got {len(entity_ids)} entity ids for {n} entities")
+
+        stats = _RowStats(n)
+        total = np.zeros(iterations)
+        for block, outcomes in self._simulate_rows(n, data, iterations, metric, shock_correlation):
+            stats.add(block, outcomes)
+            total += outcomes.sum(axis=0)
+
+        return {
+            "entities": list(entity_ids) if entity_ids is not None else list(range(n)),
+            "per_entity": stats.result(),
+            "rollup": _summarize(total),
+            "iterations": iterations,
+            "n_entities": n
+        }
+
+    def _seed_sequence(self) -> np.random.SeedSequence:
+        """Root seed for one engine call. An unseeded engine draws fresh OS entropy per call."""
+        return np.random.SeedSequence(self.seed)
+
+    def run_time_series(self, overrides: Dict[str, float] = None, constraints: Dict[str, float] = None,
+                        periods: int = 12, iterations: int = 1000, growth_rate: Union[float, Sequence[float]] = 0.0,
+                        seasonality: Optional[Sequence[float]] = None, opening_cash: float = 0.0,
+                        sampling: str = "pseudo", draws: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Simulates a multi-period cash flow path for every iteration as one (periods x iterations) array.
+        Input values are per-period amounts; per period t:
+            revenue_t = revenue * growth_t * seasonality[t]
+        perturbed by the engine's uncertainty model with independent draws per period,
+        and cash_balance_t = opening_cash + cumulative net cash flow.
+
+        growth_rate: Per-period growth (scalar, compounded) or an explicit per-period rate sequence.
+        seasonality: Multipliers cycled over the horizon (e.g. 12 monthly factors).
+        draws: Optional (iterations x dims*periods) standard-normal matrix (e.g. from a DrawCache),
+            where dims is self.uncertainty.dims.
+
+        Returns per-period p10/p50/p90/mean bands for cash_flow and cash_balance, reduced
+        along the iteration axis in one vectorized pass per metric.
+        """
+        inputs = self.run_deterministic(overrides, constraints)["inputs"]
+
+        if draws is None:
+            draws = standard_normals(sampling, iterations, self.uncertainty.dims * periods,
+                                     np.random.default_rng(self._seed_sequence()))
+        # Period-major layout so reductions run over contiguous memory
+        z = np.ascontiguousarray(np.asarray(draws).T).reshape(self.uncertainty.dims, periods, -1)
+
+        growth = _growth_factors(periods, growth_rate, seasonality)
+        inputs = dict(inputs, revenue=(inputs['revenue'] * growth)[:, None])
+        cash_flow = self.model.evaluate(self.uncertainty.apply(inputs, z), ["cash_flow"])["cash_flow"]
+        cash_flow = np.broadcast_to(cash_flow, z.shape[1:])
+        cash_balance = opening_cash + np.cumsum(cash_flow, axis=0)
+
+        return {
+            "periods": periods,
+            "iterations": z.shape[2],
+            "cash_flow": _period_bands(cash_flow),
+            "cash_balance": _period_bands(cash_balance)
+        }
+
+    def run_time_series_batch(self, overrides: BatchOverrides = None, constraints: Dict[str, Any] = None,
+                              periods: int = 12, iterations: int = 1000, growth_rate: Union[float, Sequence[float]] = 0.0,
+                              seasonality: Optional[Sequence[float]] = None, opening_cash: float = 0.0,
+                              sampling: str = "pseudo", draws: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        run_time_series over N scenarios that share one set of draws (common random numbers), as
+        one (N x periods x iterations) computation processed in row blocks of at most MAX_BATCH_CELLS.
+        Returns per-scenario (N x periods) p10/p50/p90/mean arrays for cash_flow and cash_balance;
+        row i equals run_time_series for scenario i with the same draws.
+        """
+        n, data = self._resolve_batch(overrides, constraints)
+        if draws is None:
+            draws = standard_normals(sampling, iterations, self.uncertainty.dims * periods,
+                                     np.random.default_rng(self._seed_sequence()))
+        z = np.ascontiguousarray(np.asarray(draws).T).reshape(self.uncertainty.dims, periods, -1)
+        iterations = z.shape[2]
+        growth = _growth_factors(periods, growth_rate, seasonality)
+
+        bands = {name: {stat: np.empty((n, periods)) for stat in ("p10", "p50", "p90", "mean")}
+                 for name in ("cash_flow", "cash_balance")}
+        rows_per_block = max(1, self.MAX_BATCH_CELLS // (periods * iterations))
+        for start in range(0, n, rows_per_block):
+            block = slice(start, min(start + rows_per_block, n))
+            inputs = {k: v[block, None, None] for k, v in data.items()}
+            inputs["revenue"] = inputs["revenue"] * growth[None, :, None]
+            cash_flow = self.model.evaluate(self.uncertainty.apply(inputs, z), ["cash_flow"])["cash_flow"]
+            cash_flow = np.broadcast_to(cash_flow, (block.stop - block.start, periods, iterations))
+            cash_balance = opening_cash + np.cumsum(cash_flow, axis=1)
+            for name, paths in (("cash_flow", cash_flow), ("cash_balance", cash_balance)):
+                p10, p50, p90 = np.percentile(paths, [10, 50, 90], axis=2)
+                bands[name]["p10"][block] = p10
+                bands[name]["p50"][block] = p50
+                bands[name]["p90"][block] = p90
+                bands[name]["mean"][block] = paths.mean(axis=2)
+
+        return {"periods": periods, "iterations": iterations, "n_scenarios": n, **bands}
+
+    @contextmanager
+    def _block_mapper(self):
+        """
+        Yields an ordered map(fn, tasks) for Monte Carlo blocks: the injected executor,
+        a process pool scoped to this call when workers > 1, or the builtin map (inline).
+        """
+        if self.executor is not None:
+            yield self.executor.map
+        elif self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                yield pool.map
+        else:
+            yield map
 
-    def run_monte_carlo(self, overrides: Dict[str, float] = None, constraints: Dict[str, float] = None, iterations: int = 1000) -> Dict[str, Any]:
+    def run_monte_carlo(self, overrides: Dict[str, float] = None, constraints: Dict[str, float] = None, iterations: int = 1000,
+                        chunk_size: Optional[int] = None, quantile_error: float = DEFAULT_QUANTILE_ERROR,
+                        sampling: str = "pseudo", target_ci_width: Optional[float] = None,
+                        draws: Optional[np.ndarray] = None, metric: str = "cash_flow",
+                        retain: Optional[str] = None, tail_thresholds: Optional[Sequence[float]] = None,
+                        tail_levels: Sequence[float] = DEFAULT_TAIL_LEVELS, histogram_bins: int = 256) -> Dict[str, Any]:
         """
         Runs Monte Carlo simulation.
-        Perturbs 'revenue' by +/- 10% and 'costs' by +/- 5% (simulating uncertainty).
+        Samples the uncertain inputs from the engine's uncertainty model (by default revenue
+        5% std, operational costs 3% std) and evaluates the compiled model on every draw.
+
+        chunk_size: If set (or if iterations exceeds MAX_EXACT_ITERATIONS), runs in streaming mode:
+            draws are generated in fixed-size blocks and folded into running moments and a
+            KLL quantile sketch, so peak memory is independent of iterations.
+        quantile_error: Normalized rank error bound for streamed p10/p50/p90 (0.001 = 0.1%).
+        sampling: 'pseudo', 'antithetic', 'lhs' or 'sobol' (see backend.engine.sampling).
+        target_ci_width: If set, iterations becomes an upper bound; sampling stops after the first
+            block where the 95% confidence intervals on both the mean and p10 are narrower than
+            this width (in metric units). Intervals are estimated from per-block replicates
+            (at least MIN_CONVERGENCE_BLOCKS). The iterations actually used are reported.
+        draws: Optional precomputed (iterations x uncertainty.dims) standard-normal matrix, e.g. from
+            a DrawCache. The outcomes are a rescaling of these draws (common random numbers), so
+            no sampling happens and iterations/chunk_size/sampling/target_ci_width are ignored.
+        metric: Model metric to summarize (default 'cash_flow').
+        retain: Optionally keep the outcome distribution as result['distribution'] (see
+            backend.engine.tail_risk): 'samples' (sorted float32 outcomes, exact mode only),
+            'histogram' (histogram_bins fixed-width bins) or 'sketch' (KLL sketch).
+        tail_thresholds: If set, result['tail_risk'] holds the empirical probability of falling
+            below each threshold plus VaR/CVaR at each of tail_levels, computed from this run's
+            outcomes (exact) or its quantile sketch (streaming); no normality assumption.
+
+        Iterations are always split into fixed-size blocks, each with its own child seed spawned
+        from the engine seed. Blocks may run on any worker; results are merged in block order,
+        so a seeded engine returns bit-identical summaries for any worker count.
         """
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method '{sampling}'. Expected one of {SAMPLING_METHODS}")
+        if retain is not None and retain not in RETAIN_MODES:
+            raise ValueError(f"Unknown retain mode '{retain}'. Expected one of {RETAIN_MODES}")
+
         base_run = self.run_deterministic(overrides, constraints)
         base_inputs = base_run["inputs"]
-        
-        # Vectorized perturbation
-        # Random normal distribution for Revenue (std dev = 5% of mean)
-        rev_dist = np.random.normal(base_inputs['revenue'], base_inputs['revenue'] * 0.05, iterations)
-        
-        # Random normal for Var Costs (std dev = 3% of mean)
-        op_cost_dist = np.random.normal(base_inputs['operational_costs'], base_inputs['operational_costs'] * 0.03, iterations)
-        
-        # Apply constraints to distributions if needed (e.g. costs cannot exceed constraint even with perturbation)
-        # For simplicity, we assume constraints apply to the BASE DECISION, not the stochastic outcome of external factors.
-        # However, if 'marketing_spend' was perturbed, we would clamp it. But here it's fixed in the base inputs.
-
-        # Calculate distribution of outcomes
-        cash_flow_dist = rev_dist - (base_inputs['fixed_costs'] + op_cost_dist + base_inputs['marketing_spend'])
-        
+
+        distribution_options = (retain, tail_thresholds, tail_levels, histogram_bins, quantile_error)
+        if draws is not None:
+            outcomes = _outcomes_from_normals(self.model, self.uncertainty, metric, base_inputs, draws)
+            return {**_summarize(outcomes), **_distribution_outputs(*distribution_options, outcomes=outcomes)}
+
+        streaming = chunk_size is not None or iterations > self.MAX_EXACT_ITERATIONS
+        if streaming and retain == "samples":
+            raise ValueError("retain='samples' would materialize every draw; use 'histogram' or 'sketch' when streaming")
+        early_stopping = target_ci_width is not None
+        block_size = chunk_size or (self.CONVERGENCE_BLOCK_SIZE if early_stopping else self.DEFAULT_CHUNK_SIZE)
+        sizes = [min(block_size, iterations - start) for start in range(0, iterations, block_size)]
+        seeds = self._seed_sequence().spawn(len(sizes))
+        tasks = [(self.model, self.uncertainty, metric, base_inputs, size, seed, sampling, quantile_error if streaming else None)
+                 for size, seed in zip(sizes, seeds)]
+
+        # Without early stopping all blocks are submitted at once; with it, blocks go out in
+        # waves of `workers` and are checked one by one in block order, so the stopping point
+        # does not depend on the worker count.
+        wave = max(1, self.workers) if early_stopping else max(1, len(tasks))
+
+        moments = RunningMoments()
+        sketch = KLLSketch.from_error(quantile_error)
+        samples = []
+        block_means, block_p10s = [], []
+        used = 0
+        ci_width = None
+        with self._block_mapper() as map_blocks:
+            for start in range(0, len(tasks), wave):
+                for result in map_blocks(_simulate_block, tasks[start:start + wave]):
+                    if streaming:
+                        block_moments, block_sketch = result
+                        moments.merge(block_moments)
+                        sketch.merge(block_sketch)
+                        used += block_moments.count
+                        if early_stopping:
+                            block_means.append(block_moments.mean)
+                            block_p10s.append(block_sketch.quantiles([0.10])[0])
+                    else:
+                        samples.append(result)
+                        used += len(result)
+                        if early_stopping:
+                            block_means.append(result.mean())
+                            block_p10s.append(np.percentile(result, 10))
+
+                    if early_stopping and len(block_means) >= self.MIN_CONVERGENCE_BLOCKS:
+                        ci_width = _confidence_widths(block_means, block_p10s)
+                        if max(ci_width.values()) <= target_ci_width:
+                            break
+                else:
+                    continue
+                break
+
+        if streaming:
+            p10, p50, p90 = sketch.quantiles([0.10, 0.50, 0.90])
+            result = {
+                "p10": float(p10),
+                "p50": float(p50),
+                "p90": float(p90),
+                "mean": moments.mean,
+                "std_dev": moments.std,
+                "iterations": used,
+                "quantile_error": sketch.epsilon
+            }
+            result.update(_distribution_outputs(*distribution_options, sketch=sketch))
+        else:
+            outcomes = np.concatenate(samples)
+            result = _summarize(outcomes)
+            result.update(_distribution_outputs(*distribution_options, outcomes=outcomes))
+
+        if sampling != "pseudo":
+            result["sampling"] = sampling
+        if early_stopping:
+            result["ci_width"] = ci_width
+        return result
+
+
+    def iter_monte_carlo(self, overrides: Dict[str, float] = None, constraints: Dict[str, float] = None,
+                         iterations: int = 1_000_000, report_every: int = 10_000, block_size: Optional[int] = None,
+                         quantile_error: float = DEFAULT_QUANTILE_ERROR, sampling: str = "pseudo",
+                         metric: str = "cash_flow",
+                         should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Progressive run_monte_carlo: yields running estimates every report_every iterations
+        (rounded up to whole blocks) instead of one summary at the end.
+
+        Each update carries p10/p50/p90 (from a KLL sketch), mean/std_dev (running moments),
+        the iterations used so far and ci_width, the 95% confidence widths on the mean and p10
+        from the per-block replicates (None until MIN_CONVERGENCE_BLOCKS blocks are in).
+        The last update has done=True. Blocks are simulated lazily, so a consumer that stops
+        iterating also stops the simulation. should_stop is polled before every block: once it
+        returns True the run ends at that block boundary, after yielding the estimate so far
+        (done=False) if it has not been reported yet.
+
+        Blocks use the same spawned seeds as run_monte_carlo, so the final update matches
+        run_monte_carlo(iterations=iterations, chunk_size=block_size) for a seeded engine.
+        """
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method '{sampling}'. Expected one of {SAMPLING_METHODS}")
+        if iterations < 1 or report_every < 1:
+            raise ValueError("iterations and report_every must be positive")
+
+        base_inputs = self.run_deterministic(overrides, constraints)["inputs"]
+        block_size = block_size or min(report_every, self.CONVERGENCE_BLOCK_SIZE)
+        sizes = [min(block_size, iterations - start) for start in range(0, iterations, block_size)]
+        seeds = self._seed_sequence().spawn(len(sizes))
+
+        moments = RunningMoments()
+        sketch = KLLSketch.from_error(quantile_error)
+        block_means, block_p10s = [], []
+
+        def update(done: bool) -> Dict[str, Any]:
+            p10, p50, p90 = sketch.quantiles([0.10, 0.50, 0.90])
+            enough = len(block_means) >= self.MIN_CONVERGENCE_BLOCKS
+            return {
+                "p10": float(p10),
+                "p50": float(p50),
+                "p90": float(p90),
+                "mean": moments.mean,
+                "std_dev": moments.std,
+                "iterations": moments.count,
+                "total_iterations": iterations,
+                "ci_width": _confidence_widths(block_means, block_p10s) if enough else None,
+                "done": done
+            }
+
+        next_report = report_every
+        reported = 0
+        for number, (size, seed) in enumerate(zip(sizes, seeds)):
+            if should_stop is not None and should_stop():
+                if moments.count > reported:
+                    yield update(done=False)
+                return
+            block_moments, block_sketch = _simulate_block(
+                (self.model, self.uncertainty, metric, base_inputs, size, seed, sampling, quantile_error))
+            moments.merge(block_moments)
+            sketch.merge(block_sketch)
+            block_means.append(block_moments.mean)
+            block_p10s.append(block_sketch.quantiles([0.10])[0])
+
+            done = number == len(sizes) - 1
+            if moments.count < next_report and not done:
+                continue
+            next_report = moments.count + report_every
+            reported = moments.count
+            yield update(done)
+
+
+class _RowStats:
+    """Per-row p10/p50/p90/mean/std_dev filled in block by block."""
+    def __init__(self, n: int):
+        self.percentiles = np.empty((3, n))
+        self.mean = np.empty(n)
+        self.std_dev = np.empty(n)
+
+    def add(self, block: slice, outcomes: np.ndarray):
+        self.percentiles[:, block] = np.percentile(outcomes, [10, 50, 90], axis=1)
+        self.mean[block] = outcomes.mean(axis=1)
+        self.std_dev[block] = outcomes.std(axis=1)
+
+    def result(self) -> Dict[str, np.ndarray]:
         return {
-            "p10": np.percentile(cash_flow_dist, 10),
-            "p50": np.percentile(cash_flow_dist, 50),
-            "p90": np.percentile(cash_flow_dist, 90),
-            "mean": np.mean(cash_flow_dist),
-            "std_dev": np.std(cash_flow_dist),
-            "iterations": iterations
+            "p10": self.percentiles[0],
+            "p50": self.percentiles[1],
+            "p90": self.percentiles[2],
+            "mean": self.mean,
+            "std_dev": self.std_dev
         }
+
+
+def _summarize(cash_flow_dist: np.ndarray) -> Dict[str, Any]:
+    """Exact summary statistics of a fully materialized outcome distribution."""
+    p10, p50, p90 = np.percentile(cash_flow_dist, [10, 50, 90])
+    return {
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90),
+        "mean": float(np.mean(cash_flow_dist)),
+        "std_dev": float(np.std(cash_flow_dist)),
+        "iterations": len(cash_flow_dist)
+    }
+
+
+def _distribution_outputs(retain: Optional[str], tail_thresholds: Optional[Sequence[float]],
+                          tail_levels: Sequence[float], histogram_bins: int, quantile_error: float,
+                          outcomes: Optional[np.ndarray] = None, sketch: Optional[KLLSketch] = None) -> Dict[str, Any]:
+    """
+    Retained distribution and empirical tail metrics for one run, built from the full-precision
+    outcomes (exact mode) or the merged sketch (streaming mode) before either is discarded.
+    """
+    if retain is None and tail_thresholds is None:
+        return {}
+
+    full = SampleDistribution(outcomes, dtype=float) if outcomes is not None else SketchDistribution(sketch)
+    extra: Dict[str, Any] = {}
+    if tail_thresholds is not None:
+        extra["tail_risk"] = full.tail_risk(tail_thresholds, tail_levels)
+
+    if retain == "samples":
+        extra["distribution"] = SampleDistribution(full.values)
+    elif retain == "histogram":
+        extra["distribution"] = (HistogramDistribution.from_samples(outcomes, bins=histogram_bins)
+                                 if outcomes is not None else full.to_histogram(histogram_bins))
+    elif retain == "sketch":
+        if outcomes is not None:
+            sketch = KLLSketch.from_error(quantile_error)
+            sketch.update(outcomes)
+            full = SketchDistribution(sketch)
+        extra["distribution"] = full
+    return extra
+
+
+def _growth_factors(periods: int, growth_rate: Union[float, Sequence[float]],
+                    seasonality: Optional[Sequence[float]]) -> np.ndarray:
+    """Per-period revenue multipliers: compounded growth times cycled seasonality."""
+    rates = np.broadcast_to(np.asarray(growth_rate, dtype=float), (periods,))
+    growth = np.cumprod(np.concatenate([[1.0], 1 + rates[:-1]]))
+    if seasonality is not None:
+        growth = growth * np.resize(np.asarray(seasonality, dtype=float), periods)
+    return growth
+
+
+def _period_bands(paths: np.ndarray) -> Dict[str, List[float]]:
+    """Per-period p10/p50/p90/mean of a (periods x iterations) array."""
+    p10, p50, p90 = np.percentile(paths, [10, 50, 90], axis=1)
+    return {
+        "p10": p10.tolist(),
+        "p50": p50.tolist(),
+        "p90": p90.tolist(),
+        "mean": paths.mean(axis=1).tolist()
+    }
+
+
+def _confidence_widths(block_means: List[float], block_p10s: List[float], z: float = 1.96) -> Dict[str, float]:
+    """
+    Full widths of the 95% confidence intervals on the mean and on p10.
+    Every block is an independently seeded (and, for QMC, independently scrambled) replicate,
+    so the spread of per-block estimates captures the variance reduction of the sampling design.
+    """
+    n = len(block_means)
+    mean_width = 2 * z * np.std(block_means, ddof=1) / np.sqrt(n)
+    p10_width = 2 * z * np.std(block_p10s, ddof=1) / np.sqrt(n)
+    return {"mean": float(mean_width), "p10": float(p10_width)}
+
+
+def _outcomes_from_normals(model, uncertainty, metric: str, base_inputs: Dict[str, float], z: np.ndarray) -> np.ndarray:
+    """Maps a (size x uncertainty.dims) standard-normal matrix to outcomes of one model metric."""
+    outcomes = model.evaluate(uncertainty.apply(base_inputs, z.T), [metric])[metric]
+    return np.broadcast_to(outcomes, (len(z),))
+
+
+def _simulate_block(task: tuple):
+    """
+    Process-pool entry point: simulates one block of iterations from its own spawned seed.
+    Returns the raw outcomes, or (RunningMoments, KLLSketch) partials when a quantile error is given.
+    """
+    model, uncertainty, metric, base_inputs, size, seed, sampling, quantile_error = task
+    z = standard_normals(sampling, size, uncertainty.dims, np.random.default_rng(seed))
+    block = _outcomes_from_normals(model, uncertainty, metric, base_inputs, z)
+    if quantile_error is None:
+        return block
+
+    moments = RunningMoments()
+    moments.update(block)
+    sketch = KLLSketch.from_error(quantile_error)
+    sketch.update(block)
+    return moments, sketch
@@ -0,0 +1,237 @@
+import math
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+class RunningMoments:
+    """
+    Streaming count/mean/variance accumulator.
+    Chunks are folded in with Chan's parallel update, so partial moments from
+    different chunks (or workers) can be merged exactly.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        other = RunningMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        self.merge(other)
+
+    def merge(self, other: "RunningMoments"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance (matches np.var / np.std defaults)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch with deterministic compaction.
+
+    Items live in a stack of compactors; an item at level h stands for 2**h
+    observations. When a level overflows it is sorted and every other item is
+    promoted, so memory is O(k log(n/k)) regardless of stream length.
+    Compaction offsets alternate per level instead of being random, which keeps
+    results reproducible for a given sequence of updates and merges.
+    """
+    # Conservative empirical constant relating k to the normalized rank error (eps <= C / k).
+    ERROR_CONSTANT = 4.0
+
+    def __init__(self, k: int = 200):
+        if k < 8:
+            raise ValueError("KLL sketch requires k >= 8")
+        self.k = k
+        self.count = 0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._offsets: List[int] = [0]
+
+    @classmethod
+    def from_error(cls, epsilon: float) -> "KLLSketch":
+        """Builds a sketch sized for a target normalized rank error (e.g. 0.001 = 0.1%)."""
+        if not 0 < epsilon < 1:
+            raise ValueError("Quantile error bound must be in (0, 1)")
+        return cls(k=max(8, int(math.ceil(cls.ERROR_CONSTANT / epsilon))))
+
+    @property
+    def epsilon(self) -> float:
+        return self.ERROR_CONSTANT / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+            self._offsets.append(0)
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        while True:
+            level = next((h for h, items in enumerate(self._levels) if len(items) > self._capacity(h)), None)
+            if level is None:
+                return
+            if level + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+                self._offsets.append(0)
+
+            items = np.sort(self._levels[level])
+            # An odd item out stays behind so total weight is preserved exactly
+            keep = items[:len(items) % 2]
+            pairs = items[len(items) % 2:]
+            offset = self._offsets[level]
+            self._offsets[level] ^= 1
+
+            self._levels[level] = keep
+            self._levels[level + 1] = np.concatenate([self._levels[level + 1], pairs[offset::2]])
+
+    def weighted_items(self):
+        """Retained items in ascending order with the number of observations each stands for."""
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Returns approximate quantiles for qs in [0, 1]."""
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        items, weights = self.weighted_items()
+        cumulative = np.cumsum(weights)
+        ranks = np.asarray(qs, dtype=float) * cumulative[-1]
+        idx = np.searchsorted(cumulative, ranks, side="left")
+        return items[np.minimum(idx, len(items) - 1)]
+
+    def rank(self, value: float) -> float:
+        """Approximate fraction of observations <= value."""
+        if self.count == 0:
+            return 0.0
+        items, weights = self.weighted_items()
+        return float(weights[items <= value].sum() / weights.sum())
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch over 64-bit hashes.
+
+    The top `precision` bits of a hash pick one of 2**precision registers, which keeps the
+    longest run of leading zeros seen in the remaining bits. Merging takes the register-wise
+    maximum, so the estimate never depends on how the stream was split. Relative standard
+    error is about 1.04 / sqrt(2**precision) (1.6% at the default precision of 12).
+    """
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        """Adds 64-bit hashes of the observed values (duplicates are harmless)."""
+        hashes = np.asarray(hashes, dtype=np.uint64).ravel()
+        if len(hashes) == 0:
+            return
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # float64 holds 53 bits exactly, so frexp gives the exact bit length of the tail's top
+        # 53 bits; the bits below only matter when all of those are zero (odds of 2**-53)
+        dropped = max(0, tail_bits - 53)
+        _, bit_length = np.frexp((tail >> np.uint64(dropped)).astype(float))
+        # Position of the first set bit in the tail, counted from its top
+        rank = (tail_bits - dropped - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(int)).sum()
+        zeros = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class FrequentItems:
+    """
+    Mergeable Misra-Gries heavy-hitter summary holding at most `capacity` counters.
+
+    Whenever the counters overflow, the (capacity + 1)-th largest count is subtracted from all of
+    them and those left at zero are dropped. Reported counts are therefore lower bounds, short by
+    at most count / (capacity + 1); any value more frequent than that is guaranteed to be kept.
+    """
+    def __init__(self, capacity: int = 32):
+        if capacity < 1:
+            raise ValueError("FrequentItems requires capacity >= 1")
+        self.capacity = capacity
+        self.count = 0
+        self.counters: Dict[Any, int] = {}
+
+    def update(self, items: np.ndarray, counts: Optional[np.ndarray] = None):
+        """Adds distinct items with their occurrence counts (each item once when counts is None)."""
+        items = np.asarray(items)
+        counts = np.ones(len(items), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        if len(items) == 0:
+            return
+        self.count += int(counts.sum())
+        if len(items) > self.capacity:
+            # Reduce the batch first so only a handful of items ever reach the Python dict
+            threshold = np.partition(counts, -(self.capacity + 1))[-(self.capacity + 1)]
+            keep = counts > threshold
+            items, counts = items[keep], counts[keep] - threshold
+        for item, count in zip(items.tolist(), counts.tolist()):
+            self.counters[item] = self.counters.get(item, 0) + count
+        self._reduce()
+
+    def merge(self, other: "FrequentItems"):
+        self.count += other.count
+        for item, count in other.counters.items():
+            self.counters[item] = self.counters.get(item, 0) + count
+        self._reduce()
+
+    def _reduce(self):
+        if len(self.counters) <= self.capacity:
+            return
+        threshold = sorted(self.counters.values(), reverse=True)[self.capacity]
+        self.counters = {item: count - threshold for item, count in self.counters.items() if count > threshold}
+
+    def top(self, n: int) -> List[Tuple[Any, int]]:
+        """The n largest counters as (item, count), most frequent first."""
+        return sorted(self.counters.items(), key=lambda entry: -entry[1])[:n]
@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import yaml
+
+logger = logging.getLogger("stress_library")
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "stress_scenarios.yaml")
+
+# Used when the config file is missing, so stress tests keep working out of the box
+FALLBACK_LIBRARY: Dict[str, Any] = {
+    "version": "builtin",
+    "packs": {
+        "core": {
+            "description": "Built-in scenarios.",
+            "scenarios": [
+                {"name": "Recession", "shocks": {"revenue": 0.8}},
+                {"name": "Inflation", "shocks": {"operational_costs": 1.15}},
+                {"name": "Aggressive Growth", "shocks": {"marketing_spend": 1.5, "revenue": 1.2}},
+            ],
+        }
+    },
+}
+
+class StressScenarioLibrary:
+    """
+    Versioned stress scenario library (see backend/config/stress_scenarios.yaml).
+
+    Scenarios are compiled once into a columnar shock table: one multiplier array per shocked
+    input, one row per scenario (1.0 where a scenario leaves the input alone), so a whole
+    library is applied to a baseline with one multiplication per input.
+    """
+    def __init__(self, data: Dict[str, Any]):
+        self.version = str(data.get("version", "unversioned"))
+        self.pack_descriptions: Dict[str, str] = {}
+        self.names: List[str] = []
+        self.descriptions: List[str] = []
+        self.packs: List[str] = []
+        shocks: List[Dict[str, float]] = []
+
+        for pack, spec in (data.get("packs") or {}).items():
+            self.pack_descriptions[pack] = spec.get("description", "")
+            for scenario in spec.get("scenarios") or []:
+                if "name" not in scenario:
+                    raise ValueError(f"Scenario in pack '{pack}' is missing a name")
+                try:
+                    row = {k: float(v) for k, v in (scenario.get("shocks") or {}).items()}
+                except (TypeError, ValueError):
+                    raise ValueError(f"Shocks for scenario '{scenario['name']}' must be numeric multipliers")
+                self.names.append(str(scenario["name"]))
+                self.descriptions.append(scenario.get("description", ""))
+                self.packs.append(pack)
+                shocks.append(row)
+
+        inputs = sorted({k for row in shocks for k in row})
+        self.multipliers: Dict[str, np.ndarray] = {
+            key: np.array([row.get(key, 1.0) for row in shocks], dtype=float) for key in inputs
+        }
+        self._pack_array = np.array(self.packs, dtype=object)
+
+    @classmethod
+    def from_yaml(cls, path: str) -> "StressScenarioLibrary":
+        with open(path, "r") as f:
+            return cls(yaml.safe_load(f) or {})
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def select(self, packs: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Row indices of the scenarios in the given packs (all scenarios when packs is None)."""
+        if packs is None:
+            return np.arange(len(self))
+        unknown = [p for p in packs if p not in self.pack_descriptions]
+        if unknown:
+            raise ValueError(f"Unknown stress packs {unknown}. Available: {sorted(self.pack_descriptions)}")
+        return np.nonzero(np.isin(self._pack_array, list(packs)))[0]
+
+    def scenario_columns(self, base_inputs: Dict[str, float], rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Columnar scenario table for the selected rows: base value times each scenario's multiplier."""
+        columns = {}
+        for key, value in base_inputs.items():
+            if key in self.multipliers:
+                columns[key] = float(value) * self.multipliers[key][rows]
+            else:
+                columns[key] = np.full(len(rows), value, dtype=float)
+        return columns
+
+    def summary(self) -> Dict[str, Any]:
+        counts = {pack: self.packs.count(pack) for pack in self.pack_descriptions}
+        return {
+            "version": self.version,
+            "scenarios": len(self),
+            "packs": {pack: {"description": desc, "scenarios": counts[pack]}
+                      for pack, desc in self.pack_descriptions.items()},
+        }
+
+
+_LIBRARIES: Dict[str, tuple] = {}
+_library_lock = threading.Lock()
+
+def load_stress_library(path: Optional[str] = None) -> StressScenarioLibrary:
+    """
+    Loads (and caches) the library at path, defaulting to the bundled config.
+    Cached per path with the file's modification time, so an edited file is picked up on the next call.
+    """
+    path = os.path.normpath(path or DEFAULT_LIBRARY_PATH)
+    if not os.path.exists(path):
+        logger.warning(f"Stress scenario library not found at {path}. Using built-in scenarios.")
+        return StressScenarioLibrary(FALLBACK_LIBRARY)
+
+    mtime = os.path.getmtime(path)
+    with _library_lock:
+        cached = _LIBRARIES.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    library = StressScenarioLibrary.from_yaml(path)
+    with _library_lock:
+        _LIBRARIES[path] = (mtime, library)
+    return library
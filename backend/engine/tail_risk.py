@@ -0,0 +1,145 @@
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+from backend.engine.sketches import KLLSketch
+
+RETAIN_MODES = ("samples", "histogram", "sketch")
+DEFAULT_TAIL_LEVELS = (0.95, 0.99)
+
+class EmpiricalDistribution:
+    """
+    Compact outcome distribution retained from a Monte Carlo run.
+
+    Tail metrics are expressed in metric units, with low outcomes as the bad tail:
+    prob_below(t) = P(X < t), value_at_risk(a) = the (1 - a) quantile and
+    conditional_value_at_risk(a) = the mean outcome at or below that quantile.
+    """
+    kind = ""
+
+    def prob_below(self, threshold: float) -> float:
+        raise NotImplementedError
+
+    def quantile(self, q: float) -> float:
+        raise NotImplementedError
+
+    def tail_mean(self, q: float) -> float:
+        """Mean of the outcomes at or below the q-quantile."""
+        raise NotImplementedError
+
+    def value_at_risk(self, level: float) -> float:
+        return self.quantile(1 - level)
+
+    def conditional_value_at_risk(self, level: float) -> float:
+        return self.tail_mean(1 - level)
+
+    def tail_risk(self, thresholds: Sequence[float] = (0.0,),
+                  levels: Sequence[float] = DEFAULT_TAIL_LEVELS) -> Dict[str, Dict[float, float]]:
+        """Probability of falling below each threshold plus VaR/CVaR at each confidence level."""
+        for level in levels:
+            if not 0 < level < 1:
+                raise ValueError("Tail levels must be in (0, 1)")
+        return {
+            "prob_below": {float(t): self.prob_below(t) for t in thresholds},
+            "var": {float(a): self.value_at_risk(a) for a in levels},
+            "cvar": {float(a): self.conditional_value_at_risk(a) for a in levels},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class SampleDistribution(EmpiricalDistribution):
+    """Every outcome, sorted (float32 by default: half the memory of the engine's float64 draws)."""
+    kind = "samples"
+
+    def __init__(self, values: np.ndarray, dtype=np.float32):
+        self.values = np.sort(np.asarray(values, dtype=dtype).ravel())
+        if len(self.values) == 0:
+            raise ValueError("Sample distribution requires at least one value")
+
+    def prob_below(self, threshold):
+        return float(np.searchsorted(self.values, threshold, side="left") / len(self.values))
+
+    def quantile(self, q):
+        return float(np.quantile(self.values, q))
+
+    def tail_mean(self, q):
+        count = max(1, int(np.ceil(q * len(self.values))))
+        return float(self.values[:count].mean(dtype=float))
+
+    def to_dict(self):
+        return {"kind": self.kind, "values": self.values.tolist()}
+
+
+class HistogramDistribution(EmpiricalDistribution):
+    """Fixed-bin histogram; mass is treated as uniform within each bin."""
+    kind = "histogram"
+
+    def __init__(self, edges: np.ndarray, counts: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.asarray(counts, dtype=float)
+        if len(self.edges) != len(self.counts) + 1 or self.counts.sum() <= 0:
+            raise ValueError("Histogram requires len(edges) == len(counts) + 1 and a positive total count")
+        self._cdf = np.concatenate([[0.0], np.cumsum(self.counts)]) / self.counts.sum()
+
+    @classmethod
+    def from_samples(cls, values: np.ndarray, bins: int = 256, weights: Optional[np.ndarray] = None):
+        counts, edges = np.histogram(values, bins=bins, weights=weights)
+        return cls(edges, counts)
+
+    def prob_below(self, threshold):
+        return float(np.interp(threshold, self.edges, self._cdf))
+
+    def quantile(self, q):
+        # Skip empty bins so the inverse CDF is single-valued
+        keep = np.concatenate([[True], self.counts > 0])
+        return float(np.interp(q, self._cdf[keep], self.edges[keep]))
+
+    def tail_mean(self, q):
+        cutoff = self.quantile(q)
+        lo, hi = self.edges[:-1], self.edges[1:]
+        width = np.where(hi > lo, hi - lo, 1.0)
+        share = np.clip((cutoff - lo) / width, 0.0, 1.0)
+        mass = self.counts * share
+        if mass.sum() == 0:
+            return float(self.edges[0])
+        midpoints = (lo + np.minimum(hi, cutoff)) / 2
+        return float((mass * midpoints).sum() / mass.sum())
+
+    def to_dict(self):
+        return {"kind": self.kind, "edges": self.edges.tolist(), "counts": self.counts.tolist()}
+
+
+class SketchDistribution(EmpiricalDistribution):
+    """KLL quantile sketch; rank-based metrics carry the sketch's normalized rank error."""
+    kind = "sketch"
+
+    def __init__(self, sketch: KLLSketch):
+        if sketch.count == 0:
+            raise ValueError("Sketch distribution requires a non-empty sketch")
+        self.sketch = sketch
+        self._items, self._weights = sketch.weighted_items()
+        self._cumulative = np.cumsum(self._weights)
+
+    @property
+    def epsilon(self) -> float:
+        return self.sketch.epsilon
+
+    def prob_below(self, threshold):
+        below = np.searchsorted(self._items, threshold, side="left")
+        return float(self._cumulative[below - 1] / self._cumulative[-1]) if below else 0.0
+
+    def quantile(self, q):
+        return float(self.sketch.quantiles([q])[0])
+
+    def tail_mean(self, q):
+        # Take whole items in ascending order until q of the total weight is covered
+        target = max(q * self._cumulative[-1], self._weights[0])
+        taken = np.minimum(self._weights, np.maximum(target - (self._cumulative - self._weights), 0.0))
+        return float((taken * self._items).sum() / taken.sum())
+
+    def to_histogram(self, bins: int = 256) -> HistogramDistribution:
+        return HistogramDistribution.from_samples(self._items, bins=bins, weights=self._weights)
+
+    def to_dict(self):
+        return {"kind": self.kind, "items": self._items.tolist(), "weights": self._weights.tolist(),
+                "epsilon": self.epsilon}
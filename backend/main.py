@@ -1,8 +1,10 @@
 from fastapi import FastAPI
-from backend.routers import ingest, workflow, admin
+from fastapi.responses import JSONResponse
+from backend.routers import ingest, workflow, admin, risk
 from backend.services.audit_service import audit_logger
 from backend.services.security import LogSanitizer
 from backend.services.monitoring import router as metrics_router, monitor
+from backend.services.compute_pool import ComputePoolSaturated
 import logging
 import time
 
@@ -14,9 +16,16 @@ app = FastAPI(title="AI Decision Copilot API", version="1.0.0")
 # Include routers
 app.include_router(ingest.router, prefix="/api/ingest", tags=["Ingestion"])
 app.include_router(workflow.router, prefix="/api/workflow", tags=["Workflow"])
+app.include_router(risk.router, prefix="/api/risk", tags=["Risk"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin/Compliance"])
 app.include_router(metrics_router, tags=["Observability"])
 
+@app.exception_handler(ComputePoolSaturated)
+async def compute_pool_saturated(request, exc: ComputePoolSaturated):
+    # Back-pressure: tell clients when to retry instead of queueing unbounded engine work
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from backend.services.ingestion_service import IngestionService
-from pydantic import BaseModel
+from backend.services.readers import supported_extensions
+from backend.services.serialization import NumpyJSONResponse, NumpyRoute
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
-router = APIRouter()
+router = APIRouter(default_response_class=NumpyJSONResponse, route_class=NumpyRoute)
 service = IngestionService()
 
 class DataProfile(BaseModel):
@@ -10,14 +13,41 @@ class DataProfile(BaseModel):
     row_count: int
     health_score: int
     anomalies: list[str]
+    # Column -> dtype name ('sheet!column' for multi-sheet workbooks)
+    schema_: Optional[Dict[str, str]] = Field(None, alias="schema")
+    # Column -> missing count, distinct estimate, top values and numeric summary statistics
+    columns: Optional[Dict[str, Dict[str, Any]]] = None
+    # Per-sheet profiles of an .xlsx workbook
+    sheets: Optional[List[Dict[str, Any]]] = None
+    # Where the raw upload was kept (INGEST_PERSIST_DIR)
+    stored_path: Optional[str] = None
 
 @router.post("/upload", response_model=DataProfile)
 async def upload_file(file: UploadFile = File(...)):
-    if not file.filename.endswith(('.csv', '.xlsx')):
-        raise HTTPException(status_code=400, detail="Invalid file format. Only CSV/XLSX allowed.")
+    """
+    Multipart upload. Starlette spools the whole file before this handler runs, so profiling
+    starts only once the transfer has finished; send large CSVs to /stream instead.
+    """
+    extensions = supported_extensions()
+    if not file.filename.lower().endswith(tuple(extensions)):
+        raise HTTPException(status_code=400, detail=f"Invalid file format. Allowed: {', '.join(extensions)}")
     
     try:
         profile = await service.process_file(file)
         return profile
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream", response_model=DataProfile)
+async def upload_stream(request: Request, filename: str):
+    """
+    Raw-body CSV upload (Content-Type: text/csv), profiled chunk by chunk as the body arrives.
+    Unlike multipart /upload, nothing is buffered before profiling starts.
+    """
+    if not filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Invalid file format. Streaming upload accepts .csv only")
+
+    try:
+        return await service.process_stream(request.stream(), filename)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
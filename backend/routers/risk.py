@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException
+from backend.services.risk_service import RiskService
+from backend.services.compute_pool import compute_pool
+from backend.services.serialization import NumpyJSONResponse, NumpyRoute
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+router = APIRouter(default_response_class=NumpyJSONResponse, route_class=NumpyRoute)
+service = RiskService()
+
+class StressTestRequest(BaseModel):
+    # Inputs not given fall back to the default planning baseline
+    baseline: Optional[Dict[str, float]] = None
+    packs: Optional[List[str]] = None
+    metric: str = "cash_flow"
+    constraints: Optional[Dict[str, float]] = None
+    monte_carlo: bool = False
+    iterations: int = Field(1000, ge=1, le=20000)
+    seed: Optional[int] = None
+    rank_by: Optional[str] = None
+    page: int = Field(1, ge=1)
+    page_size: int = Field(20, ge=1, le=500)
+
+@router.get("/stress/library")
+async def stress_library():
+    return service.library_summary()
+
+@router.post("/stress")
+async def run_stress_tests(request: StressTestRequest):
+    try:
+        return await compute_pool.run(service.run_stress_tests, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,18 +1,83 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import itertools
+import json
+import uuid
+import weakref
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from backend.services.workflow_service import WorkflowService
-from pydantic import BaseModel
+from backend.services.compute_pool import ComputePoolSaturated, compute_pool
+from backend.services.serialization import NumpyJSONResponse, NumpyRoute, encode_json
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Union
 
-router = APIRouter()
+router = APIRouter(default_response_class=NumpyJSONResponse, route_class=NumpyRoute)
 service = WorkflowService()
 
 class ScenarioParams(BaseModel):
     marketing_spend_delta: float
     hiring_freeze: bool
+    # Requests sharing a session_id (or seed) reuse the same random draws
+    session_id: Optional[str] = None
+    seed: Optional[int] = None
 
 class SimulationResult(BaseModel):
     baseline_cash: list[float]
     scenario_cash: list[float]
     savings_impact: float
+    scenario_bands: Optional[Dict[str, list[float]]] = None
+
+class OptimizeRequest(BaseModel):
+    # Decision input -> [low, high] search range, e.g. {"marketing_spend": [0, 20000]}
+    bounds: Dict[str, List[float]]
+    baseline: Optional[Dict[str, float]] = None
+    constraints: Optional[Dict[str, float]] = None
+    metric: str = "cash_flow"
+    objective: str = "value"  # value | mean | mean_cvar
+    risk_aversion: float = Field(1.0, ge=0)
+    cvar_level: float = Field(0.95, gt=0, lt=1)
+    method: str = "cross_entropy"  # grid | random | cross_entropy
+    population: int = Field(64, ge=4, le=4096)
+    generations: int = Field(20, ge=1, le=200)
+    grid_points: int = Field(11, ge=2, le=1000)
+    iterations: int = Field(1000, ge=10, le=20000)
+    seed: Optional[int] = None
+
+class LinspaceSpec(BaseModel):
+    start: float
+    stop: float
+    num: int = Field(ge=1, le=1000)
+
+class ScenarioGrid(BaseModel):
+    # Cartesian product of the axes; each numeric axis is a list of values or a linspace
+    marketing_spend_delta: Union[List[float], LinspaceSpec] = [0.0]
+    hiring_freeze: List[bool] = [False]
+
+    def values(self) -> List[float]:
+        axis = self.marketing_spend_delta
+        if isinstance(axis, LinspaceSpec):
+            if axis.num == 1:
+                return [axis.start]
+            step = (axis.stop - axis.start) / (axis.num - 1)
+            return [axis.start + i * step for i in range(axis.num)]
+        return axis
+
+class BulkSimulateRequest(BaseModel):
+    scenarios: Optional[List[ScenarioParams]] = None
+    grid: Optional[ScenarioGrid] = None
+    # Shared by every scenario in the batch (per-scenario session_id/seed are ignored)
+    session_id: Optional[str] = None
+    seed: Optional[int] = None
+    chunk_size: int = Field(50, ge=1, le=1000)
+
+MAX_BULK_SCENARIOS = 10_000
+
+class ProgressiveSimulateRequest(ScenarioParams):
+    iterations: int = Field(1_000_000, ge=1, le=50_000_000)
+    report_every: int = Field(10_000, ge=100)
+
+# run_id -> cancellation flag of an in-progress /simulate/stream run
+_active_streams: Dict[str, Any] = {}
 
 class MemoRequest(BaseModel):
     scenario_id: str
@@ -21,10 +86,136 @@ class MemoRequest(BaseModel):
 @router.post("/simulate", response_model=SimulationResult)
 async def run_simulation(params: ScenarioParams):
     try:
-        return service.run_simulation(params)
+        # Engine work runs on the bounded compute pool so the event loop stays responsive
+        return await compute_pool.run(service.run_simulation, params)
+    except ComputePoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _expand_scenarios(request: BulkSimulateRequest) -> List[ScenarioParams]:
+    scenarios = list(request.scenarios or [])
+    if request.grid is not None:
+        scenarios += [ScenarioParams(marketing_spend_delta=delta, hiring_freeze=freeze)
+                      for delta, freeze in itertools.product(request.grid.values(), request.grid.hiring_freeze)]
+    return scenarios
+
+@router.post("/simulate/bulk")
+async def run_simulation_bulk(request: BulkSimulateRequest, http_request: Request, format: Optional[str] = None):
+    """
+    Evaluates many scenarios in one request and streams results as each chunk finishes.
+    Responds with NDJSON (one result per line) by default, or Server-Sent Events when
+    format=sse or the client accepts text/event-stream.
+    """
+    scenarios = _expand_scenarios(request)
+    if not scenarios:
+        raise HTTPException(status_code=400, detail="Provide scenarios or a grid")
+    if len(scenarios) > MAX_BULK_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SCENARIOS} scenarios per request")
+
+    sse = format == "sse" or (format is None and "text/event-stream" in http_request.headers.get("accept", ""))
+    seed = service._scenario_seed(ScenarioParams(marketing_spend_delta=0.0, hiring_freeze=False,
+                                                 session_id=request.session_id, seed=request.seed))
+    # Unseeded batches still share one set of draws across chunks, generated for this request only
+    # so anonymous bulk calls never evict sessions' cached draws
+    draws = service.fresh_draws() if seed is None else None
+
+    chunks = [scenarios[start:start + request.chunk_size] for start in range(0, len(scenarios), request.chunk_size)]
+    # Admit the first chunk before the response starts, so a saturated pool still yields a clean 503
+    first = compute_pool.submit(service.run_simulation_batch, chunks[0], seed, draws)
+
+    async def run_chunk(chunk):
+        while True:
+            try:
+                return await compute_pool.run(service.run_simulation_batch, chunk, seed, draws)
+            except ComputePoolSaturated as e:
+                # The stream is already open; wait for capacity instead of failing halfway
+                await asyncio.sleep(e.retry_after)
+
+    async def stream():
+        start = 0
+        for number, chunk in enumerate(chunks):
+            if number == 0:
+                results = await compute_pool.wait(first)
+            else:
+                results = await run_chunk(chunk)
+            for offset, (params, result) in enumerate(zip(chunk, results)):
+                row = {"index": start + offset,
+                       "params": {"marketing_spend_delta": params.marketing_spend_delta,
+                                  "hiring_freeze": params.hiring_freeze},
+                       **result}
+                data = encode_json(row)
+                yield b"event: result\ndata: " + data + b"\n\n" if sse else data + b"\n"
+            start += len(chunk)
+        if sse:
+            yield f"event: done\ndata: {json.dumps({'count': len(scenarios)})}\n\n"
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type)
+
+@router.post("/simulate/stream")
+async def run_simulation_stream(request: ProgressiveSimulateRequest):
+    """
+    Progressive Monte Carlo over Server-Sent Events: a `started` event with the run_id, then a
+    `progress` event every report_every iterations with running p10/p50/p90/mean and ci_width,
+    and finally `done` (or `cancelled`). Disconnecting, or DELETE /simulate/stream/{run_id},
+    stops the worker at its next block boundary.
+    """
+    if request.report_every > request.iterations:
+        raise HTTPException(status_code=400, detail="report_every cannot exceed iterations")
+    # Both pickle into a process pool; with threads the updates go straight to the event loop
+    updates = compute_pool.channel()
+    cancelled = compute_pool.event()
+    run_id = uuid.uuid4().hex
+
+    # Admitted before the response starts, so a saturated pool still yields a clean 503
+    job = compute_pool.submit(service.stream_simulation, request, request.iterations, request.report_every,
+                              updates.put, cancelled)
+    job.add_done_callback(lambda _: updates.put(None))
+
+    async def stream():
+        # Registered only once the body runs, so the finally below always removes it again
+        _active_streams[run_id] = cancelled
+        try:
+            yield f"event: started\ndata: {json.dumps({'run_id': run_id, 'iterations': request.iterations})}\n\n"
+            last = None
+            while (update := await updates.get()) is not None:
+                last = update
+                yield b"event: progress\ndata: " + encode_json(update) + b"\n\n"
+            if job.exception() is not None:
+                yield f"event: error\ndata: {json.dumps({'detail': str(job.exception())})}\n\n"
+            elif last is not None and not last["done"]:
+                yield f"event: cancelled\ndata: {json.dumps({'iterations': last['iterations']})}\n\n"
+            else:
+                yield f"event: done\ndata: {json.dumps(last)}\n\n"
+        finally:
+            # Runs on normal completion and when the client disconnects mid-stream
+            cancelled.set()
+            _active_streams.pop(run_id, None)
+
+    body = stream()
+    # A body dropped before it is ever iterated (client gone before the response started) never
+    # reaches that finally; stop the job when the generator is collected instead
+    weakref.finalize(body, cancelled.set).atexit = False
+    return StreamingResponse(body, media_type="text/event-stream")
+
+@router.delete("/simulate/stream/{run_id}")
+async def cancel_simulation_stream(run_id: str):
+    cancelled = _active_streams.get(run_id)
+    if cancelled is None:
+        raise HTTPException(status_code=404, detail="No running simulation stream with this id")
+    cancelled.set()
+    return {"run_id": run_id, "cancelled": True}
+
+@router.post("/optimize")
+async def optimize_decision(request: OptimizeRequest):
+    if any(len(limits) != 2 for limits in request.bounds.values()):
+        raise HTTPException(status_code=400, detail="Each bound must be [low, high]")
+    try:
+        return await compute_pool.run(service.optimize_decision, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/memo")
 async def generate_memo(request: MemoRequest):
     return service.generate_memo(request.scenario_id, request.decision_type)
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from backend.services.monitoring import monitor
+
+logger = logging.getLogger("compute_pool")
+
+class ComputePoolSaturated(Exception):
+    """Raised when a job is submitted while every worker is busy and the queue is full."""
+    def __init__(self, retry_after: int):
+        super().__init__(f"Compute pool is saturated; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    # Runs in the worker; the wall-clock start time lets the caller measure queue wait
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class _LoopChannel:
+    """Updates from a pool thread handed straight to the event loop's queue."""
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, item: Any):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    async def get(self) -> Any:
+        return await self._queue.get()
+
+
+class _ManagerChannel:
+    """Updates from a pool process through a manager queue; the proxy pickles into the job."""
+    def __init__(self, manager):
+        self._queue = manager.Queue()
+
+    def put(self, item: Any):
+        self._queue.put(item)
+
+    async def get(self) -> Any:
+        return await asyncio.to_thread(self._queue.get)
+
+
+class ComputePool:
+    """
+    Bounded executor for CPU-bound engine work, so simulations never run on the asyncio event loop.
+
+    At most max_workers jobs run at once and at most max_queue more wait for a worker; anything
+    beyond that is rejected immediately with ComputePoolSaturated (carrying a Retry-After estimate
+    from the recent average job duration) instead of piling up and starving /health and /metrics.
+    kind='thread' shares in-process caches between jobs (NumPy releases the GIL in its kernels);
+    kind='process' isolates jobs completely but requires picklable callables and arguments; jobs
+    that report progress or poll a stop flag get them from channel() and event(), which work for both.
+    start_method picks how process workers start ('forkserver' avoids forking a multithreaded server).
+    Queue depth, in-flight jobs, queue wait time and rejections are exported through monitoring.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 kind: str = "thread", name: str = "engine", start_method: Optional[str] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown compute pool kind '{kind}'. Expected thread or process")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue if max_queue is not None else 4 * self.max_workers
+        self.kind = kind
+        self.name = name
+        self.start_method = start_method
+        self._executor: Optional[Executor] = None
+        self._manager = None
+        self._in_flight = 0
+        self._avg_duration = 1.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ComputePool":
+        workers = os.getenv("COMPUTE_WORKERS")
+        queue = os.getenv("COMPUTE_QUEUE_LIMIT")
+        return cls(max_workers=int(workers) if workers else None,
+                   max_queue=int(queue) if queue else None,
+                   kind=os.getenv("COMPUTE_POOL_KIND", "thread"))
+
+    @property
+    def executor(self) -> Executor:
+        # Created lazily so importing the app does not fork worker processes
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._mp_context())
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool")
+            return self._executor
+
+    def _mp_context(self):
+        return multiprocessing.get_context(self.start_method)
+
+    def _sync_manager(self):
+        if self._manager is None:
+            self._manager = self._mp_context().Manager()
+        return self._manager
+
+    def channel(self):
+        """
+        One-way update channel from a job back to the event loop: the job calls put(item), the
+        caller awaits get(). Must be created on the event loop.
+        """
+        return _ManagerChannel(self._sync_manager()) if self.kind == "process" else _LoopChannel()
+
+    def event(self):
+        """A flag the caller sets and a job polls (e.g. to cancel it), shareable with the pool's workers."""
+        return self._sync_manager().Event() if self.kind == "process" else threading.Event()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up, from the recent average job duration."""
+        waves = (self.queued + 1) / self.max_workers
+        return max(1, int(math.ceil(waves * self._avg_duration)))
+
+    def _publish(self):
+        monitor.track_compute_load(self.name, self._in_flight, self.queued)
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                retry_after = self.retry_after()
+                monitor.track_compute_rejection(self.name)
+                raise ComputePoolSaturated(retry_after)
+            self._in_flight += 1
+            self._publish()
+
+    def _release(self, future: Future, submitted_at: float):
+        # Runs when the job actually finishes, even if the awaiting request was cancelled
+        with self._lock:
+            self._in_flight -= 1
+            self._publish()
+        if future.cancelled() or future.exception() is not None:
+            return
+        started_at, _ = future.result()
+        duration = time.time() - started_at
+        monitor.track_queue_wait(self.name, max(0.0, started_at - submitted_at))
+        with self._lock:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Admits and submits a job; raises ComputePoolSaturated when the pool is full."""
+        self._admit()
+        submitted_at = time.time()
+        try:
+            future = self.executor.submit(_timed_call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+                self._publish()
+            raise
+        future.add_done_callback(lambda f: self._release(f, submitted_at))
+        return future
+
+    async def wait(self, future: Future) -> Any:
+        """Awaits a job returned by submit() and returns fn's result."""
+        _, result = await asyncio.wrap_future(future)
+        return result
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) on the pool without blocking the event loop."""
+        return await self.wait(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+compute_pool = ComputePool.from_env()
@@ -0,0 +1,345 @@
+import io
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from backend.engine.sketches import FrequentItems, HyperLogLog, KLLSketch, RunningMoments
+
+CHUNK_ROWS = 5000
+# Ranges are sized from the file alone (never from the worker count), so the chunking and
+# therefore the merged profile are identical however many workers run them
+RANGE_BYTES = 32 * 1024 * 1024
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+# Record boundaries are searched in small windows: the next record start is usually a few bytes away
+ALIGN_WINDOW_BYTES = 64 * 1024
+MAX_ANOMALIES = 10
+# Sketch sizes fix the memory of each column's statistics, whatever the number of rows
+QUANTILE_K = 200
+DISTINCT_PRECISION = 12
+FREQUENT_CAPACITY = 32
+TOP_VALUES = 5
+
+QUOTE, NEWLINE = ord('"'), ord("\n")
+NUMERIC_TYPES = ("Int64", "Float64")
+# pandas' default float parser can be off in the last bit; exact parsing keeps the statistics
+# (distinct counts above all) identical to those computed from Arrow batches
+FLOAT_PRECISION = "round_trip"
+
+
+class ColumnStats:
+    """
+    One-pass statistics for one column, mergeable across chunks and workers: moments, min/max and
+    KLL quantiles over numeric values, HyperLogLog distinct count and Misra-Gries frequent values
+    over all non-null values. Numbers are hashed as float64 so a column read as Int64 in one chunk
+    and Float64 in another still counts 1 and 1.0 as one distinct value.
+    """
+    def __init__(self):
+        self.moments = RunningMoments()
+        self.min = math.inf
+        self.max = -math.inf
+        self.quantiles = KLLSketch(k=QUANTILE_K)
+        self.distinct = HyperLogLog(DISTINCT_PRECISION)
+        self.frequent = FrequentItems(FREQUENT_CAPACITY)
+
+    def update(self, items: np.ndarray, counts: np.ndarray, numbers: Optional[np.ndarray] = None):
+        """
+        Adds one chunk, given as its distinct non-null values with their counts and, for numeric
+        columns, all of its non-null values as float64.
+        """
+        if numbers is not None:
+            numbers = numbers[~np.isnan(numbers)]
+            if len(numbers):
+                self.moments.update(numbers)
+                self.min = min(self.min, float(numbers.min()))
+                self.max = max(self.max, float(numbers.max()))
+                self.quantiles.update(numbers)
+        if len(items):
+            # Duplicates never change a HyperLogLog, so hashing the distinct values is enough
+            keys = items.astype(float) if numbers is not None else items
+            self.distinct.update(pd.util.hash_array(keys, categorize=False))
+            self.frequent.update(items, counts)
+
+    def merge(self, other: "ColumnStats"):
+        self.moments.merge(other.moments)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "distinct": self.distinct.estimate(),
+            "top_values": [{"value": value, "count": count} for value, count in self.frequent.top(TOP_VALUES)]
+        }
+        if self.moments.count:
+            p25, p50, p75 = self.quantiles.quantiles([0.25, 0.5, 0.75]).tolist()
+            stats.update({"mean": self.moments.mean, "std": self.moments.std, "min": self.min,
+                          "max": self.max, "p25": p25, "p50": p50, "p75": p75})
+        return stats
+
+
+class ProfilePartial:
+    """
+    Mergeable CSV profile aggregates: row count, per-column missing counts, per-column schema
+    votes (dtype inferred per chunk, weighted by the chunk's rows) and per-column ColumnStats.
+    Partials from disjoint byte ranges merged in range order give the profile of the whole file.
+    Fed either pandas chunks (update) or Arrow record batches (update_batch); Arrow types are
+    reported under the same pandas dtype names, so a file profiles alike through pandas and Arrow
+    (CSV dates stay text on both, see ArrowCSVReader; typed formats report datetime64[ns]).
+    """
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.rows = 0
+        self.missing: Dict[str, int] = {col: 0 for col in self.columns}
+        self.schema_votes: Dict[str, Dict[str, int]] = {col: {} for col in self.columns}
+        self.stats: Dict[str, ColumnStats] = {col: ColumnStats() for col in self.columns}
+
+    def update(self, chunk: pd.DataFrame):
+        chunk = chunk.convert_dtypes()
+        self.rows += len(chunk)
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] += int(count)
+        for col in self.columns:
+            votes = self.schema_votes[col]
+            dtype = chunk[col].dtype
+            votes[str(dtype)] = votes.get(str(dtype), 0) + len(chunk)
+            values = chunk[col].dropna()
+            counts = values.value_counts(sort=False)
+            numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            self.stats[col].update(counts.index.to_numpy(), counts.to_numpy(),
+                                   values.to_numpy(dtype=float) if numeric else None)
+
+    def update_batch(self, batch: pa.RecordBatch):
+        """Same aggregates computed with Arrow compute kernels, without converting to pandas."""
+        rows = batch.num_rows
+        self.rows += rows
+        for col, array in zip(batch.schema.names, batch.columns):
+            self.missing[col] += array.null_count
+            votes = self.schema_votes[col]
+            dtype = _arrow_dtype_name(array.type)
+            votes[dtype] = votes.get(dtype, 0) + rows
+            if pa.types.is_dictionary(array.type):
+                array = array.dictionary_decode()
+            values = pc.drop_null(array)
+            counts = pc.value_counts(values)
+            numbers = values.to_numpy(zero_copy_only=False).astype(float) if _is_numeric(array.type) else None
+            self.stats[col].update(counts.field("values").to_numpy(zero_copy_only=False),
+                                   counts.field("counts").to_numpy(), numbers)
+
+    def merge(self, other: "ProfilePartial"):
+        self.rows += other.rows
+        for col in self.columns:
+            self.missing[col] += other.missing[col]
+            self.stats[col].merge(other.stats[col])
+            votes = self.schema_votes[col]
+            for dtype, count in other.schema_votes[col].items():
+                votes[dtype] = votes.get(dtype, 0) + count
+
+    def schema(self) -> Dict[str, str]:
+        return {col: _resolve_dtype(self.schema_votes[col]) for col in self.columns}
+
+    def anomalies(self) -> List[str]:
+        return [f"Negative values detected in column '{col}'" for col in self.columns if self.stats[col].min < 0][:MAX_ANOMALIES]
+
+    def column_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {col: {"missing": self.missing[col], **self.stats[col].to_dict()} for col in self.columns}
+
+    def to_profile(self, filename: str) -> Dict[str, Any]:
+        total_cells = self.rows * len(self.columns)
+        if total_cells == 0:
+            return {"filename": filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}, "columns": {}}
+
+        anomalies = self.anomalies()
+        return {
+            "filename": filename,
+            "row_count": self.rows,
+            "health_score": health_score(sum(self.missing.values()), len(anomalies), total_cells),
+            "anomalies": anomalies,
+            "schema": self.schema(),
+            "columns": self.column_stats()
+        }
+
+
+def health_score(total_missing: int, anomaly_count: int, total_cells: int) -> int:
+    # Heuristic: Penalize missing data (weighted)
+    return max(0, int(100 - ((total_missing + anomaly_count * 100) / total_cells * 1000)))
+
+
+def _is_numeric(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type)
+
+
+def _arrow_dtype_name(arrow_type: pa.DataType) -> str:
+    """pandas (convert_dtypes) name for an Arrow type."""
+    if pa.types.is_dictionary(arrow_type):
+        return _arrow_dtype_name(arrow_type.value_type)
+    if pa.types.is_integer(arrow_type):
+        return "Int64"
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "Float64"
+    if pa.types.is_boolean(arrow_type):
+        return "boolean"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_null(arrow_type):
+        return "string"
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return "datetime64[ns]"
+    return str(arrow_type)
+
+
+def _resolve_dtype(votes: Dict[str, int]) -> str:
+    """Column dtype from per-chunk votes: integer and float chunks widen to Float64, else the majority wins."""
+    if len(votes) == 1:
+        return next(iter(votes))
+    if votes and all(dtype in NUMERIC_TYPES for dtype in votes):
+        return "Float64"
+    # Ties broken by name so the result never depends on merge order
+    return max(sorted(votes), key=lambda dtype: votes[dtype]) if votes else "object"
+
+
+# --- Byte-range splitting ---
+def _count_quotes(task: Tuple[str, int, int]) -> int:
+    path, start, end = task
+    count = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(SCAN_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            count += block.count(b'"')
+            remaining -= len(block)
+    return count
+
+
+def _next_record_start(f, offset: int, parity: int, size: int) -> int:
+    """
+    First offset >= `offset` that starts a record: just past a newline with an even number of
+    quote characters before it in the file. `parity` is that count mod 2 at `offset`.
+    Newlines inside quoted fields always sit at odd parity, so they are never split on
+    (RFC 4180 quoting; a doubled "" escape leaves the parity unchanged).
+    """
+    f.seek(offset)
+    while offset < size:
+        block = np.frombuffer(f.read(ALIGN_WINDOW_BYTES), dtype=np.uint8)
+        if len(block) == 0:
+            break
+        quotes = np.cumsum(block == QUOTE)
+        newlines = np.nonzero(block == NEWLINE)[0]
+        outside = newlines[(parity + quotes[newlines]) % 2 == 0]
+        if len(outside):
+            return offset + int(outside[0]) + 1
+        parity = (parity + int(quotes[-1])) % 2
+        offset += len(block)
+    return size
+
+
+def split_byte_ranges(path: str, map_fn=map, range_bytes: int = RANGE_BYTES) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Splits a CSV file into record-aligned byte ranges of roughly range_bytes each.
+    Returns (header end offset, [(start, end), ...]) covering every data byte exactly once.
+    Quote counts per nominal range are computed with map_fn (in parallel when given a pool's map);
+    their prefix sums give the quote parity at every nominal cut, which is then moved forward to
+    the next newline outside quotes.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        data_start = _next_record_start(f, 0, 0, size)
+        parts = max(1, -(-(size - data_start) // range_bytes))
+        nominal = [data_start + (size - data_start) * i // parts for i in range(parts + 1)]
+        counts = list(map_fn(_count_quotes, [(path, nominal[i], nominal[i + 1]) for i in range(parts)]))
+        parities = np.cumsum([0] + counts) % 2
+
+        cuts = [data_start]
+        for i in range(1, parts):
+            cut = _next_record_start(f, nominal[i], int(parities[i]), size)
+            cuts.append(max(cut, cuts[-1]))
+        cuts.append(size)
+    ranges = [(start, end) for start, end in zip(cuts[:-1], cuts[1:]) if end > start]
+    return data_start, ranges
+
+
+# --- Range profiling ---
+class _RangeReader(io.RawIOBase):
+    """Read-only view of bytes [start, end) of a file, so pandas can stream one range."""
+    def __init__(self, path: str, start: int, end: int):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        read = self._file.readinto(view)
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _profile_range(task: Tuple[str, int, int, List[str], int]) -> ProfilePartial:
+    """Process-pool entry point: profiles one record-aligned byte range (no header row)."""
+    path, start, end, columns, chunk_rows = task
+    partial = ProfilePartial(columns)
+    with io.BufferedReader(_RangeReader(path, start, end), buffer_size=1024 * 1024) as stream:
+        try:
+            with pd.read_csv(stream, header=None, names=columns, chunksize=chunk_rows,
+                             float_precision=FLOAT_PRECISION) as reader:
+                for chunk in reader:
+                    partial.update(chunk)
+        except pd.errors.EmptyDataError:
+            pass  # A range of blank lines only
+    return partial
+
+
+@contextmanager
+def ordered_map(workers: int, executor: Optional[Executor] = None):
+    """
+    Yields an ordered map(fn, tasks) for profiling work, with the same policy as
+    SimulationEngine._block_mapper: the injected executor, a process pool scoped to the call
+    when workers > 1, or the builtin map (inline).
+    """
+    if executor is not None:
+        yield executor.map
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield pool.map
+    else:
+        yield map
+
+
+class ParallelCSVProfiler:
+    """
+    Profiles a CSV file across cores: the file is split into newline-aligned byte ranges
+    (respecting quoted newlines), each range is profiled in a worker, and the partial aggregates
+    are merged in range order. The profile matches a serial pass over the same ranges for any
+    worker count.
+    """
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 chunk_rows: int = CHUNK_ROWS, range_bytes: int = RANGE_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.chunk_rows = chunk_rows
+        self.range_bytes = range_bytes
+
+    def profile(self, path: str, filename: str) -> Dict[str, Any]:
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        with ordered_map(self.workers, self.executor) as map_fn:
+            _, ranges = split_byte_ranges(path, map_fn, self.range_bytes)
+            tasks = [(path, start, end, columns, self.chunk_rows) for start, end in ranges]
+            total = ProfilePartial(columns)
+            for partial in map_fn(_profile_range, tasks):
+                total.merge(partial)
+        return total.to_profile(filename)
@@ -38,6 +38,34 @@ class ETLPipeline:
         
         return decision_table
 
+    def pivot_to_entity_matrix(self, decision_table: pd.DataFrame,
+                               entity_col: str,
+                               time_col: str = None,
+                               aggregation: str = "latest",
+                               metric_map: Dict[str, str] = None) -> pd.DataFrame:
+        """
+        Pivots a long-format Decision Table into an entity x input matrix for portfolio simulation.
+        aggregation: 'latest' (value at each entity's most recent time), 'mean' or 'sum' over time.
+        metric_map: optional {metric_name: model input} renames; other metric names are normalized
+        to snake_case (e.g. 'Operational Costs' -> 'operational_costs').
+        """
+        if aggregation not in ("latest", "mean", "sum"):
+            raise ValueError(f"Unknown aggregation '{aggregation}'. Expected latest, mean or sum")
+        if aggregation == "latest" and time_col is None:
+            raise ValueError("aggregation='latest' requires time_col")
+
+        table = decision_table
+        if aggregation == "latest":
+            table = table.sort_values(time_col, kind="stable")
+            matrix = table.pivot_table(index=entity_col, columns="metric_name", values="metric_value", aggfunc="last")
+        else:
+            matrix = table.pivot_table(index=entity_col, columns="metric_name", values="metric_value", aggfunc=aggregation)
+
+        metric_map = metric_map or {}
+        matrix.columns = [metric_map.get(c, str(c).strip().lower().replace(" ", "_")) for c in matrix.columns]
+        matrix.columns.name = None
+        return matrix
+
     def generate_confidence_report(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Returns field-level confidence stats.
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+from backend.services.csv_profiler import MAX_ANOMALIES, ProfilePartial, health_score, ordered_map
+from backend.services.readers import EXCEL_BATCH_ROWS, ExcelSheetReader, excel_sheet_names
+
+
+def _profile_sheet(task: Tuple[str, str, int]) -> ProfilePartial:
+    """Process-pool entry point: streams one worksheet through the Arrow batch aggregator."""
+    path, sheet, batch_rows = task
+    reader = ExcelSheetReader(path, sheet, batch_rows)
+    partial = ProfilePartial(reader.schema.names)
+    for batch in reader.batches():
+        partial.update_batch(batch)
+    return partial
+
+
+class WorkbookProfiler:
+    """
+    Profiles every worksheet of an .xlsx workbook with bounded memory: each sheet is streamed
+    in row batches by its own worker (openpyxl is pure Python, so sheets run in processes),
+    and the per-sheet aggregates are combined into one workbook profile in sheet order.
+    """
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 batch_rows: int = EXCEL_BATCH_ROWS):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.batch_rows = batch_rows
+
+    def profile(self, path: str, filename: str) -> Dict[str, Any]:
+        sheets = excel_sheet_names(path)
+        tasks = [(path, sheet, self.batch_rows) for sheet in sheets]
+        # A single sheet gains nothing from a worker, injected or not
+        executor = self.executor if len(sheets) > 1 else None
+        with ordered_map(min(self.workers, len(sheets)), executor) as map_fn:
+            partials = list(map_fn(_profile_sheet, tasks))
+        return workbook_profile(filename, sheets, partials)
+
+
+def workbook_profile(filename: str, sheets: List[str], partials: List[ProfilePartial]) -> Dict[str, Any]:
+    """
+    Workbook-level profile over all sheets plus a per-sheet profile under 'sheets'.
+    With several sheets, anomalies are prefixed with the sheet name and schema and column statistics
+    keys read 'sheet!column'.
+    """
+    total_cells = sum(p.rows * len(p.columns) for p in partials)
+    if total_cells == 0:
+        return {"filename": filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}, "columns": {}, "sheets": []}
+
+    single = len(partials) == 1
+    anomalies, schema, columns = [], {}, {}
+    for sheet, partial in zip(sheets, partials):
+        anomalies += partial.anomalies() if single else [f"{sheet}: {a}" for a in partial.anomalies()]
+        schema.update(partial.schema() if single else {f"{sheet}!{col}": dtype for col, dtype in partial.schema().items()})
+        columns.update(partial.column_stats() if single else {f"{sheet}!{col}": stats for col, stats in partial.column_stats().items()})
+    anomalies = anomalies[:MAX_ANOMALIES]
+
+    return {
+        "filename": filename,
+        "row_count": sum(p.rows for p in partials),
+        "health_score": health_score(sum(sum(p.missing.values()) for p in partials), len(anomalies), total_cells),
+        "anomalies": anomalies,
+        "schema": schema,
+        "columns": columns,
+        "sheets": [{"sheet": sheet, **partial.to_profile(filename)} for sheet, partial in zip(sheets, partials)]
+    }
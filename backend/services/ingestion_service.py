@@ -1,130 +1,247 @@
 import pandas as pd
 from fastapi import UploadFile
+import asyncio
+import io
 import shutil
 import tempfile
 import os
 import logging
+import uuid
+from typing import AsyncIterator, Optional
+from zipfile import BadZipFile
+import pyarrow as pa
+from openpyxl.utils.exceptions import InvalidFileException
+from backend.services.compute_pool import ComputePool
+from backend.services.csv_profiler import CHUNK_ROWS, FLOAT_PRECISION, ParallelCSVProfiler, ProfilePartial
+from backend.services.excel_profiler import WorkbookProfiler
+from backend.services.readers import ArrowCSVReader, BatchReader, open_reader
 
 logger = logging.getLogger("ingest_service")
 
+class _ChunkStream(io.RawIOBase):
+    """
+    Blocking raw stream for the parser thread over chunks handed over by the event loop.
+    The handoff is a bounded asyncio.Queue: feed() awaits free space and the parser thread waits
+    on the loop's queue through run_coroutine_threadsafe, so neither side polls.
+    A None chunk marks the end of the upload; abort() fails the parser if the upload breaks off.
+    """
+    _ABORTED = object()
+
+    def __init__(self, max_chunks: int, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._queue: asyncio.Queue = asyncio.Queue(max_chunks)
+        self._pending = memoryview(b"")
+        self._eof = False
+
+    async def feed(self, chunk: Optional[bytes], consumer: asyncio.Future):
+        """Waits for queue space; gives up once the parser has stopped (its result says why)."""
+        if not self._queue.full():
+            self._queue.put_nowait(chunk)
+            return
+        put = asyncio.ensure_future(self._queue.put(chunk))
+        await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        put.cancel()
+
+    def abort(self):
+        # Called on the loop; dropping buffered chunks guarantees room for the marker
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(self._ABORTED)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not len(self._pending):
+            if self._eof:
+                return 0
+            chunk = asyncio.run_coroutine_threadsafe(self._queue.get(), self._loop).result()
+            if chunk is self._ABORTED:
+                raise IOError("Upload ended before the end of the file")
+            if chunk is None:
+                self._eof = True
+                return 0
+            self._pending = memoryview(chunk)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
 class IngestionService:
+    # CSVs at least this large are profiled across cores; below it a process pool costs more than it saves
+    PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+    STREAM_CHUNK_BYTES = 1024 * 1024
+    # Upload chunks buffered between the request and the parser thread (bounds memory per upload)
+    STREAM_QUEUE_CHUNKS = 16
+
+    def __init__(self, workers: Optional[int] = None, persist_dir: Optional[str] = None):
+        workers = workers or os.getenv("INGEST_WORKERS")
+        self.workers = int(workers) if workers else (os.cpu_count() or 1)
+        self.persist_dir = persist_dir or os.getenv("INGEST_PERSIST_DIR")
+        # One long-lived process pool for every upload, created on first use; workers start from a
+        # fork server because the request threads make forking the server process itself unsafe
+        self.pool = ComputePool(max_workers=self.workers, kind="process", name="ingest", start_method="forkserver")
+
     async def process_file(self, file: UploadFile):
+        suffix = os.path.splitext(file.filename)[1].lower()
+        if suffix == '.csv' and not (self.workers > 1 and (file.size or 0) >= self.PARALLEL_MIN_BYTES):
+            # Starlette has already spooled the multipart body by now, so this only saves copying it
+            # into a second temp file and parsing it afterwards; /stream profiles during the transfer
+            return await self.process_stream(self._upload_chunks(file), file.filename)
+        try:
+            # Spooling and profiling (process pools for large CSVs, whole workbooks) block for seconds,
+            # so they run off the event loop
+            return await asyncio.to_thread(self._profile_spooled, file, suffix, self._persist_path(suffix))
+        except Exception as e:
+            return self._failed_profile(file.filename, e)
+
+    async def process_stream(self, chunks: AsyncIterator[bytes], filename: str):
+        """Profiles a CSV arriving as a stream of byte chunks (e.g. a raw request body)."""
+        try:
+            return await self.profile_stream(chunks, filename, self._persist_path(".csv"))
+        except Exception as e:
+            return self._failed_profile(filename, e)
+
+    def _failed_profile(self, filename: str, e: Exception):
+        if isinstance(e, pd.errors.EmptyDataError):
+             return {"filename": filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}, "columns": {}}
+        logger.error(f"Error processing file: {str(e)}")
+        # If it's a parsing error that we can catch (like UnicodeDecodeError or ParserError),
+        # we might want to return a specific profile indicating failure, or re-raise.
+        # But the requirement is "Doesn't break".
+        if isinstance(e, (UnicodeDecodeError, pd.errors.ParserError, pa.ArrowInvalid, BadZipFile, InvalidFileException)):
+             # Return a "Broken File" profile
+             return {
+                 "filename": filename,
+                 "row_count": 0,
+                 "health_score": 0,
+                 "anomalies": ["Unreadable file format or corrupted content"],
+                 "schema": {}
+             }
+        raise e
+
+    def _persist_path(self, suffix: str) -> Optional[str]:
+        """Where to keep the raw upload (INGEST_PERSIST_DIR), or None to keep nothing on disk."""
+        if not self.persist_dir:
+            return None
+        os.makedirs(self.persist_dir, exist_ok=True)
+        return os.path.join(self.persist_dir, f"{uuid.uuid4().hex}{suffix}")
+
+    async def _upload_chunks(self, file: UploadFile) -> AsyncIterator[bytes]:
+        while chunk := await file.read(self.STREAM_CHUNK_BYTES):
+            yield chunk
+
+    async def profile_stream(self, chunks: AsyncIterator[bytes], filename: str, persist_path: Optional[str] = None):
+        """
+        Profiles a CSV chunk by chunk: each chunk is handed to a parser thread (Arrow record
+        batches, types inferred per batch) through a bounded queue and, when persist_path is set,
+        written to disk by another thread at the same time. Profiling overlaps the transfer only
+        when the chunks come straight off the request body (/stream); a multipart UploadFile has
+        been fully received by Starlette before the handler runs.
+        """
+        # Opened before the parser starts, so a failed open leaves nothing to clean up
+        writer = await asyncio.to_thread(open, persist_path, "wb") if persist_path else None
+        loop = asyncio.get_running_loop()
+        stream = _ChunkStream(self.STREAM_QUEUE_CHUNKS, loop)
+        profiling = loop.run_in_executor(None, self._profile_text_stream, stream, filename)
+        received = 0
+        try:
+            try:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    pending = [stream.feed(chunk, profiling)]
+                    if writer is not None:
+                        pending.append(asyncio.to_thread(writer.write, chunk))
+                    await asyncio.gather(*pending)
+                await stream.feed(None, profiling)
+            except BaseException:
+                # The parser fails once aborted; nobody awaits it any more
+                profiling.add_done_callback(lambda f: f.cancelled() or f.exception())
+                raise
+            finally:
+                if writer is not None:
+                    await asyncio.to_thread(writer.close)
+
+            try:
+                profile = await profiling
+            except pa.ArrowInvalid:
+                if received == 0:
+                    raise pd.errors.EmptyDataError("No columns to parse from file")
+                raise
+        except BaseException:
+            # A failed upload is never reported back, so don't keep its bytes around
+            if persist_path and os.path.exists(persist_path):
+                os.unlink(persist_path)
+            raise
+        finally:
+            # Arrow reads ahead on its own thread, which may still be waiting for a chunk when
+            # parsing stopped early (or the upload broke off); the abort marker releases it
+            stream.abort()
+        if persist_path:
+            profile["stored_path"] = persist_path
+        return profile
+
+    def _profile_text_stream(self, stream: io.RawIOBase, filename: str):
+        reader = ArrowCSVReader(io.BufferedReader(stream, buffer_size=self.STREAM_CHUNK_BYTES), infer_types=False)
+        return self._profile_batches(reader, filename)
+
+    def _profile_spooled(self, file: UploadFile, suffix: str, persist_path: Optional[str]):
+        # Formats that need random access (Parquet/IPC footers, xlsx zip directory) are spooled first
         # 1. Spool to temp file to avoid RAM spike (Fix for 54GB memory issue)
-        suffix = os.path.splitext(file.filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-        
+        if persist_path:
+            tmp_path = persist_path
+            with open(tmp_path, "wb") as out:
+                shutil.copyfileobj(file.file, out)
+        else:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                shutil.copyfileobj(file.file, tmp)
+                tmp_path = tmp.name
+
         try:
             logger.info(f"Processing file streamed to disk: {tmp_path}")
-            if suffix.lower() == '.csv':
-                return self._profile_csv_stream(tmp_path, file.filename)
-            else:
-                # Excel is harder to stream, fallback to load (usually smaller than CSVs)
-                df = pd.read_excel(tmp_path)
-                return self._profile_dataframe(df, file.filename)
-        except pd.errors.EmptyDataError:
-             return {"filename": file.filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}}
-        except Exception as e:
-            logger.error(f"Error processing file: {str(e)}")
-            # If it's a parsing error that we can catch (like UnicodeDecodeError or ParserError),
-            # we might want to return a specific profile indicating failure, or re-raise.
-            # But the requirement is "Doesn't break".
-            if isinstance(e, (UnicodeDecodeError, pd.errors.ParserError)):
-                 # Return a "Broken File" profile
-                 return {
-                     "filename": file.filename,
-                     "row_count": 0,
-                     "health_score": 0,
-                     "anomalies": ["Unreadable file format or corrupted content"],
-                     "schema": {}
-                 }
-            raise e
+            profile = self._profile_path(tmp_path, suffix, file.filename)
         finally:
-            if os.path.exists(tmp_path):
+            if not persist_path and os.path.exists(tmp_path):
                 os.unlink(tmp_path)
                 logger.info("Cleaned up temp file")
+        if persist_path:
+            profile["stored_path"] = persist_path
+        return profile
+
+    def _profile_path(self, path: str, suffix: str, filename: str):
+        if suffix == '.csv':
+            if self.workers > 1 and os.path.getsize(path) >= self.PARALLEL_MIN_BYTES:
+                return ParallelCSVProfiler(workers=self.workers, executor=self.pool.executor).profile(path, filename)
+            try:
+                return self._profile_batches(open_reader(path, suffix), filename)
+            except pa.ArrowInvalid as e:
+                # Arrow fixes column types from the first block; pandas copes with types changing mid-file
+                logger.info(f"Arrow CSV reader failed ({e}); profiling with pandas")
+                return self._profile_csv_stream(path, filename)
+        elif suffix == '.xlsx':
+            # Sheets are streamed row batch by row batch, concurrently across sheets
+            return WorkbookProfiler(workers=self.workers, executor=self.pool.executor if self.workers > 1 else None).profile(path, filename)
+        return self._profile_batches(open_reader(path, suffix), filename)
 
     def _profile_csv_stream(self, filepath: str, filename: str):
         """
         Profiles CSV in chunks to keep memory usage low (< 100MB).
+        Uses the same mergeable aggregates as the parallel profiler, over a single stream.
         """
-        chunk_size = 5000
-        total_rows = 0
-        missing_counts = {}
-        anomalies = []
-        schema = {}
-        
-        first_chunk = True
+        columns = list(pd.read_csv(filepath, nrows=0).columns)
+        profile = ProfilePartial(columns)
         
         # Stream through the file
-        with pd.read_csv(filepath, chunksize=chunk_size) as reader:
+        with pd.read_csv(filepath, chunksize=CHUNK_ROWS, float_precision=FLOAT_PRECISION) as reader:
             for chunk in reader:
-                # 1. Schema Inference (from first chunk)
-                if first_chunk:
-                    chunk = chunk.convert_dtypes()
-                    for col in chunk.columns:
-                        schema[col] = str(chunk[col].dtype)
-                        missing_counts[col] = 0
-                    first_chunk = False
-                
-                # 2. Update Aggregates
-                total_rows += len(chunk)
-                
-                # Count missing per column
-                chunk_missing = chunk.isnull().sum()
-                for col, count in chunk_missing.items():
-                    if col in missing_counts:
-                        missing_counts[col] += count
-                
-                # Sample anomalies (limit to first 10 occurrences found)
-                if len(anomalies) < 10:
-                    numeric_cols = chunk.select_dtypes(include=['number']).columns
-                    for col in numeric_cols:
-                        if (chunk[col] < 0).any():
-                            anomalies.append(f"Negative values detected in column '{col}'")
-                            if len(anomalies) >= 10: break
-
-        # 3. Calculate Final Health Score
-        total_cells = total_rows * len(schema)
-        if total_cells == 0:
-            return {"filename": filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}}
-
-        total_missing = sum(missing_counts.values())
-        health_score = max(0, int(100 - ((total_missing + len(anomalies) * 100) / total_cells * 1000))) 
-        # Heuristic: Penalize missing data (weighted)
-
-        return {
-            "filename": filename,
-            "row_count": total_rows,
-            "health_score": health_score,
-            "anomalies": list(set(anomalies))[:10],
-            "schema": schema
-        }
-
-    def _profile_dataframe(self, df: pd.DataFrame, filename: str):
-        # Fallback for Excel
-        row_count = len(df)
-        if row_count == 0:
-             return {"filename": filename, "row_count": 0, "health_score": 0, "anomalies": ["Empty File"], "schema": {}}
-        
-        anomalies = []
-        schema = {col: str(df[col].dtype) for col in df.columns}
-        missing = df.isnull().sum().sum()
-        
-        # Simple negative check
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        for col in numeric_cols:
-            if (df[col] < 0).any():
-                anomalies.append(f"Negative values detected in column '{col}'")
-
-        total_cells = row_count * len(df.columns)
-        health_score = max(0, int(100 - (missing / total_cells * 500)))
-
-        return {
-            "filename": filename,
-            "row_count": row_count,
-            "health_score": health_score,
-            "anomalies": anomalies[:10],
-            "schema": schema
-        }
+                profile.update(chunk)
+
+        return profile.to_profile(filename)
+
+    def _profile_batches(self, reader: BatchReader, filename: str):
+        """Profiles Arrow record batches (CSV, Parquet, Arrow IPC/Feather) with Arrow compute kernels."""
+        profile = ProfilePartial(reader.schema.names)
+        for batch in reader.batches():
+            profile.update_batch(batch)
+        return profile.to_profile(filename)
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 import time
 from fastapi import APIRouter, Response
 
@@ -26,6 +26,37 @@ MODEL_ERRORS = Counter(
     'Total AI Model failures'
 )
 
+SIMULATION_CACHE_EVENTS = Counter(
+    'simulation_cache_events_total',
+    'Simulation result cache events',
+    ['tier', 'event'] # tier=memory|disk, event=hit|miss|eviction|expired
+)
+
+COMPUTE_QUEUE_DEPTH = Gauge(
+    'compute_queue_depth',
+    'Admitted engine jobs waiting for a free worker',
+    ['pool']
+)
+
+COMPUTE_JOBS_IN_FLIGHT = Gauge(
+    'compute_jobs_in_flight',
+    'Admitted engine jobs not yet finished (running + queued)',
+    ['pool']
+)
+
+COMPUTE_QUEUE_WAIT = Histogram(
+    'compute_queue_wait_seconds',
+    'Time engine jobs wait in the queue before a worker picks them up',
+    ['pool'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+COMPUTE_REJECTIONS = Counter(
+    'compute_jobs_rejected_total',
+    'Engine jobs rejected because the compute pool was saturated',
+    ['pool']
+)
+
 # --- Service Class ---
 class MonitoringService:
     def track_request(self, method: str, endpoint: str, status: int):
@@ -38,6 +69,19 @@ class MonitoringService:
         # Simplified tracking
         TOKEN_USAGE.labels(model=model, type="total").inc(usage)
 
+    def track_cache_event(self, tier: str, event: str):
+        SIMULATION_CACHE_EVENTS.labels(tier=tier, event=event).inc()
+
+    def track_compute_load(self, pool: str, in_flight: int, queued: int):
+        COMPUTE_JOBS_IN_FLIGHT.labels(pool=pool).set(in_flight)
+        COMPUTE_QUEUE_DEPTH.labels(pool=pool).set(queued)
+
+    def track_queue_wait(self, pool: str, seconds: float):
+        COMPUTE_QUEUE_WAIT.labels(pool=pool).observe(seconds)
+
+    def track_compute_rejection(self, pool: str):
+        COMPUTE_REJECTIONS.labels(pool=pool).inc()
+
 monitor = MonitoringService()
 
 # --- Router for scraping ---
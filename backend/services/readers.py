@@ -0,0 +1,291 @@
+import csv
+import io
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Type, Union
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+# Target bytes of CSV text parsed per record batch
+CSV_BLOCK_BYTES = 4 * 1024 * 1024
+PARQUET_BATCH_ROWS = 64 * 1024
+EXCEL_BATCH_ROWS = 5000
+
+
+class BatchReader:
+    """
+    Streams a file as Arrow record batches, so profiling never materializes the whole file.
+    Subclasses are registered per file extension with register_reader().
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def schema(self) -> pa.Schema:
+        raise NotImplementedError
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        raise NotImplementedError
+
+
+class ArrowCSVReader(BatchReader):
+    """
+    Multi-threaded streaming CSV parser over a path or a binary file-like object.
+
+    infer_types=True: Arrow infers column types from the first block; a value that does not fit
+        them later in the file raises pyarrow.ArrowInvalid. Columns inferred as dates or
+        timestamps are read back as text, as pandas does without parse_dates, so a CSV profiles
+        the same on every path (only typed formats such as Parquet report datetime columns).
+    infer_types=False: every column is parsed as text and each batch is narrowed on its own
+        (int64, else float64, else boolean, else string), like pandas inferring per chunk; dates
+        stay text as they do with pandas. Types may then change from batch to batch without
+        failing, which is what a one-pass stream needs.
+    """
+    def __init__(self, source: Union[str, BinaryIO], block_size: int = CSV_BLOCK_BYTES, infer_types: bool = True):
+        super().__init__(source if isinstance(source, str) else getattr(source, "name", "<stream>"))
+        self.infer_types = infer_types
+        column_types = None
+        if not infer_types:
+            stream = open(source, "rb") if isinstance(source, str) else source
+            head, end = _read_header(stream)
+            names = next(csv.reader(io.StringIO(head[:end].decode("utf-8"))), [])
+            column_types = {name: pa.string() for name in names}
+            source = io.BufferedReader(_PrefixedStream(head, stream))
+
+        self._reader = _open_csv(source, block_size, column_types)
+        if infer_types and isinstance(source, str):
+            temporal = {f.name: pa.string() for f in self._reader.schema if _is_temporal(f.type)}
+            if temporal:
+                self._reader = _open_csv(source, block_size, temporal)
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self._reader.schema
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        for batch in self._reader:
+            yield batch if self.infer_types else _narrow_text_batch(batch)
+
+
+def _open_csv(source: Union[str, BinaryIO], block_size: int, column_types: Optional[Dict[str, pa.DataType]]):
+    return pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        # Empty fields are missing values in every column, as with pandas
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True, column_types=column_types)
+    )
+
+
+def _is_temporal(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type) or pa.types.is_time(arrow_type)
+
+
+def _narrow_text_batch(batch: pa.RecordBatch, probe_rows: int = 64) -> pa.RecordBatch:
+    columns = []
+    for array in batch.columns:
+        for target in (pa.int64(), pa.float64(), pa.bool_()):
+            # A failed cast costs as much as a full parse, so a small probe rules out most targets first
+            if _cast_or_none(array.slice(0, probe_rows), target) is None:
+                continue
+            narrowed = _cast_or_none(array, target)
+            if narrowed is not None:
+                array = narrowed
+                break
+        columns.append(array)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def _cast_or_none(array: pa.Array, target: pa.DataType) -> Optional[pa.Array]:
+    try:
+        return pc.cast(array, target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def _read_header(stream: BinaryIO, block: int = 64 * 1024):
+    """
+    Reads until the header record is complete. Returns (bytes read, end of the header record),
+    where the header ends at the first newline outside quotes (or at the end of a one-line file).
+    """
+    head = b""
+    while True:
+        end = _record_end(head)
+        if end is not None:
+            return head, end
+        chunk = stream.read(block)
+        if not chunk:
+            return head, len(head)
+        head += chunk
+
+
+def _record_end(data: bytes) -> Optional[int]:
+    codes = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.nonzero(codes == ord("\n"))[0]
+    outside = newlines[np.cumsum(codes == ord('"'))[newlines] % 2 == 0]
+    return int(outside[0]) + 1 if len(outside) else None
+
+
+class _PrefixedStream(io.RawIOBase):
+    """Raw stream that replays already-consumed bytes before continuing with the source."""
+    def __init__(self, prefix: bytes, source: BinaryIO):
+        self._prefix = memoryview(prefix)
+        self._source = source
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if len(self._prefix):
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class ParquetReader(BatchReader):
+    """Reads Parquet row groups batch by batch; types come from the file's own schema."""
+    def __init__(self, path: str, batch_size: int = PARQUET_BATCH_ROWS):
+        super().__init__(path)
+        self._file = pq.ParquetFile(path)
+        self.batch_size = batch_size
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self._file.schema_arrow
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        yield from self._file.iter_batches(batch_size=self.batch_size)
+
+
+class ArrowIPCReader(BatchReader):
+    """Arrow IPC file format (including Feather v2), or the IPC streaming format."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._source = pa.memory_map(path, "r")
+        try:
+            self._file = pa_ipc.open_file(self._source)
+            self._stream = None
+        except pa.ArrowInvalid:
+            self._source.seek(0)
+            self._file = None
+            self._stream = pa_ipc.open_stream(self._source)
+
+    @property
+    def schema(self) -> pa.Schema:
+        return (self._file or self._stream).schema
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        if self._file is not None:
+            for i in range(self._file.num_record_batches):
+                yield self._file.get_batch(i)
+        else:
+            yield from self._stream
+
+
+class ExcelSheetReader(BatchReader):
+    """
+    Streams one worksheet of an .xlsx workbook in row batches (openpyxl read_only mode parses
+    the sheet XML lazily), so memory is bounded by batch_rows regardless of the sheet size.
+    The first row is the header; rows with no values at all are skipped. Each batch gets its own
+    column types: a column mixing numbers and text within a batch becomes string.
+    """
+    def __init__(self, path: str, sheet: Optional[str] = None, batch_rows: int = EXCEL_BATCH_ROWS):
+        super().__init__(path)
+        self._workbook = load_workbook(path, read_only=True, data_only=True)
+        self._sheet = self._workbook[sheet] if sheet is not None else self._workbook.worksheets[0]
+        self.batch_rows = batch_rows
+        self._rows = self._sheet.iter_rows(values_only=True)
+        header = next(self._rows, ())
+        # Without a dimension record, trailing blank header cells are lost and later cells past
+        # the header's width are ignored (a stream cannot widen its schema retroactively)
+        width = max(len(header), self._sheet.max_column or 0)
+        self._names = _column_names(tuple(header) + (None,) * (width - len(header)))
+
+    @property
+    def schema(self) -> pa.Schema:
+        return pa.schema([(name, pa.null()) for name in self._names])
+
+    def batches(self) -> Iterator[pa.RecordBatch]:
+        try:
+            width = len(self._names)
+            buffer: List[tuple] = []
+            for row in self._rows:
+                if all(value is None for value in row):
+                    continue
+                buffer.append(tuple(row[:width]) + (None,) * (width - len(row)))
+                if len(buffer) == self.batch_rows:
+                    yield _rows_to_batch(buffer, self._names)
+                    buffer = []
+            if buffer:
+                yield _rows_to_batch(buffer, self._names)
+        finally:
+            self.close()
+
+    def close(self):
+        # read_only workbooks keep the archive open until closed
+        self._workbook.close()
+
+
+def excel_sheet_names(path: str) -> List[str]:
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _column_names(header: tuple) -> List[str]:
+    """pandas-style header names: blanks become 'Unnamed: i' and duplicates get '.1', '.2' suffixes."""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _rows_to_batch(rows: List[tuple], names: List[str]) -> pa.RecordBatch:
+    columns = []
+    for values in zip(*rows):
+        try:
+            columns.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columns.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+READERS: Dict[str, Type[BatchReader]] = {}
+
+def register_reader(extension: str, reader: Type[BatchReader]):
+    READERS[extension.lower()] = reader
+
+register_reader(".csv", ArrowCSVReader)
+register_reader(".parquet", ParquetReader)
+register_reader(".pq", ParquetReader)
+register_reader(".arrow", ArrowIPCReader)
+register_reader(".ipc", ArrowIPCReader)
+register_reader(".feather", ArrowIPCReader)
+
+
+def supported_extensions() -> List[str]:
+    # Workbooks are read sheet by sheet (ExcelSheetReader via WorkbookProfiler), not via open_reader
+    return sorted(READERS) + [".xlsx"]
+
+
+def open_reader(path: str, extension: str = None) -> BatchReader:
+    extension = (extension or os.path.splitext(path)[1]).lower()
+    if extension not in READERS:
+        raise ValueError(f"No reader registered for '{extension}' files")
+    return READERS[extension](path)
@@ -0,0 +1,29 @@
+from typing import Any, Dict
+from backend.engine.simulation import SimulationEngine
+from backend.engine.risk import RiskAnalyzer
+from backend.engine.stress_library import load_stress_library
+from backend.services.workflow_service import DEFAULT_BASELINE
+
+class RiskService:
+    def __init__(self, library_path: str = None):
+        self.library_path = library_path
+        self.analyzer = RiskAnalyzer()
+
+    def library_summary(self) -> Dict[str, Any]:
+        return load_stress_library(self.library_path).summary()
+
+    def run_stress_tests(self, request) -> Dict[str, Any]:
+        baseline = {**DEFAULT_BASELINE, **(request.baseline or {})}
+        engine = SimulationEngine(baseline, seed=request.seed)
+        return self.analyzer.run_stress_library(
+            engine, baseline,
+            library=load_stress_library(self.library_path),
+            packs=request.packs,
+            metric=request.metric,
+            constraints=request.constraints,
+            monte_carlo=request.monte_carlo,
+            iterations=request.iterations,
+            rank_by=request.rank_by,
+            page=request.page,
+            page_size=request.page_size
+        )
@@ -0,0 +1,130 @@
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Any, Callable
+import numpy as np
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are opt-in; JSON is always available
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Response format negotiated for the request being handled (see NumpyRoute)
+_response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+
+def _json_default(obj: Any) -> Any:
+    # orjson serializes numpy scalars and contiguous numeric arrays natively; this covers the rest
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(content: Any) -> bytes:
+    """JSON bytes for API payloads, with native NumPy support (NaN/inf become null)."""
+    return orjson.dumps(content, default=_json_default, option=JSON_OPTIONS)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    # Numeric arrays travel as raw little-endian buffers: decode with np.frombuffer(data, dtype).reshape(shape)
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "biuf":
+        array = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder("<"))
+        return {"__ndarray__": True, "dtype": array.dtype.str, "shape": list(array.shape), "data": array.tobytes()}
+    if isinstance(obj, (tuple, set)):
+        return list(obj)
+    return _json_default(obj)
+
+
+def encode_msgpack(content: Any) -> bytes:
+    if msgpack is None:
+        raise RuntimeError("MessagePack responses require the msgpack package")
+    return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; NumPy scalars and arrays need no conversion first."""
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+class MsgPackResponse(Response):
+    """Compact binary alternative for large array payloads (opt-in via Accept: application/x-msgpack)."""
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return encode_msgpack(content)
+
+
+def preferred_format(request: Request) -> str:
+    accept = request.headers.get("accept", "")
+    return "msgpack" if msgpack is not None and MSGPACK_MEDIA_TYPE in accept else "json"
+
+
+def _respond_directly(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        if _response_format.get() == "msgpack":
+            return MsgPackResponse(result)
+        return NumpyJSONResponse(result)
+    return wrapper
+
+
+class NumpyRoute(APIRoute):
+    """
+    Route class for routers that return NumPy-heavy dicts.
+
+    FastAPI passes results of routes without a response_model through jsonable_encoder, which
+    walks every value in Python before the response class sees it. For those (async) routes the
+    result is rendered straight into a NumpyJSONResponse, or a MsgPackResponse when the client
+    sends Accept: application/x-msgpack. Routes with a response_model keep pydantic validation
+    and are rendered by the router's default_response_class.
+    """
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model")
+        unmodelled = response_model is None or (isinstance(response_model, DefaultPlaceholder)
+                                                and inspect.signature(endpoint).return_annotation is inspect.Signature.empty)
+        if unmodelled and inspect.iscoroutinefunction(endpoint):
+            endpoint = _respond_directly(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiating_handler(request: Request) -> Response:
+            token = _response_format.set(preferred_format(request))
+            try:
+                return await handler(request)
+            finally:
+                _response_format.reset(token)
+        return negotiating_handler
+
+
+def decode_msgpack(payload: bytes) -> Any:
+    """Inverse of encode_msgpack, restoring arrays (for Python clients and tests)."""
+    if msgpack is None:
+        raise RuntimeError("MessagePack responses require the msgpack package")
+
+    def hook(obj: dict) -> Any:
+        if obj.get("__ndarray__"):
+            return np.frombuffer(obj["data"], dtype=obj["dtype"]).reshape(obj["shape"])
+        return obj
+    return msgpack.unpackb(payload, object_hook=hook, raw=False)
+
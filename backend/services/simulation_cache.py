@@ -0,0 +1,174 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from backend.services.monitoring import monitor
+
+logger = logging.getLogger("simulation_cache")
+
+# Marks a dict stored on disk as [key, value] pairs because its keys are not all strings
+PAIRS_KEY = "__pairs__"
+
+def _canonical(value: Any) -> Any:
+    """Normalizes a request fragment so equal scenarios hash equally (5000 == 5000.0, key order ignored)."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)) or value is None or isinstance(value, str):
+        return bool(value) if isinstance(value, np.bool_) else value
+    if isinstance(value, (int, np.integer)):
+        # Ints stay exact: a float would map seeds above 2**53 onto their neighbours
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    raise TypeError(f"Cannot fingerprint value of type {type(value).__name__}")
+
+def _to_json(value: Any) -> Any:
+    """JSON-safe form that keeps non-string dict keys (e.g. tail_risk thresholds) as [key, value] pairs."""
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _to_json(v) for k, v in value.items()}
+        return {PAIRS_KEY: [[k, _to_json(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and PAIRS_KEY in value:
+            return {k: _from_json(v) for k, v in value[PAIRS_KEY]}
+        return {k: _from_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    return value
+
+def scenario_fingerprint(**fields) -> str:
+    """Canonical SHA-256 of a simulation request (baseline, overrides, constraints, iterations, sampling, seed, ...)."""
+    canonical = json.dumps(_canonical(fields), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SimulationResultCache:
+    """
+    Two-tier cache for simulation results keyed by scenario fingerprint.
+
+    Memory tier: LRU bounded by max_entries, entries expire after ttl_seconds.
+    Disk tier (optional): one JSON file per fingerprint under disk_dir, so results survive
+    restarts; disk entries expire after disk_ttl_seconds (None = never).
+    Results must be JSON-serializable apart from non-string dict keys, which the disk tier
+    preserves; callers receive copies.
+    Hit/miss/eviction/expiry counts are exported through the monitoring service.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0,
+                 disk_dir: Optional[str] = None, disk_ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- Memory tier ---
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                monitor.track_cache_event("memory", "miss")
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                monitor.track_cache_event("memory", "expired")
+                monitor.track_cache_event("memory", "miss")
+                return None
+            self._entries.move_to_end(key)
+        monitor.track_cache_event("memory", "hit")
+        return value
+
+    def _memory_put(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                monitor.track_cache_event("memory", "eviction")
+
+    # --- Disk tier ---
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            monitor.track_cache_event("disk", "miss")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            monitor.track_cache_event("disk", "miss")
+            return None
+
+        if self.disk_ttl_seconds is not None and time.time() - entry["created_at"] >= self.disk_ttl_seconds:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            monitor.track_cache_event("disk", "expired")
+            monitor.track_cache_event("disk", "miss")
+            return None
+        monitor.track_cache_event("disk", "hit")
+        return _from_json(entry["result"])
+
+    def _disk_put(self, key: str, value: Dict[str, Any]):
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"created_at": time.time(), "result": _to_json(value)}, f)
+            os.replace(tmp_path, self._disk_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not persist cache entry {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    # --- Public API ---
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory_get(key)
+        if value is None and self.disk_dir:
+            value = self._disk_get(key)
+            if value is not None:
+                self._memory_put(key, value)
+        return copy.deepcopy(value) if value is not None else None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        value = copy.deepcopy(value)
+        self._memory_put(key, value)
+        if self.disk_dir:
+            self._disk_put(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,37 +1,178 @@
+import hashlib
+import os
+import numpy as np
+from typing import Callable, Optional
 from backend.engine.simulation import SimulationEngine
 from backend.engine.risk import RiskAnalyzer
+from backend.engine.optimizer import DecisionOptimizer
+from backend.services.etl_pipeline import ETLPipeline
+from backend.engine.sampling import DrawCache, standard_normals
+from backend.services.simulation_cache import SimulationResultCache, scenario_fingerprint
+
+# Planning baseline used until scenarios are derived from uploaded data
+DEFAULT_BASELINE = {
+    "revenue": 50000.0,
+    "fixed_costs": 15000.0,
+    "operational_costs": 20000.0,
+    "marketing_spend": 5000.0
+}
+
+_process_service: Optional["WorkflowService"] = None
+
+def _process_local_service() -> "WorkflowService":
+    """This process's WorkflowService, with its own caches (built on first use)."""
+    global _process_service
+    if _process_service is None:
+        _process_service = WorkflowService()
+    return _process_service
+
 
 class WorkflowService:
-    def run_simulation(self, params):
+    SIMULATION_ITERATIONS = 1000
+    HORIZON_MONTHS = 6
+
+    def __init__(self, draw_cache: DrawCache = None, result_cache: SimulationResultCache = None):
+        # Per-session standard-normal draws, reused across slider what-ifs (common random numbers)
+        self.draw_cache = draw_cache or DrawCache(max_entries=256)
+        # Finished responses for seeded scenarios; a repeated slider position skips the engine entirely
+        self.result_cache = result_cache or SimulationResultCache(
+            max_entries=1024, ttl_seconds=300.0, disk_dir=os.getenv("SIMULATION_CACHE_DIR"))
+
+    def __reduce__(self):
+        # The caches hold locks and cannot cross a process boundary: a job shipped to a process
+        # pool (e.g. service.run_simulation) runs on the worker process's own service instead
+        return _process_local_service, ()
+
+    def _scenario_seed(self, params) -> Optional[int]:
+        """Explicit seed if given, else a stable seed derived from the session id, else None (fresh draws)."""
+        if params.seed is not None:
+            return params.seed
+        if params.session_id:
+            return int.from_bytes(hashlib.sha256(params.session_id.encode()).digest()[:8], "big")
+        return None
+
+    def _scenario_overrides(self, params, baseline: dict) -> dict:
         # Param mapping (simplified)
-        baseline = {
-            "revenue": 50000.0,
-            "fixed_costs": 15000.0,
-            "operational_costs": 20000.0,
-            "marketing_spend": 5000.0
-        }
-        
-        # Apply overrides from params
         overrides = {}
         if params.hiring_freeze:
              overrides["operational_costs"] = 18000.0 # Save 2k
              
         if params.marketing_spend_delta != 0:
              overrides["marketing_spend"] = baseline["marketing_spend"] + params.marketing_spend_delta
+        return overrides
+
+    def _cache_key(self, baseline: dict, overrides: dict, seed: int) -> str:
+        return scenario_fingerprint(
+            op="workflow_simulate",
+            baseline=baseline,
+            overrides=overrides,
+            iterations=self.SIMULATION_ITERATIONS,
+            horizon=self.HORIZON_MONTHS,
+            sampling="pseudo",
+            seed=seed
+        )
+
+    def run_simulation(self, params):
+        baseline = dict(DEFAULT_BASELINE)
+        overrides = self._scenario_overrides(params, baseline)
+
+        seed = self._scenario_seed(params)
+        if seed is None:
+            return self._simulate(baseline, overrides, seed)
+
+        key = self._cache_key(baseline, overrides, seed)
+        return self.result_cache.get_or_compute(key, lambda: self._simulate(baseline, overrides, seed))
+
+    def run_simulation_batch(self, scenarios: list, seed: Optional[int] = None, draws: Optional[tuple] = None) -> list:
+        """
+        Evaluates many scenarios together: one batched Monte Carlo pass and one batched time-series
+        pass for the whole list, all on the same draws (so scenarios are directly comparable).
+        With a seed, results match run_simulation for the same seed and share its cache entries.
+        Without one, pass draws from fresh_draws() to keep several calls on the same draws; they are
+        used as given and neither the draws nor the results are cached.
+        """
+        baseline = dict(DEFAULT_BASELINE)
+        overrides = [self._scenario_overrides(params, baseline) for params in scenarios]
+        results = [None] * len(scenarios)
+        keys = [self._cache_key(baseline, o, seed) for o in overrides] if seed is not None and draws is None else None
 
+        missing = list(range(len(scenarios)))
+        if keys is not None:
+            for i, key in enumerate(keys):
+                results[i] = self.result_cache.get(key)
+            missing = [i for i, r in enumerate(results) if r is None]
+
+        if missing:
+            computed = self._simulate_batch(baseline, [overrides[i] for i in missing], seed, draws)
+            for i, result in zip(missing, computed):
+                results[i] = result
+                if keys is not None:
+                    self.result_cache.put(keys[i], result)
+        return results
+
+    def fresh_draws(self) -> tuple:
+        """Unseeded (Monte Carlo draws, time-series draws) for run_simulation_batch, never cached."""
+        return self._draws(SimulationEngine(dict(DEFAULT_BASELINE)), None)
+
+    def _draws(self, engine: SimulationEngine, seed: Optional[int]):
+        """(Monte Carlo draws, time-series draws) for a session seed, or fresh ones without a seed."""
+        series_dims = engine.uncertainty.dims * self.HORIZON_MONTHS
+        if seed is not None:
+            return (self.draw_cache.get(seed, self.SIMULATION_ITERATIONS, engine.uncertainty.dims),
+                    self.draw_cache.get(seed, self.SIMULATION_ITERATIONS, series_dims))
+        rng = np.random.default_rng()
+        return (standard_normals("pseudo", self.SIMULATION_ITERATIONS, engine.uncertainty.dims, rng),
+                standard_normals("pseudo", self.SIMULATION_ITERATIONS, series_dims, rng))
+
+    def _simulate_batch(self, baseline: dict, overrides: list, seed: Optional[int], draws: Optional[tuple] = None) -> list:
+        engine = SimulationEngine(baseline)
+        draws, series_draws = draws if draws is not None else self._draws(engine, seed)
+        periods = self.HORIZON_MONTHS
+
+        # Scenarios may override different inputs; missing ones fall back to the baseline
+        mc = engine.run_batch(overrides, draws=draws)
+        series = engine.run_time_series_batch(overrides, periods=periods, draws=series_draws)
+        baseline_cash = engine.run_time_series(periods=periods, draws=series_draws)["cash_balance"]["p50"]
+        base_cash_flow = baseline['revenue'] - sum(list(baseline.values())[1:])
+
+        balance = series["cash_balance"]
+        return [{
+            "baseline_cash": baseline_cash,
+            "scenario_cash": balance["p50"][i].tolist(),
+            "scenario_bands": {"p10": balance["p10"][i].tolist(), "p90": balance["p90"][i].tolist()},
+            "savings_impact": float(mc["mean"][i]) - base_cash_flow,
+            "uncertainty": {
+                "p10": float(mc["p10"][i]),
+                "p90": float(mc["p90"][i]),
+                "std_dev": float(mc["std_dev"][i])
+            }
+        } for i in range(len(overrides))]
+
+    def _simulate(self, baseline: dict, overrides: dict, seed: Optional[int]):
         # Run Engine
         engine = SimulationEngine(baseline)
-        mc_results = engine.run_monte_carlo(overrides, iterations=1000)
-        
-        # Calculate Mock Cash Flow Series for Chart (P50 trend)
-        # In a real app, we'd simulate time-series month-over-month.
-        # Here we just distribute the annual result roughly over 6 months
-        monthly_avg = mc_results['p50'] / 6
-        scenario_trend = [monthly_avg * (1 + i*0.05) for i in range(6)] # grow slightly
+        if seed is not None:
+            # Same session -> same draws, so a slider change only rescales and re-aggregates
+            draws = self.draw_cache.get(seed, self.SIMULATION_ITERATIONS, engine.uncertainty.dims)
+            mc_results = engine.run_monte_carlo(overrides, draws=draws)
+        else:
+            mc_results = engine.run_monte_carlo(overrides, iterations=self.SIMULATION_ITERATIONS)
         
+        # Monthly cash balance paths for the chart; baseline and scenario share the same draws
+        periods = self.HORIZON_MONTHS
+        series_dims = engine.uncertainty.dims * periods
+        if seed is not None:
+            series_draws = self.draw_cache.get(seed, self.SIMULATION_ITERATIONS, series_dims)
+        else:
+            series_draws = standard_normals("pseudo", self.SIMULATION_ITERATIONS, series_dims, np.random.default_rng())
+        baseline_series = engine.run_time_series(periods=periods, draws=series_draws)
+        scenario_series = engine.run_time_series(overrides, periods=periods, draws=series_draws)
+        scenario_balance = scenario_series["cash_balance"]
+
         return {
-            "baseline_cash": [5000] * 6, # flat baseline
-            "scenario_cash": scenario_trend,
+            "baseline_cash": baseline_series["cash_balance"]["p50"],
+            "scenario_cash": scenario_balance["p50"],
+            "scenario_bands": {"p10": scenario_balance["p10"], "p90": scenario_balance["p90"]},
             "savings_impact": mc_results['mean'] - (baseline['revenue'] - sum(list(baseline.values())[1:])),
             "uncertainty": {
                 "p10": mc_results['p10'],
@@ -40,6 +181,61 @@ class WorkflowService:
             }
         }
 
+    def stream_simulation(self, params, iterations: int, report_every: int,
+                          emit: Callable[[dict], None], cancelled=None) -> Optional[dict]:
+        """
+        Progressive Monte Carlo for one scenario: calls emit(update) every report_every iterations
+        with running p10/p50/p90/mean, the confidence widths and savings_impact so far.
+        Stops at the next block boundary once `cancelled` (an Event, or ComputePool.event()) is set,
+        emitting the estimate reached so far; returns the last update sent.
+        """
+        baseline = dict(DEFAULT_BASELINE)
+        overrides = self._scenario_overrides(params, baseline)
+        engine = SimulationEngine(baseline, seed=self._scenario_seed(params))
+        base_cash_flow = baseline['revenue'] - sum(list(baseline.values())[1:])
+
+        last = None
+        should_stop = cancelled.is_set if cancelled is not None else None
+        for update in engine.iter_monte_carlo(overrides, iterations=iterations, report_every=report_every,
+                                              should_stop=should_stop):
+            last = {**update, "savings_impact": update["mean"] - base_cash_flow}
+            emit(last)
+        return last
+
+    def optimize_decision(self, request):
+        baseline = {**DEFAULT_BASELINE, **(request.baseline or {})}
+        engine = SimulationEngine(baseline, seed=request.seed)
+        optimizer = DecisionOptimizer(
+            engine, baseline,
+            bounds={name: tuple(limits) for name, limits in request.bounds.items()},
+            metric=request.metric,
+            objective=request.objective,
+            constraints=request.constraints,
+            risk_aversion=request.risk_aversion,
+            cvar_level=request.cvar_level,
+            iterations=request.iterations
+        )
+        return optimizer.optimize(request.method, population=request.population,
+                                  generations=request.generations, grid_points=request.grid_points)
+
+    def run_portfolio_simulation(self, decision_table, entity_col: str, time_col: str = None,
+                                 aggregation: str = "latest", metric_map: dict = None, iterations: int = None,
+                                 shock_correlation: float = 0.0, seed: Optional[int] = None):
+        """
+        Simulates every entity of an uploaded decision table instead of the fixed planning baseline.
+        Inputs an entity lacks fall back to DEFAULT_BASELINE.
+        """
+        matrix = ETLPipeline().pivot_to_entity_matrix(decision_table, entity_col, time_col, aggregation, metric_map)
+        engine = SimulationEngine(dict(DEFAULT_BASELINE), seed=seed)
+        result = engine.run_portfolio(
+            {col: matrix[col].to_numpy(dtype=float) for col in matrix.columns},
+            entity_ids=matrix.index.tolist(),
+            iterations=iterations or self.SIMULATION_ITERATIONS,
+            shock_correlation=shock_correlation
+        )
+        result["per_entity"] = {k: v.tolist() for k, v in result["per_entity"].items()}
+        return result
+
     def generate_memo(self, scenario_id: str, decision_type: str):
         # In real app, would use LLM to generate text based on scenario data
         return {
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+import pytest
+from prometheus_client import generate_latest
+from backend.services.compute_pool import ComputePool, ComputePoolSaturated
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_engine_work():
+    pool = ComputePool(max_workers=1, max_queue=0, name="test-loop")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    result = await pool.run(lambda: time.sleep(0.2) or 42)
+    task.cancel()
+    pool.shutdown()
+
+    assert result == 42
+    assert ticks >= 5
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_retry_after():
+    pool = ComputePool(max_workers=1, max_queue=1, name="test-admission")
+    gate = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(gate.wait))
+    queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+    await asyncio.sleep(0.05)
+    assert pool.in_flight == 2 and pool.queued == 1
+
+    with pytest.raises(ComputePoolSaturated) as exc:
+        await pool.run(lambda: "rejected")
+    assert exc.value.retry_after >= 1
+
+    gate.set()
+    assert await queued == "queued"
+    await running
+    await asyncio.sleep(0.05)
+    assert pool.in_flight == 0
+    pool.shutdown()
+
+    text = generate_latest().decode()
+    assert 'compute_jobs_rejected_total{pool="test-admission"} 1.0' in text
+    assert 'compute_queue_wait_seconds_count{pool="test-admission"} 2.0' in text
+    assert 'compute_queue_depth{pool="test-admission"} 0.0' in text
+
+def test_simulate_returns_503_when_saturated(client, monkeypatch):
+    pool = ComputePool(max_workers=1, max_queue=0, name="test-http")
+    gate = threading.Event()
+    pool.submit(gate.wait)
+    monkeypatch.setattr("backend.routers.workflow.compute_pool", pool)
+
+    try:
+        response = client.post("/api/workflow/simulate", json={"marketing_spend_delta": 0.0, "hiring_freeze": False})
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        # Health checks are unaffected
+        assert client.get("/health").status_code == 200
+    finally:
+        gate.set()
+        pool.shutdown()
+
+def test_simulate_runs_on_a_process_pool(client, monkeypatch):
+    payload = {"marketing_spend_delta": 500.0, "hiring_freeze": True, "seed": 7}
+    threaded = client.post("/api/workflow/simulate", json=payload).json()
+
+    pool = ComputePool(max_workers=1, kind="process", name="test-process")
+    monkeypatch.setattr("backend.routers.workflow.compute_pool", pool)
+    try:
+        response = client.post("/api/workflow/simulate", json=payload)
+        assert response.status_code == 200
+        assert response.json() == threaded
+
+        # Progress updates and the cancel flag cross the process boundary too
+        stream = client.post("/api/workflow/simulate/stream", json={**payload, "iterations": 20_000, "report_every": 5_000})
+        events = [line[len("event: "):] for line in stream.text.splitlines() if line.startswith("event: ")]
+        assert events[0] == "started" and events[-1] == "done"
+        assert events.count("progress") >= 2
+    finally:
+        pool.shutdown()
@@ -0,0 +1,85 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from backend.services.csv_profiler import ParallelCSVProfiler, split_byte_ranges
+from backend.services.ingestion_service import IngestionService
+
+@pytest.fixture
+def quoted_csv(tmp_path):
+    rng = np.random.default_rng(1)
+    rows = 3000
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        # Quoted fields with embedded newlines and doubled-quote escapes
+        "note": [f'line one\nsays "hi" {i}' if i % 7 == 0 else f"plain {i}" for i in range(rows)],
+        "amount": np.where(rng.random(rows) < 0.05, np.nan, rng.normal(100, 80, rows)),
+        "region": rng.choice(["north", "south", None], rows),
+    })
+    path = tmp_path / "quoted.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+def test_byte_ranges_never_split_quoted_records(quoted_csv):
+    path, df = quoted_csv
+    data_start, ranges = split_byte_ranges(path, range_bytes=4096)
+    assert len(ranges) > 10
+    assert ranges[0][0] == data_start
+    assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    assert ranges[-1][1] == len(raw)
+    parts = [pd.read_csv(io.BytesIO(raw[start:end]), header=None, names=list(df.columns)) for start, end in ranges]
+    combined = pd.concat(parts, ignore_index=True)
+    assert len(combined) == len(df)
+    assert combined["note"].tolist() == df["note"].tolist()
+
+def test_parallel_profile_matches_serial_for_any_worker_count(quoted_csv):
+    path, df = quoted_csv
+    serial = IngestionService(workers=1)._profile_csv_stream(path, "quoted.csv")
+
+    inline = ParallelCSVProfiler(workers=1, range_bytes=8192).profile(path, "quoted.csv")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        threaded = ParallelCSVProfiler(executor=pool, range_bytes=8192).profile(path, "quoted.csv")
+    processes = ParallelCSVProfiler(workers=2, range_bytes=8192).profile(path, "quoted.csv")
+
+    assert inline == threaded == processes
+    assert inline["row_count"] == serial["row_count"] == len(df)
+    assert inline["health_score"] == serial["health_score"]
+    assert inline["anomalies"] == serial["anomalies"] == ["Negative values detected in column 'amount'"]
+    assert inline["schema"]["amount"] == "Float64"
+
+def test_service_profiles_large_csvs_on_one_long_lived_pool(quoted_csv, monkeypatch):
+    path, _ = quoted_csv
+    service = IngestionService(workers=2)
+    monkeypatch.setattr(service, "PARALLEL_MIN_BYTES", 0)
+    try:
+        first = service._profile_path(path, ".csv", "quoted.csv")
+        pool = service.pool.executor
+        second = service._profile_path(path, ".csv", "quoted.csv")
+
+        assert service.pool.executor is pool
+        assert first == second
+        assert first["row_count"] == 3000
+    finally:
+        service.pool.shutdown()
+
+def test_profile_reports_full_file_column_statistics(quoted_csv):
+    path, df = quoted_csv
+    profile = ParallelCSVProfiler(workers=1, range_bytes=8192).profile(path, "quoted.csv")
+    amount, region = profile["columns"]["amount"], profile["columns"]["region"]
+
+    values = df["amount"].dropna()
+    assert amount["missing"] == df["amount"].isna().sum()
+    assert np.isclose(amount["mean"], values.mean())
+    assert np.isclose(amount["std"], values.std(ddof=0))
+    assert (amount["min"], amount["max"]) == (values.min(), values.max())
+    assert abs(amount["p50"] - values.median()) < 0.05 * values.std()
+    assert abs(amount["distinct"] - values.nunique()) / values.nunique() < 0.05
+
+    counts = df["region"].value_counts()
+    assert region["distinct"] == 2
+    assert region["top_values"] == [{"value": v, "count": int(c)} for v, c in counts.items()]
+    assert "mean" not in region
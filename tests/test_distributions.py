@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from backend.engine.distributions import compile_uncertainty, DISTRIBUTIONS
+from backend.engine.simulation import SimulationEngine
+
+def sample(spec, n=200_000, seed=0):
+    model = compile_uncertainty(spec)
+    z = np.random.default_rng(seed).standard_normal((model.dims, n))
+    base = {name: 100.0 for name in model.names}
+    return model.apply(base, z)
+
+def test_registry_covers_required_families():
+    assert {"normal", "lognormal", "triangular", "pert", "uniform", "empirical"} <= set(DISTRIBUTIONS)
+
+def test_distribution_families_are_centred_on_base():
+    spec = {"inputs": {
+        "a": {"dist": "normal", "std": 0.1},
+        "b": {"dist": "lognormal", "sigma": 0.2},
+        "c": {"dist": "uniform", "low": 0.8, "high": 1.2},
+        "d": {"dist": "triangular", "low": 0.7, "mode": 1.0, "high": 1.3},
+        "e": {"dist": "pert", "low": 0.7, "mode": 1.0, "high": 1.3},
+    }}
+    values = sample(spec)
+
+    for name in "abcde":
+        assert np.isclose(values[name].mean(), 100.0, rtol=0.01)
+    assert 80.0 <= values["c"].min() and values["c"].max() <= 120.0
+    assert 70.0 <= values["e"].min() and values["e"].max() <= 130.0
+    # PERT concentrates more mass near the mode than the triangular
+    assert values["e"].std() < values["d"].std()
+
+def test_empirical_bootstrap_reuses_history_spread():
+    history = [90.0, 100.0, 110.0, 100.0]
+    values = sample({"inputs": {"revenue": {"dist": "empirical", "history": history}}})
+
+    assert np.allclose(np.unique(values["revenue"]), [90.0, 100.0, 110.0])
+    assert np.isclose(np.isclose(values["revenue"], 100.0).mean(), 0.5, atol=0.01)
+
+def test_correlated_sampling_via_cholesky():
+    spec = {
+        "inputs": {"x": {"dist": "normal", "std": 0.1}, "y": {"dist": "uniform", "low": 0.5, "high": 1.5}},
+        "correlations": [["x", "y", 0.8]],
+    }
+    values = sample(spec)
+    assert np.corrcoef(values["x"], values["y"])[0, 1] == pytest.approx(0.78, abs=0.03)
+
+def test_compiled_uncertainty_is_cached():
+    spec = {"inputs": {"x": {"dist": "empirical", "history": [1.0, 2.0, 3.0]}}}
+    assert compile_uncertainty(spec) is compile_uncertainty({"inputs": {"x": {"dist": "empirical", "history": [1.0, 2.0, 3.0]}}})
+
+def test_empirical_history_may_be_an_ndarray():
+    history = np.array([1.0, 2.0, 3.0])
+    model = compile_uncertainty({"inputs": {"x": {"dist": "empirical", "history": history}}})
+    assert model is compile_uncertainty({"inputs": {"x": {"dist": "empirical", "history": [1.0, 2.0, 3.0]}}})
+    assert compile_uncertainty({"inputs": {"x": {"dist": "empirical", "history": history[::-1].copy()}}}) is not model
+
+@pytest.mark.parametrize("spec", [
+    {"inputs": {"x": {"dist": "gamma"}}},
+    {"inputs": {"x": {"dist": "normal"}}},
+    {"inputs": {"x": {"dist": "triangular", "low": 1.2, "mode": 1.0, "high": 1.1}}},
+    {"inputs": {"x": {"dist": "empirical", "history": []}}},
+    {"inputs": {"x": {"std": 0.1}, "y": {"std": 0.1}}, "correlations": [["x", "y", 1.5]]},
+    {"inputs": {"x": {"std": 0.1}}, "correlations": [["x", "z", 0.5]]},
+])
+def test_invalid_specs_rejected(spec):
+    with pytest.raises(ValueError):
+        compile_uncertainty(spec)
+
+def test_engine_uses_configured_uncertainty():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+    spec = {
+        "inputs": {
+            "revenue": {"dist": "triangular", "low": 0.8, "mode": 1.0, "high": 1.1},
+            "marketing_spend": {"dist": "uniform", "low": 0.5, "high": 1.5},
+        },
+        "correlations": [["revenue", "marketing_spend", 0.5]],
+    }
+    engine = SimulationEngine(baseline, seed=2, uncertainty=spec)
+
+    result = engine.run_monte_carlo(iterations=50_000)
+
+    # Triangular mean is (0.8 + 1.0 + 1.1) / 3 of revenue; marketing spend stays centred
+    expected = 10000 * 2.9 / 3 - 3000
+    assert np.isclose(result["mean"], expected, rtol=0.01)
+    # Revenue can fall to 8000 and spend rise to 1500 -> cash floor ~= 8000 - 3500
+    assert result["p10"] > 4500
@@ -0,0 +1,64 @@
+from openpyxl import Workbook
+from backend.services.excel_profiler import WorkbookProfiler
+from backend.services.ingestion_service import IngestionService
+
+def _workbook(tmp_path, rows: int = 6_000) -> str:
+    workbook = Workbook(write_only=True)
+    sales = workbook.create_sheet("Sales")
+    sales.append(["store", "units", "amount"])
+    for i in range(rows):
+        sales.append([f"s{i % 7}", i % 50, None if i % 100 == 0 else (-5.0 if i == 5_001 else 10.5 + i)])
+    costs = workbook.create_sheet("Costs")
+    costs.append(["category", None, "notes"])
+    for i in range(300):
+        costs.append(["rent" if i % 2 else "payroll", 100 * i, "note" if i == 0 else None])
+        if i == 150:
+            costs.append([None, None, None])  # blank row, skipped
+    path = tmp_path / "book.xlsx"
+    workbook.save(path)
+    return str(path)
+
+def test_workbook_is_profiled_per_sheet_in_batches(tmp_path):
+    path = _workbook(tmp_path)
+    profile = WorkbookProfiler(workers=1, batch_rows=1000).profile(path, "book.xlsx")
+
+    sales, costs = profile["sheets"]
+    assert (sales["sheet"], sales["row_count"]) == ("Sales", 6_000)
+    assert (costs["sheet"], costs["row_count"]) == ("Costs", 300)
+    assert sales["anomalies"] == ["Negative values detected in column 'amount'"]
+    assert sales["schema"] == {"store": "string", "units": "Int64", "amount": "Float64"}
+    assert costs["schema"] == {"category": "string", "Unnamed: 1": "Int64", "notes": "string"}
+
+    assert profile["row_count"] == 6_300
+    assert profile["anomalies"] == ["Sales: Negative values detected in column 'amount'"]
+    assert profile["schema"]["Costs!Unnamed: 1"] == "Int64"
+
+    # Sheets profiled in worker processes give the same result
+    assert WorkbookProfiler(workers=2, batch_rows=1000).profile(path, "book.xlsx") == profile
+
+def test_service_profiles_sheets_on_one_long_lived_pool(tmp_path):
+    path = _workbook(tmp_path, rows=500)
+    service = IngestionService(workers=2)
+    try:
+        first = service._profile_path(path, ".xlsx", "book.xlsx")
+        pool = service.pool.executor
+        second = service._profile_path(path, ".xlsx", "book.xlsx")
+
+        assert service.pool.executor is pool
+        assert first == second == WorkbookProfiler(workers=1).profile(path, "book.xlsx")
+    finally:
+        service.pool.shutdown()
+
+def test_xlsx_upload_and_corrupt_workbook(client, tmp_path):
+    with open(_workbook(tmp_path, rows=500), "rb") as f:
+        content = f.read()
+    response = client.post("/api/ingest/upload", files={"file": ("book.xlsx", content, "application/octet-stream")})
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["row_count"] == 800
+    assert [sheet["sheet"] for sheet in profile["sheets"]] == ["Sales", "Costs"]
+    assert profile["columns"]["Sales!store"]["distinct"] == 7
+
+    broken = client.post("/api/ingest/upload", files={"file": ("broken.xlsx", b"not a zip", "application/octet-stream")})
+    assert broken.status_code == 200
+    assert broken.json()["anomalies"] == ["Unreadable file format or corrupted content"]
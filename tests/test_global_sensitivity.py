@@ -0,0 +1,44 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from backend.engine.simulation import SimulationEngine
+from backend.engine.risk import RiskAnalyzer
+from backend.engine.explainability import DriverAnalyzer
+
+# y = x1 + x2 * x3 with x ~ U(-1, 1): S1 = 0.75, S2 = S3 = 0, ST2 = ST3 = 0.25
+MODEL = {"y": "x1 + x2 * x3"}
+BASELINE = {"x1": 0.0, "x2": 0.0, "x3": 0.0}
+RANGES = {name: (-1.0, 1.0) for name in BASELINE}
+
+def test_sobol_indices_match_analytic_values():
+    engine = SimulationEngine(BASELINE, seed=7, model=MODEL)
+    res = RiskAnalyzer().calculate_global_sensitivity(engine, BASELINE, metric="y", samples=40_000, ranges=RANGES)
+
+    assert res["first_order"]["x1"] == pytest.approx(0.75, abs=0.03)
+    assert res["first_order"]["x2"] == pytest.approx(0.0, abs=0.03)
+    assert res["total_order"]["x1"] == pytest.approx(0.75, abs=0.03)
+    assert res["total_order"]["x3"] == pytest.approx(0.25, abs=0.03)
+    assert res["evaluations"] == 40_000 * 5
+
+    low, high = res["total_order_ci"]["x3"]
+    assert low < res["total_order"]["x3"] < high
+
+def test_sobol_deterministic_across_executors():
+    analyzer = RiskAnalyzer()
+    inline = analyzer.calculate_global_sensitivity(SimulationEngine(BASELINE, seed=3, model=MODEL), BASELINE,
+                                                   metric="y", samples=20_000, ranges=RANGES, bootstrap=20)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        engine = SimulationEngine(BASELINE, seed=3, model=MODEL, executor=pool)
+        pooled = analyzer.calculate_global_sensitivity(engine, BASELINE, metric="y", samples=20_000,
+                                                       ranges=RANGES, bootstrap=20)
+    assert inline == pooled
+
+def test_global_sensitivity_defaults_to_model_inputs():
+    baseline = {"revenue": 1000.0, "fixed_costs": 200.0, "operational_costs": 300.0,
+                "marketing_spend": 100.0, "headcount": 12.0}
+    engine = SimulationEngine(baseline, seed=1)
+    res = RiskAnalyzer().calculate_global_sensitivity(engine, baseline, samples=5_000, bootstrap=0)
+
+    # headcount is not read by the cash flow model, so it is not sampled
+    assert set(res["first_order"]) == {"revenue", "fixed_costs", "operational_costs", "marketing_spend"}
+    assert "first_order_ci" not in res
+    assert DriverAnalyzer().analyze_drivers(res["total_order"])[0]["name"] == "revenue"
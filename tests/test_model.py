@@ -0,0 +1,79 @@
+import pytest
+import pickle
+import numpy as np
+from backend.engine.model import compile_model, ModelDefinitionError, DEFAULT_MODEL
+from backend.engine.simulation import SimulationEngine
+
+PNL_MODEL = {
+    "net_income": "gross_profit - opex",
+    "gross_profit": "revenue - cogs",
+    "opex": "fixed_costs + marketing_spend",
+    "margin": "where(revenue > 0, net_income / revenue, 0)",
+    "cash_flow": "net_income"
+}
+
+def test_metrics_evaluate_in_dependency_order():
+    model = compile_model(PNL_MODEL)
+    inputs = {"revenue": 100.0, "cogs": 40.0, "fixed_costs": 10.0, "marketing_spend": 20.0}
+
+    result = model.evaluate(inputs)
+
+    assert result["gross_profit"] == 60.0
+    assert result["net_income"] == 30.0
+    assert result["margin"] == pytest.approx(0.3)
+    assert sorted(model.inputs) == ["cogs", "fixed_costs", "marketing_spend", "revenue"]
+    assert model.metrics.index("gross_profit") < model.metrics.index("net_income")
+
+def test_shared_subexpressions_compiled_once():
+    model = compile_model({
+        "a": "(revenue - cogs) * 2",
+        "b": "(revenue - cogs) / 4",
+    })
+    # One subtraction shared by both metrics, plus the multiply and divide
+    assert len(model._steps) == 3
+
+def test_vectorized_evaluation_and_pruning():
+    model = compile_model(PNL_MODEL)
+    inputs = {"revenue": np.array([100.0, 0.0]), "cogs": 40.0, "fixed_costs": 10.0, "marketing_spend": 20.0}
+
+    result = model.evaluate(inputs, ["margin"])
+
+    assert list(result) == ["margin"]
+    assert np.allclose(result["margin"], [0.3, 0.0])
+
+def test_compiled_plans_are_cached_by_definition():
+    first = compile_model(dict(PNL_MODEL))
+    second = compile_model(dict(reversed(list(PNL_MODEL.items()))))
+    assert first is second
+    assert compile_model() is compile_model(DEFAULT_MODEL)
+
+def test_compiled_plan_is_picklable():
+    model = pickle.loads(pickle.dumps(compile_model(PNL_MODEL)))
+    assert model.evaluate({"revenue": 10.0, "cogs": 1.0, "fixed_costs": 1.0, "marketing_spend": 1.0})["cash_flow"] == 7.0
+
+@pytest.mark.parametrize("definition", [
+    {"x": "__import__('os').system('ls')"},
+    {"x": "revenue.real"},
+    {"x": "revenue +"},
+    {"x": "a", "a": "x"},
+    {"x": "max(revenue)"},
+])
+def test_invalid_definitions_rejected(definition):
+    with pytest.raises(ModelDefinitionError):
+        compile_model(definition)
+
+def test_missing_input_reported():
+    with pytest.raises(ModelDefinitionError, match="Missing input"):
+        compile_model(PNL_MODEL).evaluate({"revenue": 1.0})
+
+def test_engine_runs_custom_model():
+    baseline = {"revenue": 1000.0, "cogs": 400.0, "fixed_costs": 100.0, "marketing_spend": 100.0,
+                "operational_costs": 0.0}
+    engine = SimulationEngine(baseline, seed=1, model=PNL_MODEL)
+
+    det = engine.run_deterministic({"cogs": 300.0})
+    assert det["net_income"] == 500.0
+    assert det["margin"] == pytest.approx(0.5)
+
+    mc = engine.run_monte_carlo(metric="gross_profit", iterations=20_000)
+    assert np.isclose(mc["mean"], 600.0, rtol=0.01)
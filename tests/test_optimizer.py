@@ -0,0 +1,71 @@
+import pytest
+from backend.engine.simulation import SimulationEngine
+from backend.engine.optimizer import DecisionOptimizer
+
+# Diminishing returns on marketing: d(cash_flow)/d(spend) = 200 / sqrt(spend) - 1 -> optimum at 40,000
+MODEL = {"cash_flow": "revenue + 400 * sqrt(marketing_spend) - fixed_costs - operational_costs - marketing_spend"}
+BASELINE = {"revenue": 50000.0, "fixed_costs": 15000.0, "operational_costs": 20000.0, "marketing_spend": 5000.0}
+
+@pytest.mark.parametrize("method", ["grid", "random", "cross_entropy"])
+def test_methods_find_the_optimum(method):
+    engine = SimulationEngine(BASELINE, seed=1, model=MODEL)
+    res = DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 100000)}).optimize(method)
+
+    assert res["best"]["inputs"]["marketing_spend"] == pytest.approx(40000, rel=0.01)
+    assert res["best"]["objective"] == pytest.approx(55000, rel=1e-4)
+    assert res["improvement"] > 0
+    assert res["history"] == sorted(res["history"])
+
+def test_constraints_cap_the_search():
+    engine = SimulationEngine(BASELINE, seed=1, model=MODEL)
+    res = DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 100000)},
+                            constraints={"marketing_spend": 10000}).optimize("grid")
+    assert res["best"]["inputs"]["marketing_spend"] == 10000
+
+def test_risk_adjusted_objective_uses_common_random_numbers():
+    engine = SimulationEngine(BASELINE, seed=2, model=MODEL)
+    optimizer = DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 100000)},
+                                  objective="mean_cvar", risk_aversion=0.5, iterations=2000)
+
+    # Identical candidates score identically across calls: the draws are fixed for the whole search
+    first = optimizer.evaluate([[20000.0], [30000.0]])
+    again = optimizer.evaluate([[30000.0], [20000.0]])
+    assert first[0] == again[1] and first[1] == again[0]
+
+    res = optimizer.optimize("cross_entropy")
+    # Marketing does not change the (revenue-driven) tail here, so the optimum is unchanged
+    assert res["best"]["inputs"]["marketing_spend"] == pytest.approx(40000, rel=0.01)
+    assert res["best"]["objective"] < 55000 * 1.5
+
+def test_stochastic_scores_follow_the_engine_row_blocks():
+    engine = SimulationEngine(BASELINE, seed=2, model=MODEL)
+    optimizer = DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 100000)}, objective="mean", iterations=500)
+    candidates = [[10000.0], [20000.0], [30000.0], [40000.0], [50000.0]]
+    whole = optimizer.evaluate(candidates)
+
+    # Two candidates per block; each candidate's score matches run_batch on the same draws
+    engine.MAX_BATCH_CELLS = 1000
+    assert optimizer.evaluate(candidates).tolist() == whole.tolist()
+    batch = engine.run_batch({"marketing_spend": [c[0] for c in candidates]}, draws=optimizer.draws)
+    assert batch["mean"] == pytest.approx(whole, rel=1e-12)
+
+def test_invalid_requests_rejected():
+    engine = SimulationEngine(BASELINE)
+    with pytest.raises(ValueError):
+        DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 1)}, objective="sharpe")
+    with pytest.raises(ValueError):
+        DecisionOptimizer(engine, BASELINE, {"marketing_spend": (0, 1)}).optimize("annealing")
+
+def test_optimize_endpoint(client):
+    response = client.post("/api/workflow/optimize", json={
+        "bounds": {"marketing_spend": [0, 20000], "operational_costs": [18000, 22000]},
+        "objective": "mean",
+        "seed": 3
+    })
+    assert response.status_code == 200
+    best = response.json()["best"]["inputs"]
+    # Linear default model: less spend and lower costs are always better
+    assert best["marketing_spend"] == pytest.approx(0, abs=200)
+    assert best["operational_costs"] == pytest.approx(18000, abs=50)
+
+    assert client.post("/api/workflow/optimize", json={"bounds": {"marketing_spend": [0]}}).status_code == 400
@@ -0,0 +1,70 @@
+import time
+import pytest
+import numpy as np
+import pandas as pd
+from backend.engine.simulation import SimulationEngine
+from backend.services.etl_pipeline import ETLPipeline
+from backend.services.workflow_service import WorkflowService
+
+BASELINE = {"revenue": 1000.0, "fixed_costs": 200.0, "operational_costs": 300.0, "marketing_spend": 100.0}
+
+def _store_table(stores: int = 3) -> pd.DataFrame:
+    rows = []
+    for i in range(stores):
+        for month, scale in (("2024-01-01", 1.0), ("2024-02-01", 1.1)):
+            rows.append({"store": f"S{i}", "date": month, "Revenue": 1000.0 * (i + 1) * scale,
+                         "Operational Costs": 300.0 * (i + 1), "Fixed Costs": 200.0})
+    return ETLPipeline().standardize_to_decision_table(pd.DataFrame(rows), "store", "date")
+
+def test_pivot_to_entity_matrix():
+    etl = ETLPipeline()
+    latest = etl.pivot_to_entity_matrix(_store_table(), "store", "date")
+    mean = etl.pivot_to_entity_matrix(_store_table(), "store", aggregation="mean")
+
+    assert list(latest.index) == ["S0", "S1", "S2"]
+    assert set(latest.columns) == {"revenue", "operational_costs", "fixed_costs"}
+    assert latest.loc["S1", "revenue"] == pytest.approx(2200.0)
+    assert mean.loc["S1", "revenue"] == pytest.approx(2100.0)
+
+def test_portfolio_matches_per_entity_means_and_rolls_up():
+    engine = SimulationEngine(BASELINE, seed=4)
+    revenue = np.array([1000.0, 2000.0, np.nan])
+    res = engine.run_portfolio({"revenue": revenue}, entity_ids=["a", "b", "c"], iterations=20_000)
+
+    per_entity = res["per_entity"]
+    # Missing revenue falls back to the baseline; expected cash flow = revenue - 600
+    assert per_entity["mean"] == pytest.approx([400.0, 1400.0, 400.0], abs=5.0)
+    assert res["rollup"]["mean"] == pytest.approx(per_entity["mean"].sum())
+    assert res["entities"] == ["a", "b", "c"]
+
+def test_common_shocks_widen_the_rollup():
+    engine = SimulationEngine(BASELINE, seed=5)
+    inputs = {"revenue": np.full(200, 1000.0)}
+    independent = engine.run_portfolio(inputs, iterations=2000)["rollup"]["std_dev"]
+    correlated = engine.run_portfolio(inputs, iterations=2000, shock_correlation=0.5)["rollup"]["std_dev"]
+    assert correlated > 5 * independent
+
+def test_ten_thousand_entities_in_bounded_chunks():
+    engine = SimulationEngine(BASELINE, seed=6)
+    engine.MAX_BATCH_CELLS = 500_000
+    revenue = np.random.default_rng(0).uniform(500, 5000, 10_000)
+
+    start = time.perf_counter()
+    res = engine.run_portfolio({"revenue": revenue}, iterations=500)
+    assert time.perf_counter() - start < 5.0
+    assert res["n_entities"] == 10_000
+    assert res["rollup"]["mean"] == pytest.approx((revenue - 600).sum(), rel=0.01)
+
+def test_workflow_portfolio_simulation():
+    res = WorkflowService().run_portfolio_simulation(_store_table(), "store", "date", iterations=2000, seed=1)
+    # S2 latest: revenue 3300, op costs 900, fixed 200, marketing from the default baseline (5000)
+    assert res["entities"] == ["S0", "S1", "S2"]
+    assert res["per_entity"]["mean"][2] == pytest.approx(3300 - 900 - 200 - 5000, abs=30)
+
+def test_batch_with_shared_draws_matches_single_runs():
+    engine = SimulationEngine(BASELINE, seed=5)
+    draws = np.random.default_rng(5).standard_normal((2000, engine.uncertainty.dims))
+    batch = engine.run_batch([{"revenue": 900.0}, {"revenue": 1100.0}], draws=draws)
+    single = engine.run_monte_carlo({"revenue": 1100.0}, draws=draws)
+    assert batch["mean"][1] == pytest.approx(single["mean"])
+    assert batch["p10"][1] == pytest.approx(single["p10"])
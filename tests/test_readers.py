@@ -0,0 +1,85 @@
+import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+from backend.services.ingestion_service import IngestionService
+from backend.services.readers import open_reader
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(4)
+    rows = 5000
+    amount = rng.normal(50, 40, rows)
+    amount[::25] = np.nan
+    return pa.table({
+        "store": pa.array(rng.choice(["a", "b", "c"], rows)),
+        "units": pa.array(rng.integers(0, 500, rows)),
+        "amount": pa.array(amount, from_pandas=True),
+    })
+
+def _upload(client, name: str, payload: bytes):
+    response = client.post("/api/ingest/upload", files={"file": (name, payload, "application/octet-stream")})
+    assert response.status_code == 200
+    return response.json()
+
+def test_columnar_uploads_are_profiled_from_record_batches(client, table):
+    parquet, ipc, stream = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    pq.write_table(table, parquet, row_group_size=1000)
+    feather.write_feather(table, ipc)
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table, max_chunksize=700)
+
+    profiles = [_upload(client, "sales.parquet", parquet.getvalue()),
+                _upload(client, "sales.feather", ipc.getvalue()),
+                _upload(client, "sales.arrow", stream.getvalue())]
+    for profile in profiles:
+        assert profile["row_count"] == 5000
+        assert profile["anomalies"] == ["Negative values detected in column 'amount'"]
+        assert profile["health_score"] == profiles[0]["health_score"]
+
+def test_arrow_csv_profile_matches_pandas(tmp_path, table):
+    path = tmp_path / "sales.csv"
+    table.to_pandas().to_csv(path, index=False)
+    service = IngestionService(workers=1)
+
+    arrow = service._profile_batches(open_reader(str(path)), "sales.csv")
+    pandas = service._profile_csv_stream(str(path), "sales.csv")
+    assert arrow == pandas
+    assert arrow["schema"] == {"store": "string", "units": "Int64", "amount": "Float64"}
+
+def test_dates_profile_alike_across_csv_readers(tmp_path):
+    path = tmp_path / "dated.csv"
+    path.write_text("day,at,units\n2024-01-01,2024-01-01T10:00:00,3\n2024-01-02,2024-01-02T11:30:00,-1\n")
+    service = IngestionService(workers=1)
+
+    arrow = service._profile_batches(open_reader(str(path)), "dated.csv")
+    assert arrow == service._profile_csv_stream(str(path), "dated.csv")
+    assert arrow["schema"] == {"day": "string", "at": "string", "units": "Int64"}
+
+    # Typed formats keep their datetime columns
+    parquet = tmp_path / "dated.parquet"
+    pq.write_table(pa.table({"day": pa.array([0, 86_400], pa.timestamp("s"))}), parquet)
+    assert service._profile_batches(open_reader(str(parquet)), "dated.parquet")["schema"] == {"day": "datetime64[ns]"}
+
+def test_csv_type_change_after_first_block_falls_back_to_pandas(client):
+    content = b"id,amount\n" + b"".join(b"%d,%d\n" % (i, i) for i in range(400_000)) + b"x,-1.5\n"
+    profile = _upload(client, "late_change.csv", content)
+    assert profile["row_count"] == 400_001
+    assert profile["anomalies"] == ["Negative values detected in column 'amount'"]
+
+def test_upload_response_includes_schema_and_column_statistics(client, table, tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.routers.ingest.service.persist_dir", str(tmp_path))
+    payload = io.BytesIO()
+    pq.write_table(table, payload)
+    profile = _upload(client, "sales.parquet", payload.getvalue())
+
+    assert profile["schema"] == {"store": "string", "units": "Int64", "amount": "Float64"}
+    assert profile["columns"]["store"]["distinct"] == 3
+    assert profile["columns"]["amount"]["missing"] == 200
+    assert profile["stored_path"].startswith(str(tmp_path))
+
+    csv = table.to_pandas().to_csv(index=False).encode()
+    streamed = client.post("/api/ingest/stream?filename=sales.csv", content=csv).json()
+    assert streamed["columns"]["units"]["min"] >= 0
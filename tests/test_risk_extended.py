@@ -43,3 +43,76 @@ def test_constraint_enforcement():
     # Cash = 100 - 150 = -50
     assert res['inputs']['marketing_spend'] == 150
     assert res['cash_flow'] == -50
+
+def test_sensitivity_covers_all_numeric_inputs_in_one_call():
+    baseline = {"revenue": 1000, "fixed_costs": 200, "operational_costs": 300, "marketing_spend": 100}
+    engine = SimulationEngine(baseline)
+    risk = RiskAnalyzer()
+
+    calls = []
+    batch = engine.run_deterministic_batch
+    engine.run_deterministic_batch = lambda *a, **kw: calls.append(1) or batch(*a, **kw)
+    sensitivity = risk.calculate_sensitivity(engine, baseline)
+
+    assert len(calls) == 1
+    assert set(sensitivity) == set(baseline)
+    # Linear model: elasticity = input / cash_flow * d(cash_flow)/d(input); cash_flow = 400
+    assert sensitivity["revenue"] == pytest.approx(1000 / 400)
+    assert sensitivity["fixed_costs"] == pytest.approx(-200 / 400)
+    assert sensitivity["marketing_spend"] == pytest.approx(-100 / 400)
+
+def test_sensitivity_central_differences():
+    model = {"profit": "price * volume - 0.001 * volume ** 2"}
+    baseline = {"price": 10.0, "volume": 1000.0}
+    engine = SimulationEngine(baseline, model=model)
+    risk = RiskAnalyzer()
+
+    forward = risk.calculate_sensitivity(engine, baseline, metric="profit", delta=0.01)
+    central = risk.calculate_sensitivity(engine, baseline, metric="profit", delta=0.01, central=True)
+
+    # Exact elasticity of volume at the base point: volume * (price - 0.002 * volume) / profit = 8000 / 9000
+    assert central["volume"] == pytest.approx(8000 / 9000, rel=1e-9)
+    assert abs(forward["volume"] - 8000 / 9000) > abs(central["volume"] - 8000 / 9000)
+    assert central["price"] == pytest.approx(10000 / 9000)
+
+def test_sensitivity_scales_to_many_inputs():
+    names = [f"driver_{i}" for i in range(200)]
+    model = {"total": " + ".join(f"{i + 1} * {n}" for i, n in enumerate(names))}
+    baseline = {n: 1.0 for n in names}
+    engine = SimulationEngine(baseline, model=model)
+
+    sensitivity = RiskAnalyzer().calculate_sensitivity(engine, baseline, metric="total", inputs=names[:3])
+    total = sum(range(1, 201))
+    assert list(sensitivity) == names[:3]
+    assert sensitivity["driver_2"] == pytest.approx(3 / total)
+
+    full = RiskAnalyzer().calculate_sensitivity(engine, baseline, metric="total")
+    assert len(full) == 200
+    assert full["driver_199"] == pytest.approx(200 / total)
+
+def test_breakpoints_nonlinear_multiple_thresholds():
+    model = {"profit": "price * volume - 0.001 * volume ** 2 - 5000", "margin": "profit / (price * volume)"}
+    baseline = {"price": 10.0, "volume": 1000.0}
+    engine = SimulationEngine(baseline, model=model)
+
+    solved = RiskAnalyzer().solve_breakpoints(engine, baseline, [0.0, 2000.0], metric="profit")
+
+    # profit(price) = 1000 * price - 6000 -> 6.0 and 8.0; profit(volume) root nearest 1000: v^2 - 10000 v + 5e6 = 0
+    assert solved["breakpoints"]["price"][0.0] == pytest.approx(6.0)
+    assert solved["breakpoints"]["price"][2000.0] == pytest.approx(8.0)
+    assert solved["breakpoints"]["volume"][0.0] == pytest.approx(5000 - (25e6 - 5e6) ** 0.5)
+    assert solved["no_crossing"] == {}
+
+def test_breakpoints_report_no_crossing_and_respect_constraints():
+    baseline = {"revenue": 100, "fixed_costs": 10, "operational_costs": 10, "marketing_spend": 10}
+    engine = SimulationEngine(baseline)
+    risk = RiskAnalyzer()
+
+    # Clamping marketing at 50 caps the cash flow it can destroy: 70 - 40 = 30 > 0
+    solved = risk.solve_breakpoints(engine, baseline, [0.0], constraints={"marketing_spend": 50})
+    assert solved["breakpoints"]["marketing_spend"][0.0] is None
+    assert solved["no_crossing"]["marketing_spend"] == [0.0]
+    assert solved["breakpoints"]["operational_costs"][0.0] == pytest.approx(80.0)
+
+    breakpoints = risk.calculate_breakpoints(engine, baseline, constraints={"marketing_spend": 50})
+    assert breakpoints["marketing_spend"] == float("inf")
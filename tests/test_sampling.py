@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from backend.engine.sampling import standard_normals, SAMPLING_METHODS
+
+@pytest.mark.parametrize("method", SAMPLING_METHODS)
+def test_standard_normals_shape_and_moments(method):
+    z = standard_normals(method, 4096, 3, np.random.default_rng(0))
+
+    assert z.shape == (4096, 3)
+    assert np.all(np.isfinite(z))
+    assert np.allclose(z.mean(axis=0), 0, atol=0.05)
+    assert np.allclose(z.std(axis=0), 1, atol=0.05)
+
+def test_antithetic_pairs_cancel():
+    z = standard_normals("antithetic", 1000, 2, np.random.default_rng(1))
+    assert np.allclose(z[:500], -z[500:])
+
+def test_lhs_hits_every_stratum_once():
+    from scipy.special import ndtr
+    u = ndtr(standard_normals("lhs", 200, 2, np.random.default_rng(2)))
+    for dim in range(2):
+        strata = np.sort(np.floor(u[:, dim] * 200).astype(int))
+        assert np.array_equal(strata, np.arange(200))
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        standard_normals("halton", 10, 2, np.random.default_rng(3))
+
+def test_draw_cache_reuses_and_evicts():
+    from backend.engine.sampling import DrawCache
+    cache = DrawCache(max_entries=2)
+
+    first = cache.get(1, 100, 2)
+    assert cache.get(1, 100, 2) is first
+    assert not first.flags.writeable
+
+    cache.get(2, 100, 2)
+    cache.get(3, 100, 2)  # evicts seed 1 (least recently used)
+    assert len(cache) == 2
+    regenerated = cache.get(1, 100, 2)
+    assert regenerated is not first
+    assert np.array_equal(regenerated, first)
@@ -0,0 +1,71 @@
+import json
+import os
+import time
+import numpy as np
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from backend.services.serialization import (MSGPACK_MEDIA_TYPE, NumpyJSONResponse, NumpyRoute,
+                                            decode_msgpack, encode_json, encode_msgpack)
+
+def _bulk_payload(rows: int = 200, periods: int = 12, samples: int = 20_000) -> dict:
+    """Shape of a bulk simulate response plus a retained distribution, as NumPy objects."""
+    rng = np.random.default_rng(0)
+    return {
+        "rows": [{"index": np.int64(i), "savings_impact": np.float64(rng.normal()),
+                  "bands": {q: rng.normal(size=periods) for q in ("p10", "p50", "p90")}}
+                 for i in range(rows)],
+        "distribution": rng.normal(size=samples),
+    }
+
+def test_encode_json_handles_numpy_types():
+    payload = {"mean": np.float32(1.5), "count": np.int64(3), "bands": np.arange(3.0),
+               "strided": np.arange(6)[::2], "missing": np.nan}
+    assert json.loads(encode_json(payload)) == {"mean": 1.5, "count": 3, "bands": [0.0, 1.0, 2.0],
+                                                "strided": [0, 2, 4], "missing": None}
+
+def test_numpy_route_skips_jsonable_encoder_and_negotiates_msgpack():
+    router = APIRouter(default_response_class=NumpyJSONResponse, route_class=NumpyRoute)
+
+    @router.get("/dist")
+    async def dist():
+        return {"p50": np.float64(2.0), "samples": np.arange(4, dtype=np.float32)}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    assert client.get("/dist").json() == {"p50": 2.0, "samples": [0.0, 1.0, 2.0, 3.0]}
+
+    pytest.importorskip("msgpack")
+    response = client.get("/dist", headers={"Accept": MSGPACK_MEDIA_TYPE})
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    decoded = decode_msgpack(response.content)
+    np.testing.assert_array_equal(decoded["samples"], np.arange(4, dtype=np.float32))
+
+def test_serialization_benchmark_encode_time_and_size():
+    payload = _bulk_payload()
+
+    def best_of(fn, repeats=3):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            body = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), len(body)
+
+    # FastAPI's default path: jsonable_encoder walk (arrays converted first) then stdlib json
+    stdlib_time, stdlib_size = best_of(lambda: json.dumps(jsonable_encoder(
+        payload, custom_encoder={np.ndarray: np.ndarray.tolist, np.generic: np.generic.item})).encode())
+    orjson_time, orjson_size = best_of(lambda: encode_json(payload))
+    print(f"\njsonable_encoder+json: {stdlib_time * 1e3:.1f} ms, {stdlib_size} bytes")
+    print(f"orjson:                {orjson_time * 1e3:.1f} ms, {orjson_size} bytes")
+    # Wall-clock comparisons are noisy on shared runners, so they only gate opt-in benchmark runs
+    if os.getenv("RUN_BENCHMARKS"):
+        assert orjson_time * 3 < stdlib_time
+
+    pytest.importorskip("msgpack")
+    msgpack_time, msgpack_size = best_of(lambda: encode_msgpack(payload))
+    print(f"msgpack:               {msgpack_time * 1e3:.1f} ms, {msgpack_size} bytes")
+    assert msgpack_size < orjson_size / 2
@@ -1,4 +1,5 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from backend.engine.simulation import SimulationEngine
 import numpy as np
 
@@ -20,3 +21,106 @@ def test_monte_carlo_convergence():
     det_val = 7000.0
     assert np.isclose(result["mean"], det_val, rtol=0.05) # within 5%
     assert result["p90"] > result["p10"]
+
+def test_deterministic_batch_matches_single_runs():
+    baseline = {"revenue": 100, "fixed_costs": 10, "operational_costs": 10, "marketing_spend": 10}
+    engine = SimulationEngine(baseline)
+
+    overrides = {"revenue": [100, 200, 50], "marketing_spend": [10, 300, 10]}
+    result = engine.run_deterministic_batch(overrides, constraints={"marketing_spend": 150})
+
+    # Row 1 is clamped: 200 - (10 + 10 + 150) = 30
+    assert result["n_scenarios"] == 3
+    assert list(result["cash_flow"]) == [70.0, 30.0, 20.0]
+
+    # Row-form overrides resolve to the same table
+    rows = [{"revenue": 100}, {"revenue": 200, "marketing_spend": 300}, {"revenue": 50}]
+    row_result = engine.run_deterministic_batch(rows, constraints={"marketing_spend": 150})
+    assert list(row_result["cash_flow"]) == [70.0, 30.0, 20.0]
+
+def test_run_batch_per_scenario_summaries():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+    engine = SimulationEngine(baseline)
+
+    result = engine.run_batch({"revenue": np.linspace(8000, 12000, 50)}, iterations=2000)
+
+    assert result["mean"].shape == (50,)
+    assert np.all(result["p90"] > result["p10"])
+    expected = np.linspace(8000, 12000, 50) - 3000
+    assert np.allclose(result["mean"], expected, rtol=0.05)
+
+def test_streaming_monte_carlo_matches_exact():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+    engine = SimulationEngine(baseline)
+
+    result = engine.run_monte_carlo(iterations=200_000, chunk_size=10_000, quantile_error=0.005)
+
+    assert result["iterations"] == 200_000
+    assert result["quantile_error"] <= 0.005
+    assert np.isclose(result["mean"], 7000.0, rtol=0.01)
+    # std dev = sqrt((0.05 * 10000)^2 + (0.03 * 1000)^2) ~= 501
+    assert np.isclose(result["std_dev"], 501.0, rtol=0.02)
+    assert result["p10"] < result["p50"] < result["p90"]
+    assert np.isclose(result["p50"], 7000.0, rtol=0.01)
+
+def test_seeded_monte_carlo_is_identical_across_worker_counts():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+
+    serial = SimulationEngine(baseline, seed=7).run_monte_carlo(iterations=50_000, chunk_size=5_000)
+    pooled = SimulationEngine(baseline, seed=7, workers=2).run_monte_carlo(iterations=50_000, chunk_size=5_000)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        threaded = SimulationEngine(baseline, seed=7, executor=executor).run_monte_carlo(iterations=50_000, chunk_size=5_000)
+
+    assert serial == pooled == threaded
+
+    # Exact (non-streaming) mode is reproducible too, and a different seed changes the draws
+    assert SimulationEngine(baseline, seed=7).run_monte_carlo() == SimulationEngine(baseline, seed=7).run_monte_carlo()
+    assert SimulationEngine(baseline, seed=8).run_monte_carlo() != SimulationEngine(baseline, seed=7).run_monte_carlo()
+
+def test_variance_reduction_stops_early():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+
+    plain = SimulationEngine(baseline, seed=3).run_monte_carlo(iterations=500_000, target_ci_width=20)
+    sobol = SimulationEngine(baseline, seed=3).run_monte_carlo(iterations=500_000, target_ci_width=20, sampling="sobol")
+
+    assert plain["iterations"] < 500_000
+    assert sobol["iterations"] < plain["iterations"]
+    assert max(sobol["ci_width"].values()) <= 20
+    assert sobol["sampling"] == "sobol"
+    assert np.isclose(sobol["mean"], 7000.0, rtol=0.01)
+
+def test_unknown_sampling_method_rejected():
+    engine = SimulationEngine({"revenue": 100, "fixed_costs": 10, "operational_costs": 10, "marketing_spend": 10})
+    with pytest.raises(ValueError):
+        engine.run_monte_carlo(sampling="halton")
+
+def test_time_series_bands_carry_cash_balance():
+    baseline = {"revenue": 1000, "fixed_costs": 100, "operational_costs": 200, "marketing_spend": 100}
+    engine = SimulationEngine(baseline, seed=11)
+
+    result = engine.run_time_series(periods=24, iterations=20_000, growth_rate=0.02,
+                                    seasonality=[1.2, 0.8], opening_cash=500.0)
+
+    assert result["periods"] == 24
+    flow, balance = result["cash_flow"], result["cash_balance"]
+    assert len(flow["p50"]) == len(balance["p90"]) == 24
+
+    # Expected revenue per period: 1000 * 1.02^t * (1.2 or 0.8); costs 400 flat
+    t = np.arange(24)
+    expected_flow = 1000 * 1.02 ** t * np.resize([1.2, 0.8], 24) - 400
+    assert np.allclose(flow["mean"], expected_flow, rtol=0.01)
+    assert np.allclose(balance["mean"], 500 + np.cumsum(expected_flow), rtol=0.01)
+    # Uncertainty accumulates over the horizon
+    assert (balance["p90"][-1] - balance["p10"][-1]) > (balance["p90"][0] - balance["p10"][0])
+
+def test_progressive_monte_carlo_converges_to_streaming_result():
+    baseline = {"revenue": 10000, "fixed_costs": 1000, "operational_costs": 1000, "marketing_spend": 1000}
+    engine = SimulationEngine(baseline, seed=9)
+
+    updates = list(engine.iter_monte_carlo(iterations=30_000, report_every=10_000, block_size=1_000))
+    assert [u["iterations"] for u in updates] == [10_000, 20_000, 30_000]
+    assert [u["done"] for u in updates] == [False, False, True]
+
+    final = engine.run_monte_carlo(iterations=30_000, chunk_size=1_000)
+    for key in ("p10", "p50", "p90", "mean", "std_dev"):
+        assert updates[-1][key] == pytest.approx(final[key])
@@ -0,0 +1,80 @@
+import time
+from prometheus_client import generate_latest
+from backend.engine.risk import RiskAnalyzer
+from backend.engine.simulation import SimulationEngine
+from backend.services.simulation_cache import SimulationResultCache, scenario_fingerprint
+
+BASELINE = {
+    "revenue": 1000.0,
+    "fixed_costs": 200.0,
+    "operational_costs": 300.0,
+    "marketing_spend": 100.0
+}
+
+def test_fingerprint_is_canonical():
+    a = scenario_fingerprint(overrides={"revenue": 5000, "marketing_spend": 10}, seed=1)
+    b = scenario_fingerprint(seed=1, overrides={"marketing_spend": 10.0, "revenue": 5000.0})
+    assert a == b
+    assert a != scenario_fingerprint(overrides={"revenue": 5001}, seed=1)
+    # Large seeds must not collapse through float rounding
+    assert scenario_fingerprint(seed=2**60) != scenario_fingerprint(seed=2**60 + 1)
+
+def test_get_or_compute_hits_after_first_call():
+    cache = SimulationResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or {"p50": 1.0}
+
+    assert cache.get_or_compute("k", compute) == {"p50": 1.0}
+    assert cache.get_or_compute("k", compute) == {"p50": 1.0}
+    assert len(calls) == 1
+
+def test_cached_results_are_copies():
+    cache = SimulationResultCache()
+    cache.put("k", {"bands": [1.0, 2.0]})
+    cache.get("k")["bands"].append(3.0)
+    assert cache.get("k") == {"bands": [1.0, 2.0]}
+
+def test_lru_eviction():
+    cache = SimulationResultCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.get("a")
+    cache.put("c", {"v": 3})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+
+def test_ttl_expiry():
+    cache = SimulationResultCache(ttl_seconds=0.05)
+    cache.put("k", {"v": 1})
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    SimulationResultCache(disk_dir=str(tmp_path)).put("k", {"v": [1.0, 2.0]})
+    restarted = SimulationResultCache(disk_dir=str(tmp_path))
+    assert restarted.get("k") == {"v": [1.0, 2.0]}
+
+def test_disk_tier_expiry(tmp_path):
+    SimulationResultCache(disk_dir=str(tmp_path)).put("k", {"v": 1})
+    assert SimulationResultCache(disk_dir=str(tmp_path), disk_ttl_seconds=0).get("k") is None
+    assert list(tmp_path.iterdir()) == []
+
+def test_disk_tier_keeps_tail_risk_thresholds(tmp_path):
+    engine = SimulationEngine(BASELINE, seed=3)
+    result = engine.run_monte_carlo(iterations=2000, tail_thresholds=[350.0])
+    SimulationResultCache(disk_dir=str(tmp_path)).put("k", result)
+
+    reloaded = SimulationResultCache(disk_dir=str(tmp_path)).get("k")
+    assert reloaded["tail_risk"] == result["tail_risk"]
+    assert RiskAnalyzer().prob_of_failure(reloaded, 350.0) == result["tail_risk"]["prob_below"][350.0]
+
+def test_cache_events_exported():
+    cache = SimulationResultCache()
+    cache.get_or_compute("metrics-key", lambda: {"v": 1})
+    cache.get("metrics-key")
+
+    text = generate_latest().decode()
+    assert 'simulation_cache_events_total{event="hit",tier="memory"}' in text
+    assert 'simulation_cache_events_total{event="miss",tier="memory"}' in text
@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import pandas as pd
+from backend.engine.sketches import FrequentItems, HyperLogLog, KLLSketch, RunningMoments
+
+def test_running_moments_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    data = rng.normal(50, 10, size=10_000)
+
+    left, right = RunningMoments(), RunningMoments()
+    for chunk in np.array_split(data[:3000], 7):
+        left.update(chunk)
+    right.update(data[3000:])
+    left.merge(right)
+
+    assert left.count == len(data)
+    assert np.isclose(left.mean, data.mean())
+    assert np.isclose(left.std, data.std())
+
+def test_kll_sketch_respects_error_bound():
+    rng = np.random.default_rng(1)
+    data = rng.lognormal(size=500_000)
+
+    sketch = KLLSketch.from_error(0.01)
+    for chunk in np.array_split(data, 50):
+        sketch.update(chunk)
+
+    qs = np.linspace(0.01, 0.99, 99)
+    ranks = np.searchsorted(np.sort(data), sketch.quantiles(qs)) / len(data)
+    assert np.abs(ranks - qs).max() <= 0.01
+
+def test_kll_sketch_merge_is_deterministic():
+    data = np.random.default_rng(2).normal(size=100_000)
+
+    def build():
+        parts = []
+        for chunk in np.array_split(data, 10):
+            part = KLLSketch(k=100)
+            part.update(chunk)
+            parts.append(part)
+        merged = KLLSketch(k=100)
+        for part in parts:
+            merged.merge(part)
+        return merged
+
+    first, second = build(), build()
+    assert first.count == len(data)
+    assert np.array_equal(first.quantiles([0.1, 0.5, 0.9]), second.quantiles([0.1, 0.5, 0.9]))
+
+def test_kll_sketch_rejects_invalid_error():
+    with pytest.raises(ValueError):
+        KLLSketch.from_error(0)
+
+def test_hyperloglog_estimate_and_merge():
+    rng = np.random.default_rng(3)
+    values = rng.integers(0, 50_000, size=200_000)
+    hashes = pd.util.hash_array(values.astype(float))
+
+    whole = HyperLogLog()
+    whole.update(hashes)
+    merged = HyperLogLog()
+    for chunk in np.array_split(hashes, 9):
+        part = HyperLogLog()
+        part.update(chunk)
+        merged.merge(part)
+
+    exact = len(np.unique(values))
+    assert abs(whole.estimate() - exact) / exact < 0.05
+    assert merged.estimate() == whole.estimate()
+
+    small = HyperLogLog()
+    small.update(pd.util.hash_array(np.arange(100.0)))
+    assert abs(small.estimate() - 100) <= 2
+    with pytest.raises(ValueError):
+        merged.merge(HyperLogLog(precision=10))
+
+def test_frequent_items_keep_heavy_hitters_across_merges():
+    rng = np.random.default_rng(4)
+    data = np.concatenate([np.repeat(["a", "b", "c"], [30_000, 20_000, 10_000]),
+                           rng.integers(0, 100_000, 140_000).astype(str)])
+    rng.shuffle(data)
+
+    merged = FrequentItems(capacity=16)
+    for chunk in np.array_split(data, 7):
+        items, counts = np.unique(chunk, return_counts=True)
+        part = FrequentItems(capacity=16)
+        part.update(items, counts)
+        merged.merge(part)
+
+    assert merged.count == len(data)
+    top = merged.top(3)
+    assert [item for item, _ in top] == ["a", "b", "c"]
+    exact = {"a": 30_000, "b": 20_000, "c": 10_000}
+    # Counts are lower bounds, short by at most n / (capacity + 1)
+    assert all(0 <= exact[item] - count <= len(data) / 17 for item, count in top)
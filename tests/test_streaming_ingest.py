@@ -0,0 +1,132 @@
+import asyncio
+import io
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import UploadFile
+from backend.services.ingestion_service import IngestionService
+from backend.services.readers import open_reader
+
+@pytest.fixture
+def csv_bytes():
+    rng = np.random.default_rng(2)
+    rows = 50_000
+    df = pd.DataFrame({"units": rng.integers(-5, 500, rows), "price": rng.normal(10, 3, rows),
+                       "store": rng.choice(["a", "b", None], rows)})
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+def test_raw_stream_profile_matches_multipart_upload(client, csv_bytes):
+    def body(chunk=64 * 1024):
+        for start in range(0, len(csv_bytes), chunk):
+            yield csv_bytes[start:start + chunk]
+
+    streamed = client.post("/api/ingest/stream?filename=sales.csv", content=body(),
+                           headers={"Content-Type": "text/csv"}).json()
+    uploaded = client.post("/api/ingest/upload", files={"file": ("sales.csv", csv_bytes, "text/csv")}).json()
+    assert streamed == uploaded
+    assert streamed["row_count"] == 50_000
+    assert "Negative values detected in column 'units'" in streamed["anomalies"]
+
+    assert client.post("/api/ingest/stream?filename=sales.parquet", content=b"x").status_code == 400
+    empty = client.post("/api/ingest/stream?filename=empty.csv", content=b"").json()
+    assert empty["anomalies"] == ["Empty File"]
+
+def test_stream_persists_upload_in_parallel(tmp_path, csv_bytes):
+    service = IngestionService(workers=1, persist_dir=str(tmp_path))
+    profile = asyncio.run(service.process_file(UploadFile(filename="sales.csv", file=io.BytesIO(csv_bytes))))
+
+    with open(profile["stored_path"], "rb") as f:
+        assert f.read() == csv_bytes
+    spooled = IngestionService(workers=1)._profile_spooled(
+        UploadFile(filename="sales.csv", file=io.BytesIO(csv_bytes)), ".csv", None)
+    assert {k: v for k, v in profile.items() if k != "stored_path"} == spooled
+
+def test_stream_tolerates_type_changes_between_batches():
+    content = b"id,amount\n" + b"".join(b"%d,%d\n" % (i, i) for i in range(400_000)) + b"x,-1.5\n"
+
+    async def chunks():
+        for start in range(0, len(content), 1 << 20):
+            yield content[start:start + (1 << 20)]
+
+    profile = asyncio.run(IngestionService(workers=1).process_stream(chunks(), "late_change.csv"))
+    assert profile["row_count"] == 400_001
+    assert profile["anomalies"] == ["Negative values detected in column 'amount'"]
+    assert profile["schema"]["amount"] == "Float64"
+
+def test_csv_schema_is_the_same_on_every_path(tmp_path):
+    content = b"day,active,units,price,store\n" + b"".join(
+        b"2024-01-%02d,%s,%d,%d.5,s%d\n" % (i % 28 + 1, b"True" if i % 3 else b"False", i - 10, i, i % 4)
+        for i in range(2000))
+    path = tmp_path / "mixed.csv"
+    path.write_bytes(content)
+    service = IngestionService(workers=1)
+
+    async def chunks():
+        for start in range(0, len(content), 4096):
+            yield content[start:start + 4096]
+
+    streamed = asyncio.run(service.process_stream(chunks(), "mixed.csv"))
+    pandas = service._profile_csv_stream(str(path), "mixed.csv")
+    arrow = service._profile_batches(open_reader(str(path)), "mixed.csv")
+    assert streamed["schema"] == pandas["schema"] == arrow["schema"] == {
+        "day": "string", "active": "boolean", "units": "Int64", "price": "Float64", "store": "string"}
+
+@pytest.mark.asyncio
+async def test_spooled_profiling_runs_off_the_event_loop(monkeypatch):
+    service = IngestionService(workers=1)
+    monkeypatch.setattr(service, "_profile_spooled", lambda *args: time.sleep(0.2) or {"row_count": 1})
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    profile = await service.process_file(UploadFile(filename="book.xlsx", file=io.BytesIO(b"")))
+    task.cancel()
+    assert profile == {"row_count": 1}
+    assert ticks >= 5
+
+def test_spooled_upload_reports_stored_path(tmp_path):
+    payload = io.BytesIO()
+    pq.write_table(pa.table({"units": [1, 2, 3]}), payload)
+    service = IngestionService(workers=1, persist_dir=str(tmp_path))
+    profile = asyncio.run(service.process_file(UploadFile(filename="units.parquet", file=io.BytesIO(payload.getvalue()))))
+
+    with open(profile["stored_path"], "rb") as f:
+        assert f.read() == payload.getvalue()
+
+def test_stream_releases_parser_when_upload_is_unreadable():
+    async def garbage():
+        yield b"a,b\n1,2\n"
+        for _ in range(64):
+            yield b"\xff\xfe" * 500_000
+
+    result = {}
+    runner = threading.Thread(target=lambda: result.update(
+        asyncio.run(IngestionService(workers=1).process_stream(garbage(), "garbage.csv"))), daemon=True)
+    runner.start()
+    # Arrow's read-ahead thread must not be left waiting for chunks that never come
+    runner.join(timeout=30)
+    assert not runner.is_alive()
+    assert result["anomalies"] == ["Unreadable file format or corrupted content"]
+
+def test_stream_discards_persisted_bytes_of_a_failed_upload(tmp_path):
+    async def garbage():
+        yield b"a,b\n1,2\n"
+        for _ in range(8):
+            yield b"\xff\xfe" * 500_000
+
+    service = IngestionService(workers=1, persist_dir=str(tmp_path))
+    profile = asyncio.run(service.process_stream(garbage(), "garbage.csv"))
+
+    assert profile["anomalies"] == ["Unreadable file format or corrupted content"]
+    assert list(tmp_path.iterdir()) == []
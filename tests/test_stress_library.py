@@ -0,0 +1,73 @@
+import time
+import pytest
+import numpy as np
+from backend.engine.simulation import SimulationEngine
+from backend.engine.risk import RiskAnalyzer
+from backend.engine.stress_library import StressScenarioLibrary, load_stress_library
+
+BASELINE = {"revenue": 1000.0, "fixed_costs": 200.0, "operational_costs": 300.0, "marketing_spend": 100.0}
+
+def _generated_library(n: int) -> StressScenarioLibrary:
+    rng = np.random.default_rng(0)
+    scenarios = [{"name": f"shock-{i}", "shocks": {"revenue": float(r), "operational_costs": float(c)}}
+                 for i, (r, c) in enumerate(zip(rng.uniform(0.5, 1.1, n), rng.uniform(0.9, 1.4, n)))]
+    return StressScenarioLibrary({"version": "test-1", "packs": {"generated": {"scenarios": scenarios}}})
+
+def test_bundled_library_is_versioned_with_packs():
+    library = load_stress_library()
+    summary = library.summary()
+
+    assert summary["version"]
+    assert {"core", "historical", "regulatory"} <= set(summary["packs"])
+    assert summary["packs"]["core"]["scenarios"] == 3
+    assert load_stress_library() is library
+
+def test_library_rejects_bad_entries():
+    with pytest.raises(ValueError):
+        StressScenarioLibrary({"packs": {"p": {"scenarios": [{"shocks": {"revenue": 0.9}}]}}})
+    with pytest.raises(ValueError):
+        StressScenarioLibrary({"packs": {"p": {"scenarios": [{"name": "x", "shocks": {"revenue": "low"}}]}}})
+    with pytest.raises(ValueError):
+        load_stress_library().select(["no-such-pack"])
+
+def test_ranked_pages_are_worst_first_and_consistent():
+    library = _generated_library(500)
+    engine = SimulationEngine(BASELINE)
+    risk = RiskAnalyzer()
+
+    first = risk.run_stress_library(engine, BASELINE, library=library, page_size=20)
+    second = risk.run_stress_library(engine, BASELINE, library=library, page=2, page_size=20)
+    everything = risk.run_stress_library(engine, BASELINE, library=library, page_size=500)
+
+    values = [r["value"] for r in everything["results"]]
+    assert values == sorted(values)
+    assert [r["name"] for r in first["results"] + second["results"]] == [r["name"] for r in everything["results"][:40]]
+    assert second["results"][0]["rank"] == 21
+    assert first["total"] == 500 and first["library_version"] == "test-1"
+
+    worst = first["results"][0]
+    assert worst["delta"] == pytest.approx(worst["value"] - 400.0)
+    assert worst["value"] == pytest.approx(worst["inputs"]["revenue"] - 300 - worst["inputs"]["operational_costs"])
+
+def test_worst_20_of_5000_under_a_second_with_monte_carlo():
+    library = _generated_library(5000)
+    engine = SimulationEngine(BASELINE, seed=1)
+
+    start = time.perf_counter()
+    page = RiskAnalyzer().run_stress_library(engine, BASELINE, library=library, monte_carlo=True,
+                                            iterations=200, rank_by="p10")
+    assert time.perf_counter() - start < 1.0
+
+    p10s = [r["p10"] for r in page["results"]]
+    assert len(p10s) == 20 and p10s == sorted(p10s)
+    assert all(r["p10"] <= r["p50"] <= r["p90"] for r in page["results"])
+
+def test_stress_endpoint(client):
+    response = client.post("/api/risk/stress", json={"packs": ["core"], "page_size": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert [r["name"] for r in body["results"]] == ["Recession", "Inflation"]
+
+    assert client.post("/api/risk/stress", json={"rank_by": "p10"}).status_code == 400
+    assert "core" in client.get("/api/risk/stress/library").json()["packs"]
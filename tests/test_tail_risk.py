@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+from backend.engine.simulation import SimulationEngine
+from backend.engine.risk import RiskAnalyzer
+from backend.engine.sketches import KLLSketch
+from backend.engine.tail_risk import HistogramDistribution, SampleDistribution, SketchDistribution
+
+BASELINE = {
+    "revenue": 1000.0,
+    "fixed_costs": 200.0,
+    "operational_costs": 300.0,
+    "marketing_spend": 100.0
+}
+
+@pytest.fixture
+def outcomes():
+    return np.random.default_rng(0).standard_normal(200_000)
+
+def _representations(values):
+    sketch = KLLSketch.from_error(0.002)
+    sketch.update(values)
+    return [SampleDistribution(values), HistogramDistribution.from_samples(values, bins=512), SketchDistribution(sketch)]
+
+def test_representations_agree_on_tail_metrics(outcomes):
+    # Standard normal: P(X < -1) = 0.1587, VaR95 = -1.645, CVaR95 = -2.063
+    for dist in _representations(outcomes):
+        risk = dist.tail_risk(thresholds=[-1.0, 0.0], levels=[0.95])
+        assert risk["prob_below"][-1.0] == pytest.approx(0.1587, abs=0.005), dist.kind
+        assert risk["prob_below"][0.0] == pytest.approx(0.5, abs=0.005), dist.kind
+        assert risk["var"][0.95] == pytest.approx(-1.645, abs=0.03), dist.kind
+        assert risk["cvar"][0.95] == pytest.approx(-2.063, abs=0.03), dist.kind
+
+def test_samples_are_float32_and_sorted(outcomes):
+    dist = SampleDistribution(outcomes)
+    assert dist.values.dtype == np.float32
+    assert np.all(np.diff(dist.values) >= 0)
+
+def test_monte_carlo_tail_risk_in_same_pass():
+    engine = SimulationEngine(BASELINE, seed=1)
+    res = engine.run_monte_carlo(iterations=20_000, retain="samples", tail_thresholds=[300.0, 400.0])
+
+    samples = res["distribution"].values
+    assert len(samples) == 20_000
+    assert res["tail_risk"]["prob_below"][400.0] == pytest.approx(0.5, abs=0.02)
+    assert res["tail_risk"]["var"][0.95] < res["p10"]
+    assert res["tail_risk"]["cvar"][0.99] < res["tail_risk"]["var"][0.99]
+    # Retention does not change the summary
+    plain = engine.run_monte_carlo(iterations=20_000)
+    assert plain["p50"] == res["p50"]
+
+def test_streaming_retains_sketch_or_histogram():
+    engine = SimulationEngine(BASELINE, seed=2)
+    sketched = engine.run_monte_carlo(iterations=50_000, chunk_size=8192, retain="sketch", tail_thresholds=[400.0])
+    binned = engine.run_monte_carlo(iterations=50_000, chunk_size=8192, retain="histogram", histogram_bins=64)
+
+    assert isinstance(sketched["distribution"], SketchDistribution)
+    assert sketched["tail_risk"]["prob_below"][400.0] == pytest.approx(0.5, abs=0.02)
+    assert len(binned["distribution"].counts) == 64
+    assert binned["distribution"].counts.sum() == pytest.approx(50_000)
+
+    with pytest.raises(ValueError):
+        engine.run_monte_carlo(iterations=50_000, chunk_size=8192, retain="samples")
+
+def test_prob_of_failure_prefers_empirical_distribution():
+    risk = RiskAnalyzer()
+    # A skewed distribution where the normal approximation is clearly wrong
+    values = np.concatenate([np.full(900, 100.0), np.full(100, -1000.0)])
+    results = {"mean": values.mean(), "std_dev": values.std(), "distribution": SampleDistribution(values)}
+
+    assert risk.prob_of_failure(results, threshold=0.0) == pytest.approx(0.10)
+    assert risk.tail_risk(results, thresholds=[0.0], levels=[0.95])["cvar"][0.95] == pytest.approx(-1000.0)
+
+def test_prob_of_failure_normal_fallback():
+    risk = RiskAnalyzer()
+    assert risk.prob_of_failure({"mean": 0.0, "std_dev": 1.0}, threshold=-1.0) == pytest.approx(0.158655, abs=1e-6)
+    assert risk.prob_of_failure({"mean": 5.0, "std_dev": 0.0}) == 0.0
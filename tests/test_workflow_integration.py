@@ -50,3 +50,153 @@ def test_audit_log_creation(client, temp_audit_file):
         last_entry = json.loads(lines[-1])
         # The middleware logs the request
         assert "AUDIT: POST" in last_entry or "action" in last_entry
+
+def test_session_simulations_reuse_draws(client):
+    base = {"marketing_spend_delta": 0.0, "hiring_freeze": False, "session_id": "planning-42"}
+    first = client.post("/api/workflow/simulate", json=base).json()
+    repeat = client.post("/api/workflow/simulate", json=base).json()
+    nudged = client.post("/api/workflow/simulate", json={**base, "marketing_spend_delta": 100.0}).json()
+
+    # Same session -> identical draws, so repeats are stable and a +100 spend shifts cash by exactly -100
+    assert repeat == first
+    assert abs((first["savings_impact"] - nudged["savings_impact"]) - 100.0) < 1e-6
+
+def test_simulation_returns_monthly_cash_paths(client):
+    payload = {"marketing_spend_delta": 0.0, "hiring_freeze": True, "seed": 5}
+    data = client.post("/api/workflow/simulate", json=payload).json()
+
+    assert len(data["baseline_cash"]) == len(data["scenario_cash"]) == 6
+    # Positive monthly net cash flow -> balances grow; hiring freeze saves ~2k per month
+    assert data["baseline_cash"][-1] > data["baseline_cash"][0]
+    assert data["scenario_cash"][-1] > data["baseline_cash"][-1]
+    bands = data["scenario_bands"]
+    assert all(lo < mid < hi for lo, mid, hi in zip(bands["p10"], data["scenario_cash"], bands["p90"]))
+
+def test_bulk_simulate_streams_ndjson_matching_single_runs(client):
+    body = {"grid": {"marketing_spend_delta": [0.0, 100.0, 200.0], "hiring_freeze": [False, True]},
+            "seed": 11, "chunk_size": 4}
+    response = client.post("/api/workflow/simulate/bulk", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["index"] for r in rows] == list(range(6))
+
+    # Each bulk row equals the single-scenario endpoint with the same seed
+    single = client.post("/api/workflow/simulate", json={**rows[3]["params"], "seed": 11}).json()
+    assert single["savings_impact"] == pytest.approx(rows[3]["savings_impact"])
+    assert single["scenario_cash"] == pytest.approx(rows[3]["scenario_cash"])
+
+    # Shared draws: +100 marketing moves the mean by exactly -100
+    assert rows[2]["savings_impact"] - rows[0]["savings_impact"] == pytest.approx(-100.0)
+
+def test_bulk_simulate_server_sent_events(client):
+    body = {"scenarios": [{"marketing_spend_delta": 0.0, "hiring_freeze": False},
+                          {"marketing_spend_delta": 50.0, "hiring_freeze": True}],
+            "grid": {"marketing_spend_delta": {"start": 0, "stop": 1000, "num": 3}}}
+    response = client.post("/api/workflow/simulate/bulk?format=sse", json=body)
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block for block in response.text.split("\n\n") if block]
+    assert sum(e.startswith("event: result") for e in events) == 5
+    assert events[-1].startswith("event: done")
+    last = json.loads(events[-2].split("data: ", 1)[1])
+    assert last["params"]["marketing_spend_delta"] == 1000.0
+
+    assert client.post("/api/workflow/simulate/bulk", json={}).status_code == 400
+
+def test_unseeded_bulk_simulate_leaves_session_caches_alone(client):
+    from backend.routers.workflow import service
+    before = (len(service.draw_cache), len(service.result_cache))
+    body = {"grid": {"marketing_spend_delta": [0.0, 100.0, 200.0]}, "chunk_size": 1}
+    rows = [json.loads(line) for line in client.post("/api/workflow/simulate/bulk", json=body).text.splitlines()]
+
+    assert (len(service.draw_cache), len(service.result_cache)) == before
+    # Chunks still share the request's draws
+    assert rows[2]["savings_impact"] - rows[0]["savings_impact"] == pytest.approx(-200.0)
+
+def test_progressive_simulation_stream(client):
+    body = {"marketing_spend_delta": 500.0, "hiring_freeze": False, "seed": 3,
+            "iterations": 20_000, "report_every": 5_000}
+    response = client.post("/api/workflow/simulate/stream", json=body)
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block.split("\n", 1) for block in response.text.split("\n\n") if block]
+    names = [name.removeprefix("event: ") for name, _ in events]
+    assert names[0] == "started" and names[-1] == "done"
+    progress = [json.loads(data.removeprefix("data: ")) for name, data in events if name == "event: progress"]
+    # Reports land on block boundaries (1024 iterations) at or after every 5000
+    assert [p["iterations"] for p in progress] == [5_120, 10_240, 15_360, 20_000]
+    assert progress[0]["p10"] < progress[0]["p50"] < progress[0]["p90"]
+    assert progress[0]["ci_width"] is None
+    assert progress[-1]["ci_width"]["mean"] < progress[1]["ci_width"]["mean"]
+
+    assert client.delete("/api/workflow/simulate/stream/unknown").status_code == 404
+
+def test_stream_simulation_stops_when_cancelled():
+    import threading
+    from backend.routers.workflow import ProgressiveSimulateRequest
+    from backend.services.workflow_service import WorkflowService
+
+    cancelled = threading.Event()
+    updates = []
+    def emit(update):
+        updates.append(update)
+        cancelled.set()
+
+    params = ProgressiveSimulateRequest(marketing_spend_delta=0.0, hiring_freeze=True, seed=1)
+    last = WorkflowService().stream_simulation(params, 1_000_000, 2_000, emit, cancelled)
+    assert len(updates) == 1
+    assert last["iterations"] == 2_048 and not last["done"]
+
+def test_stream_simulation_cancels_between_reports():
+    from backend.routers.workflow import ProgressiveSimulateRequest
+    from backend.services.workflow_service import WorkflowService
+
+    class CancelAfter:
+        """Stop flag that reads as set from its n-th poll on."""
+        def __init__(self, polls: int):
+            self.polls = polls
+        def is_set(self) -> bool:
+            self.polls -= 1
+            return self.polls < 0
+
+    params = ProgressiveSimulateRequest(marketing_spend_delta=0.0, hiring_freeze=False, seed=2)
+    updates = []
+    last = WorkflowService().stream_simulation(params, 5_000_000, 5_000_000, updates.append, CancelAfter(3))
+
+    # A single report interval, yet the run stops at the first block boundary after the cancel
+    assert updates == [last] and not last["done"]
+    assert last["iterations"] == 3 * 1024
+
+def test_stream_rejects_report_interval_beyond_iterations(client):
+    body = {"marketing_spend_delta": 0.0, "hiring_freeze": False, "iterations": 1_000, "report_every": 5_000}
+    assert client.post("/api/workflow/simulate/stream", json=body).status_code == 400
+
+def test_unstarted_stream_leaves_no_registration_and_stops_its_job(monkeypatch):
+    import asyncio
+    import gc
+    import threading
+    from backend.routers import workflow
+    from backend.routers.workflow import ProgressiveSimulateRequest, run_simulation_stream
+
+    cancelled = threading.Event()
+    jobs = []
+    submit = workflow.compute_pool.submit
+    monkeypatch.setattr(workflow.compute_pool, "event", lambda: cancelled)
+    monkeypatch.setattr(workflow.compute_pool, "submit", lambda *args: jobs.append(submit(*args)) or jobs[-1])
+    request = ProgressiveSimulateRequest(marketing_spend_delta=0.0, hiring_freeze=False, seed=1,
+                                         iterations=50_000_000, report_every=10_000)
+
+    async def respond_without_sending():
+        response = await run_simulation_stream(request)
+        assert not workflow._active_streams
+        # The client went away before the response started: the body is never iterated
+        del response
+        gc.collect()
+        assert cancelled.is_set()
+        # The stop flag ends the 50M-iteration run at its next block
+        await asyncio.wait_for(asyncio.wrap_future(jobs[0]), timeout=30)
+
+    asyncio.run(respond_without_sending())
+    assert not workflow._active_streams